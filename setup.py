@@ -37,6 +37,8 @@ setup(
 entry_points={
         'console_scripts': [
             'termtel-con=termtel.termtel:main',
+            'termtel-daemon=termtel.telemetry.daemon:main',
+            'termtel-sim=termtel.simulator.cli:cli',
         ],
         'gui_scripts': [
             'termtel=termtel.termtel:main',
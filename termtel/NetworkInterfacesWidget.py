@@ -1,11 +1,13 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
                              QTreeWidget, QTreeWidgetItem, QFrame, QSplitter, QMenu)
 from PyQt6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QPointF
 import time
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional
 
+from termtel.telemetry.ringbuffer import RingBuffer
+
 
 @dataclass
 class InterfaceData:
@@ -18,12 +20,12 @@ class InterfaceData:
 
 
 class InterfaceGraphWidget(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, history_length: int = 1440):
         super().__init__()
         self.setup_ui()
-        self.interface_history = {}
+        self.interface_history: Dict[str, RingBuffer] = {}
         self.current_interface = None
-        self.history_length = 30
+        self.history_length = history_length
         self.parent = parent
 
     def setup_ui(self):
@@ -50,13 +52,9 @@ class InterfaceGraphWidget(QWidget):
         current_time = time.time()
 
         if interface not in self.interface_history:
-            self.interface_history[interface] = []
-
-        history = self.interface_history[interface]
-        history.append((current_time, utilization))
+            self.interface_history[interface] = RingBuffer(self.history_length)
 
-        if len(history) > self.history_length:
-            history.pop(0)
+        self.interface_history[interface].append(utilization, current_time)
 
         if interface == self.current_interface:
             self.update_graph()
@@ -74,16 +72,16 @@ class InterfaceGraphWidget(QWidget):
         self.chart.removeAllSeries()
         series = QLineSeries()
 
-        history = self.interface_history.get(self.current_interface, [])
+        history = self.interface_history.get(self.current_interface)
         if not history:
             print(f"No history for {self.current_interface}")
             return
 
         print(f"History points: {len(history)}")
-        start_time = history[0][0]
-        for timestamp, utilization in history:
-            print(f"Point: {timestamp - start_time:.1f}s, {utilization:.2f}%")
-            series.append(timestamp - start_time, utilization)
+        timestamps = history.timestamps()
+        elapsed = timestamps - timestamps[0]
+        series.replace([QPointF(float(x), float(y)) for x, y in zip(elapsed, history.values())])
+        self.axis_x.setRange(0, max(300.0, float(elapsed[-1])))
 
         self.chart.addSeries(series)
         series.attachAxis(self.axis_x)
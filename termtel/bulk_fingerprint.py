@@ -0,0 +1,247 @@
+"""
+Bulk device fingerprinting.
+
+Fingerprints every host in a sessions.yaml or a plain host list through a
+bounded thread pool, streams one JSON object per host as results arrive and
+can write Vendor/SoftwareVersion/Model back into the session file.
+"""
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, TextIO
+
+import yaml
+
+from termtel.device_fingerprint import DeviceFingerprinter
+from termtel.fingerprint_cache import fingerprint_cache, extract_serial
+
+MODEL_KEYS = ('MODEL', 'HARDWARE', 'PLATFORM')
+VERSION_KEYS = ('VERSION', 'OS', 'JUNOS_VERSION', 'IMAGE', 'SOFTWARE_VERSION')
+
+
+def _first_value(parsed_data, keys) -> str:
+    records = parsed_data if isinstance(parsed_data, list) else [parsed_data]
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        for key in keys:
+            value = record.get(key) or record.get(key.lower())
+            if isinstance(value, list):
+                value = value[0] if value else None
+            if value:
+                return str(value).strip()
+    return ''
+
+
+def load_session_targets(sessions_file: str) -> List[dict]:
+    """Read hosts from a sessions.yaml (list of folders with sessions)"""
+    with open(sessions_file) as f:
+        folders = yaml.safe_load(f) or []
+
+    targets = []
+    seen = set()
+    for folder in folders:
+        for session in folder.get('sessions', []) or []:
+            host = str(session.get('host', '')).strip()
+            port = int(session.get('port') or 22)
+            if not host or (host, port) in seen:
+                continue
+            seen.add((host, port))
+            targets.append({
+                'host': host,
+                'port': port,
+                'display_name': session.get('display_name', host),
+                'folder': folder.get('folder_name', ''),
+            })
+    return targets
+
+
+def load_host_targets(hosts_file: str) -> List[dict]:
+    """Read hosts from a text file, one host or host:port per line, # for comments"""
+    targets = []
+    with open(hosts_file) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            host, _, port = line.partition(':')
+            targets.append({
+                'host': host.strip(),
+                'port': int(port) if port.strip() else 22,
+                'display_name': host.strip(),
+                'folder': '',
+            })
+    return targets
+
+
+def summarize(target: dict, device_info: dict) -> dict:
+    """Flatten a fingerprint into the fields written to JSON Lines and the session file"""
+    parsed_data = device_info.get('parsed_data')
+    return {
+        'host': target['host'],
+        'port': target['port'],
+        'display_name': target['display_name'],
+        'success': True,
+        'vendor': device_info.get('vendor') or '',
+        'model': _first_value(parsed_data, MODEL_KEYS),
+        'software_version': _first_value(parsed_data, VERSION_KEYS),
+        'serial': extract_serial(parsed_data) or '',
+        'template': device_info.get('template') or '',
+        'prompt': device_info.get('detected_prompt') or device_info.get('prompt') or '',
+    }
+
+
+def fingerprint_target(target: dict, username: str, password: str, timeout: int,
+                       deadline: float, use_cache: bool) -> dict:
+    """Fingerprint one host; never raises, errors are reported in the result"""
+    started = time.monotonic()
+
+    if use_cache:
+        cached = fingerprint_cache.get(target['host'], target['port'])
+        if cached and fingerprint_cache.is_fresh(cached):
+            record = summarize(target, cached)
+            record.update({'cached': True, 'elapsed': 0.0})
+            return record
+
+    fingerprinter = DeviceFingerprinter(verbose=False)
+    fingerprinter.keep_transport = False
+    try:
+        result = fingerprinter.fingerprint_device(
+            host=target['host'],
+            username=username,
+            password=password,
+            timeout=timeout,
+            port=target['port'],
+            deadline=deadline
+        )
+    except Exception as e:
+        result = {"error": f"Fingerprinting failed: {str(e)}"}
+
+    elapsed = round(time.monotonic() - started, 2)
+    if not result.get("success"):
+        return {
+            'host': target['host'],
+            'port': target['port'],
+            'display_name': target['display_name'],
+            'success': False,
+            'error': result.get("error", "Unknown error"),
+            'elapsed': elapsed,
+        }
+
+    record = summarize(target, result['device_info'])
+    record.update({'cached': False, 'elapsed': elapsed, 'result': result})
+    return record
+
+
+def bulk_fingerprint(targets: Iterable[dict], username: str, password: str, workers: int = 32,
+                     timeout: int = 30, deadline: float = 120, use_cache: bool = True,
+                     out: TextIO = sys.stdout) -> List[dict]:
+    """
+    Fingerprint targets concurrently and stream JSON Lines to out.
+
+    Returns the per-host records in completion order.
+    """
+    targets = list(targets)
+    records = []
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(fingerprint_target, target, username, password, timeout, deadline, use_cache): target
+            for target in targets
+        }
+        for future in as_completed(futures):
+            record = future.result()
+            result = record.pop('result', None)
+            if result:
+                cached = fingerprint_cache.get(record['host'], record['port']) or {}
+                fingerprint_cache.put(record['host'], result, driver=cached.get('driver'), save=False,
+                                      port=record['port'])
+
+            done += 1
+            records.append(record)
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            print(f"[{done}/{len(targets)}] {record['host']}: "
+                  f"{record.get('vendor') or record.get('error')}", file=sys.stderr)
+
+    fingerprint_cache.flush()
+    return records
+
+
+def write_back(sessions_file: str, records: Iterable[dict]) -> int:
+    """
+    Write Vendor/SoftwareVersion/Model (and SerialNumber when known) into sessions_file.
+
+    The original file is kept as <file>.bak. Returns the number of sessions updated.
+    """
+    by_target: Dict[tuple, dict] = {(r['host'], r['port']): r for r in records if r.get('success')}
+
+    with open(sessions_file) as f:
+        folders = yaml.safe_load(f) or []
+
+    updated = 0
+    for folder in folders:
+        for session in folder.get('sessions', []) or []:
+            record = by_target.get((str(session.get('host', '')).strip(), int(session.get('port') or 22)))
+            if not record:
+                continue
+            fields = {
+                'Vendor': record['vendor'],
+                'SoftwareVersion': record['software_version'],
+                'Model': record['model'],
+                'SerialNumber': record['serial'],
+            }
+            session.update({key: value for key, value in fields.items() if value})
+            updated += 1
+
+    shutil.copy2(sessions_file, sessions_file + '.bak')
+    tmp_file = sessions_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        yaml.safe_dump(folders, f, default_flow_style=False)
+    os.replace(tmp_file, sessions_file)
+    return updated
+
+
+def run_bulk(args) -> None:
+    """Entry point for device_fingerprint's --sessions/--hosts-file mode"""
+    if not args.verbose:
+        # Per-phase logging from thousands of hosts drowns the progress output
+        for name in ('termtel.device_fingerprint', 'termtel.ssh.transport_pool', 'paramiko'):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    if args.sessions:
+        targets = load_session_targets(args.sessions)
+    else:
+        targets = load_host_targets(args.hosts_file)
+    print(f"Fingerprinting {len(targets)} hosts with {args.workers} workers", file=sys.stderr)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        records = bulk_fingerprint(
+            targets,
+            username=args.username,
+            password=args.password,
+            workers=args.workers,
+            timeout=args.timeout,
+            deadline=args.deadline,
+            use_cache=not args.no_cache,
+            out=out
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    succeeded = sum(1 for r in records if r.get('success'))
+    print(f"Done: {succeeded}/{len(records)} fingerprinted", file=sys.stderr)
+
+    if args.write_back:
+        if not args.sessions:
+            print("--write-back requires --sessions", file=sys.stderr)
+            return
+        updated = write_back(args.sessions, records)
+        print(f"Updated {updated} sessions in {args.sessions}", file=sys.stderr)
@@ -1,8 +1,19 @@
 # custom_driver.py
+import re
+import time
 import traceback
 from pathlib import Path
 
 from termtel.tfsm_fire import TextFSMAutoEngine
+from termtel.telemetry.spans import spans
+
+
+# Interface header and octet counter lines of "show interface(s)" on IOS, EOS and NX-OS:
+#   "     1234 packets input, 567890 bytes"   (IOS/EOS)
+#   "    1234 input packets  567890 bytes"    (NX-OS)
+INTERFACE_HEADER_RE = re.compile(r'^(\S+) is .*(up|down)', re.IGNORECASE)
+INPUT_BYTES_RE = re.compile(r'(\d+)\s+(?:packets input|input packets),?\s+(\d+)\s+bytes', re.IGNORECASE)
+OUTPUT_BYTES_RE = re.compile(r'(\d+)\s+(?:packets output|output packets),?\s+(\d+)\s+bytes', re.IGNORECASE)
 
 
 class CustomDriver:
@@ -131,6 +142,35 @@ class CustomDriver:
 
         return common_data
 
+    def parse_octet_counters(self, output):
+        """
+        Input/output byte counters per interface from raw "show interfaces" output.
+
+        Not every TextFSM template captures the byte columns, so they are read
+        straight from the text. Returns name -> (rx_octets, tx_octets).
+        """
+        octets = {}
+        name = None
+        rx = tx = None
+        for line in output.splitlines():
+            header = INTERFACE_HEADER_RE.match(line)
+            if header:
+                if name and rx is not None and tx is not None:
+                    octets[name] = (rx, tx)
+                name, rx, tx = header.group(1), None, None
+                continue
+            if name is None:
+                continue
+            match = INPUT_BYTES_RE.search(line)
+            if match and rx is None:
+                rx = int(match.group(2))
+            match = OUTPUT_BYTES_RE.search(line)
+            if match and tx is None:
+                tx = int(match.group(2))
+        if name and rx is not None and tx is not None:
+            octets[name] = (rx, tx)
+        return octets
+
     def get_interfaces_custom(self):
         """Get interface details using TextFSM parsing, including rates and counters."""
         if self.device.platform == "nxos_ssh":
@@ -147,16 +187,20 @@ class CustomDriver:
         else:
             hint = "cisco_ios_show_interfaces"
 
-        template, parsed, score = self.engine.find_best_template(output[interface_cmd], hint)
-        print("Best template:", interface_cmd, "Score:", score)
-        if score < 5:
-            template, parsed, score = self.engine.find_best_template(output[interface_cmd], 'cisco_nxos_show_interface')
+        hostname = getattr(self.device, 'hostname', '')
+        with spans.span(hostname, 'template.interfaces'):
+            template, parsed, score = self.engine.find_best_template(output[interface_cmd], hint)
+            print("Best template:", interface_cmd, "Score:", score)
+            if score < 5:
+                template, parsed, score = self.engine.find_best_template(output[interface_cmd], 'cisco_nxos_show_interface')
 
         if not parsed:
             return {}, {}
 
+        parse_started = time.perf_counter()
         interfaces = {}
         counters = {}
+        octets = self.parse_octet_counters(output[interface_cmd])
         print("Parsed show interfaces")
         print(parsed)
         print("Reading parsed data...")
@@ -207,6 +251,8 @@ class CustomDriver:
                 c_dict['rx_errors'] = rx_errors
                 c_dict['tx_rate'] = tx_rate
                 c_dict['rx_rate'] = rx_rate
+                if name in octets:
+                    c_dict['rx_octets'], c_dict['tx_octets'] = octets[name]
 
                 counters[name] = c_dict
 
@@ -216,4 +262,5 @@ class CustomDriver:
             print("Error reading parsed data:", e)
             traceback.print_exc()
 
+        spans.record(hostname, 'parse.interfaces', time.perf_counter() - parse_started)
         return interfaces, counters
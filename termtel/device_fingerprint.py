@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 import json
 from pathlib import Path
-from time import sleep
 import re
+import time
 from typing import Dict, Optional, Tuple
-from termtel.ssh.pysshpass import ssh_client
+from termtel.ssh.expect import read_until_prompt, prompt_pattern, detect_prompt
+from termtel.ssh.transport_pool import transport_pool
 from termtel.tfsm_fire import TextFSMAutoEngine as TextFSMParser
 import logging
 
@@ -12,6 +13,12 @@ import logging
 class DeviceFingerprinter:
     INITIAL_PROMPT = "#|>|\\$"
 
+    # Expect timeouts: commands return as soon as the prompt is back, these
+    # only bound how long we wait for devices that never send it.
+    COMMAND_TIMEOUT = 30
+    IDLE_TIMEOUT = 5
+    BANNER_IDLE_TIMEOUT = 2
+
     PAGING_COMMANDS = {
         'cisco': ['terminal length 0', 'terminal width 511'],
         'asa': ['terminal pager 0'],
@@ -24,6 +31,31 @@ class DeviceFingerprinter:
         'dell': ['terminal length 0']
     }
 
+    # Vendor hints for the fast classification path: (vendor, source, pattern, weight).
+    # "banner" covers the SSH server version string and the login banner.
+    VENDOR_RULES = [
+        ('cisco', 'banner', re.compile(r'SSH-2\.0-Cisco|\bcisco\b', re.IGNORECASE), 3),
+        ('cisco', 'banner', re.compile(r'\bIOS(-XE|-XR)?\b|\bNX-OS\b'), 2),
+        ('asa', 'banner', re.compile(r'Adaptive Security Appliance|\bASA\b|ciscoasa', re.IGNORECASE), 6),
+        ('asa', 'prompt', re.compile(r'asa', re.IGNORECASE), 4),
+        ('arista', 'banner', re.compile(r'arista|\bEOS\b', re.IGNORECASE), 5),
+        ('juniper', 'banner', re.compile(r'junos|juniper', re.IGNORECASE), 5),
+        ('juniper', 'prompt', re.compile(r'^\S+@\S+[>#]\s*$'), 1),
+        ('paloalto', 'banner', re.compile(r'palo ?alto|pan-?os', re.IGNORECASE), 5),
+        ('paloalto', 'prompt', re.compile(r'^\S+@PA-\S*[>#]\s*$|^\S+@\S+\((active|passive)\)[>#]'), 4),
+        ('paloalto', 'prompt', re.compile(r'^\S+@\S+[>#]\s*$'), 1),
+        ('huawei', 'banner', re.compile(r'huawei|\bVRP\b', re.IGNORECASE), 5),
+        ('huawei', 'prompt', re.compile(r'^<[^<>]+>\s*$'), 1),
+        ('hp', 'banner', re.compile(r'comware|hewlett|procurve|\bH3C\b', re.IGNORECASE), 5),
+        ('hp', 'prompt', re.compile(r'^<[^<>]+>\s*$'), 1),
+        ('fortinet', 'banner', re.compile(r'forti(gate|net|os)', re.IGNORECASE), 5),
+        ('fortinet', 'prompt', re.compile(r'^FG[TV]?\S*\s*(\(\S+\)\s*)?[#$]\s*$', re.IGNORECASE), 4),
+        ('dell', 'banner', re.compile(r'\bdell\b|force10|\bOS10\b', re.IGNORECASE), 5),
+    ]
+
+    # Minimum score for the fast path to skip the paging sweep
+    VENDOR_CONFIDENCE = 3
+
     ERROR_PATTERNS = [
         r'% ?error',
         r'% ?invalid',
@@ -38,9 +70,16 @@ class DeviceFingerprinter:
         db_path = str(BASE_DIR.parent) + "/templates.db"
         self.parser = TextFSMParser(db_path)
         self.prompt = None
+        self.prompt_re = None
+        self.banner = ""
+        self.server_version = ""
+        self._error_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.ERROR_PATTERNS]
         self.client = None
         self.channel = None
         self.verbose = verbose
+        # Bulk runs close each transport when done instead of pooling it
+        self.keep_transport = True
+        self._deadline = None
 
         log_level = logging.DEBUG if verbose else logging.INFO
         logging.basicConfig(
@@ -55,32 +94,38 @@ class DeviceFingerprinter:
             if output:
                 self.logger.debug(f"Raw output:\n{output}")
 
-    def read_channel_output(self, channel, timeout: int = 1) -> str:
-        """Helper method to read channel output"""
-        output = ""
-        sleep(timeout)  # Wait for output to accumulate
-        while channel.recv_ready():
-            chunk = channel.recv(4096).decode('utf-8')
-            output += chunk
-        return output
+    def read_channel_output(self, channel, timeout: float = None, idle_timeout: float = None) -> str:
+        """Read channel output until the device prompt returns"""
+        timeout = timeout or self.COMMAND_TIMEOUT
+        if self._deadline is not None:
+            remaining = self._deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Fingerprint deadline exceeded")
+            timeout = min(timeout, remaining)
+        return read_until_prompt(
+            channel,
+            self.prompt_re,
+            timeout=timeout,
+            idle_timeout=idle_timeout or self.IDLE_TIMEOUT
+        )
 
     def phase1_detect_prompt(self, channel) -> Optional[str]:
         """Phase 1: Initial Prompt Detection"""
         self.logger.info("Phase 1: Detecting prompt...")
 
         try:
-            self.debug_output("Sending newline to detect prompt")
-            channel.send("\n")
-
-            output = self.read_channel_output(channel)
-            self.debug_output("Received output", output)
-
-            lines = [l.strip() for l in output.split('\n') if l.strip()]
-            for line in reversed(lines):
-                if re.search(f".*({self.INITIAL_PROMPT})\\s*$", line):
-                    detected_prompt = line.strip()
-                    self.logger.info(f"Detected prompt: {detected_prompt}")
-                    return detected_prompt
+            self.debug_output("Sending newlines to detect prompt")
+            # The banner was already read; the prompt must repeat to be accepted
+            timeout = self.COMMAND_TIMEOUT
+            if self._deadline is not None:
+                timeout = min(timeout, max(0.0, self._deadline - time.monotonic()))
+            detected_prompt = detect_prompt(channel, timeout=timeout, idle_timeout=self.BANNER_IDLE_TIMEOUT,
+                                            drain_banner=False)
+            if detected_prompt:
+                self.logger.info(f"Detected prompt: {detected_prompt}")
+                self.prompt = detected_prompt
+                self.prompt_re = prompt_pattern(detected_prompt)
+                return detected_prompt
 
             self.logger.error("No prompt detected in output")
             return None
@@ -89,57 +134,110 @@ class DeviceFingerprinter:
             self.logger.error(f"Error in prompt detection: {str(e)}")
             raise
 
-    def phase2_disable_paging(self, channel, prompt: str) -> Tuple[Optional[str], list]:
-        """Phase 2: Paging Disable Loop with improved vendor detection"""
-        self.logger.info("Phase 2: Disabling paging...")
+    def classify_vendor(self, prompt: str, banner: str = "", server_version: str = "") -> Tuple[Optional[str], list]:
+        """
+        Fast vendor classification from the prompt, login banner and SSH server version.
+
+        Returns:
+            (vendor, candidates): vendor is set only when one vendor clearly wins;
+            candidates lists every vendor that matched, best first
+        """
+        sources = {
+            'prompt': prompt or "",
+            'banner': "\n".join(part for part in (server_version, banner) if part),
+        }
+        scores = {}
+        for vendor, source, pattern, weight in self.VENDOR_RULES:
+            if pattern.search(sources[source]):
+                scores[vendor] = scores.get(vendor, 0) + weight
+
+        if not scores:
+            return None, []
+
+        candidates = sorted(scores, key=scores.get, reverse=True)
+        best = scores[candidates[0]]
+        runner_up = scores[candidates[1]] if len(candidates) > 1 else 0
+        if best >= self.VENDOR_CONFIDENCE and best > runner_up:
+            return candidates[0], candidates
+        return None, candidates
 
-        successful_vendors = {}  # Track all successful vendors
+    def _try_paging_commands(self, channel, vendor: str) -> list:
+        """Send one vendor's paging commands; returns them if all succeeded, else []"""
+        self.logger.info(f"Trying {vendor} paging commands")
+        successful_commands = []
+
+        for cmd in self.PAGING_COMMANDS[vendor]:
+            try:
+                self.debug_output(f"Sending command: {cmd}")
+                channel.send(cmd + "\n")
+                output = self.read_channel_output(channel)
+                self.debug_output(f"Command output for {cmd}", output)
+
+                if output and not any(pattern.search(output) for pattern in self._error_res):
+                    self.logger.info(f"Successfully executed {vendor} command: {cmd}")
+                    successful_commands.append((vendor, cmd))
+                else:
+                    self.debug_output(f"Command failed or produced errors: {cmd}")
+                    return []
+
+            except Exception as e:
+                self.logger.error(f"Error with {vendor} command {cmd}: {str(e)}")
+                return []
+
+        return successful_commands
+
+    def _select_vendor(self, successful_vendors: Dict[str, list], prompt: str) -> Tuple[Optional[str], list]:
+        """Pick the most likely vendor when several vendors' paging commands worked"""
+        # Check prompt for vendor hints
+        prompt_lower = prompt.lower()
+        for vendor in successful_vendors.keys():
+            if vendor.lower() in prompt_lower:
+                self.logger.info(f"Selected {vendor} based on prompt match")
+                return vendor, successful_vendors[vendor]
+
+        # If no prompt match, prefer more specific vendors over generic ones
+        vendor_priority = ['arista', 'juniper', 'huawei', 'paloalto', 'fortinet', 'asa', 'cisco', 'hp', 'dell']
+        for preferred_vendor in vendor_priority:
+            if preferred_vendor in successful_vendors:
+                self.logger.info(f"Selected {preferred_vendor} based on vendor priority")
+                return preferred_vendor, successful_vendors[preferred_vendor]
+
+        return None, []
+
+    def phase2_disable_paging(self, channel, prompt: str, banner: str = "",
+                              server_version: str = "") -> Tuple[Optional[str], list]:
+        """Phase 2: Vendor classification and paging disable"""
+        self.logger.info("Phase 2: Disabling paging...")
 
         try:
-            for vendor, commands in self.PAGING_COMMANDS.items():
-                self.logger.info(f"Trying {vendor} paging commands")
-                vendor_success = True
-                successful_commands = []
-
-                for cmd in commands:
-                    try:
-                        self.debug_output(f"Sending command: {cmd}")
-                        channel.send(cmd + "\n")
-                        output = self.read_channel_output(channel)
-                        self.debug_output(f"Command output for {cmd}", output)
-
-                        if output and not any(re.search(pattern, output, re.IGNORECASE)
-                                              for pattern in self.ERROR_PATTERNS):
-                            self.logger.info(f"Successfully executed {vendor} command: {cmd}")
-                            successful_commands.append((vendor, cmd))
-                        else:
-                            self.debug_output(f"Command failed or produced errors: {cmd}")
-                            vendor_success = False
-                            break
-
-                    except Exception as e:
-                        self.logger.error(f"Error with {vendor} command {cmd}: {str(e)}")
-                        vendor_success = False
-                        break
-
-                if vendor_success and successful_commands:
-                    successful_vendors[vendor] = successful_commands
-
-            # If multiple vendors worked, use additional heuristics to determine the most likely one
-            if successful_vendors:
-                # Check prompt for vendor hints
-                prompt_lower = prompt.lower()
-                for vendor in successful_vendors.keys():
-                    if vendor.lower() in prompt_lower:
-                        self.logger.info(f"Selected {vendor} based on prompt match")
-                        return vendor, successful_vendors[vendor]
-
-                # If no prompt match, prefer more specific vendors over generic ones
-                vendor_priority = ['arista', 'juniper', 'huawei', 'paloalto', 'fortinet', 'asa', 'cisco']
-                for preferred_vendor in vendor_priority:
-                    if preferred_vendor in successful_vendors:
-                        self.logger.info(f"Selected {preferred_vendor} based on vendor priority")
-                        return preferred_vendor, successful_vendors[preferred_vendor]
+            tried = set()
+
+            # Fast path: a clear winner from prompt/banner only gets its own commands
+            vendor, candidates = self.classify_vendor(prompt, banner, server_version)
+            if vendor:
+                self.logger.info(f"Classified vendor as {vendor} from prompt/banner")
+                commands = self._try_paging_commands(channel, vendor)
+                if commands:
+                    return vendor, commands
+                self.logger.info(f"{vendor} paging commands failed, falling back to sweep")
+                tried.add(vendor)
+
+            # Ambiguous: sweep the matching candidates first, then everything else
+            sweeps = []
+            if candidates:
+                sweeps.append([v for v in candidates if v not in tried])
+            sweeps.append([v for v in self.PAGING_COMMANDS if v not in tried and v not in candidates])
+
+            for sweep in sweeps:
+                successful_vendors = {}
+                for vendor in sweep:
+                    commands = self._try_paging_commands(channel, vendor)
+                    tried.add(vendor)
+                    if commands:
+                        successful_vendors[vendor] = commands
+
+                if successful_vendors:
+                    return self._select_vendor(successful_vendors, prompt)
 
             self.logger.warning("No vendor paging commands were successful")
             return None, []
@@ -147,6 +245,7 @@ class DeviceFingerprinter:
         except Exception as e:
             self.logger.error(f"Error in paging disable phase: {str(e)}")
             raise
+
     def phase3_get_version(self, channel, prompt: str) -> Dict:
         """Phase 3: Version Command Execution"""
         self.logger.info("Phase 3: Getting version information...")
@@ -155,7 +254,7 @@ class DeviceFingerprinter:
             self.debug_output("Sending 'show version' command")
             channel.send("show version\n")
 
-            output = self.read_channel_output(channel, timeout=2)
+            output = self.read_channel_output(channel)
             self.debug_output("Show version output", output)
 
             if not output:
@@ -197,40 +296,46 @@ class DeviceFingerprinter:
             self.logger.error(f"Error in version detection: {str(e)}")
             return {"error": f"Error getting version info: {str(e)}"}
 
-    def fingerprint_device(self, host: str, username: str, password: str, timeout: int = 30) -> Dict:
-        """Main fingerprinting process"""
+    def fingerprint_device(self, host: str, username: str, password: str, timeout: int = 30,
+                           port: int = 22, deadline: Optional[float] = None) -> Dict:
+        """
+        Main fingerprinting process
+
+        timeout bounds the login and each read; deadline, if given, bounds the
+        whole run in seconds.
+        """
         self.logger.info(f"Starting device fingerprinting for host: {host}")
         channel = None
+        transport = None
+        self.prompt = None
+        self.prompt_re = None
+        self._deadline = time.monotonic() + deadline if deadline else None
+        if deadline:
+            timeout = min(timeout, deadline)
 
         try:
-            self.debug_output(f"Establishing SSH connection to {host}")
-            client = ssh_client(
-                host=host,
-                user=username,
+            self.debug_output(f"Acquiring pooled SSH transport to {host}")
+            transport = transport_pool.acquire(
+                host,
+                port=port,
+                username=username,
                 password=password,
-                cmds="",
-                invoke_shell=True,
-                prompt=self.INITIAL_PROMPT,
-                prompt_count=1,
-                timeout=timeout,
-                disable_auto_add_policy=False,
-                look_for_keys=False,
-                inter_command_time=1,
-                connect_only=True
+                timeout=timeout
             )
 
-            if not client:
-                self.logger.error("Failed to establish SSH connection")
-                return {"error": "Failed to establish SSH connection"}
-
-            channel = client.invoke_shell()
-            sleep(2)  # Wait for banner
+            self.server_version = transport.remote_version or ""
+            channel = transport_pool.open_shell(transport)
+            # Banner and first prompt; returns as soon as a prompt shows up
+            self.banner = read_until_prompt(channel, None, timeout=timeout,
+                                            idle_timeout=self.BANNER_IDLE_TIMEOUT)
 
             prompt = self.phase1_detect_prompt(channel)
             if not prompt:
                 return {"error": "Failed to detect prompt"}
 
-            vendor, paging_commands = self.phase2_disable_paging(channel, prompt)
+            vendor, paging_commands = self.phase2_disable_paging(
+                channel, prompt, banner=self.banner, server_version=self.server_version
+            )
             if not vendor:
                 self.logger.warning("Could not identify vendor through paging commands")
 
@@ -260,9 +365,35 @@ class DeviceFingerprinter:
                 if channel:
                     channel.close()
                     self.debug_output("SSH channel closed")
-                if client:
-                    client.close()
-                    self.debug_output("SSH client closed")
+                if transport:
+                    transport_pool.release(transport, close=not self.keep_transport)
+                    self.debug_output("SSH transport released to pool")
+            except Exception as e:
+                self.logger.error(f"Error closing SSH connections: {str(e)}")
+
+    def check_prompt(self, host: str, username: str, password: str, timeout: int = 15,
+                     port: int = 22) -> Optional[str]:
+        """
+        Cheap revalidation probe: log in, return the device prompt and do nothing else.
+
+        Used to confirm a cached fingerprint still belongs to the device at host.
+        """
+        channel = None
+        transport = None
+        try:
+            transport = transport_pool.acquire(host, port=port, username=username,
+                                               password=password, timeout=timeout)
+            channel = transport_pool.open_shell(transport)
+            return detect_prompt(channel, timeout=timeout, idle_timeout=self.BANNER_IDLE_TIMEOUT)
+        except Exception as e:
+            self.logger.error(f"Prompt check failed for {host}: {str(e)}")
+            return None
+        finally:
+            try:
+                if channel:
+                    channel.close()
+                if transport:
+                    transport_pool.release(transport)
             except Exception as e:
                 self.logger.error(f"Error closing SSH connections: {str(e)}")
 
@@ -276,8 +407,24 @@ def main():
     parser.add_argument('--password', default="cisco", help='SSH password')
     parser.add_argument('--timeout', type=int, default=30, help='Connection timeout in seconds')
 
+    bulk = parser.add_argument_group('bulk mode')
+    source = bulk.add_mutually_exclusive_group()
+    source.add_argument('--sessions', help='Fingerprint every host in a sessions.yaml')
+    source.add_argument('--hosts-file', help='Fingerprint hosts listed one per line (host or host:port)')
+    bulk.add_argument('--workers', type=int, default=32, help='Concurrent fingerprint workers')
+    bulk.add_argument('--deadline', type=float, default=120, help='Per-host deadline in seconds')
+    bulk.add_argument('--output', help='Write JSON Lines results here instead of stdout')
+    bulk.add_argument('--write-back', action='store_true',
+                      help='Write Vendor/SoftwareVersion/Model back into the --sessions file')
+    bulk.add_argument('--no-cache', action='store_true', help='Ignore cached fingerprints')
+
     args = parser.parse_args()
 
+    if args.sessions or args.hosts_file:
+        from termtel.bulk_fingerprint import run_bulk
+        run_bulk(args)
+        return
+
     fingerprinter = DeviceFingerprinter(verbose=args.verbose)
     result = fingerprinter.fingerprint_device(
         host=args.host,
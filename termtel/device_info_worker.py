@@ -1,243 +1,106 @@
 # device_info_worker.py
 
-import json
 import traceback
 from pprint import pprint
 
-from napalm import get_network_driver
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
-from termtel.custom_driver import CustomDriver
+from termtel.telemetry.poller import DevicePoller, PollEvent
+from termtel.telemetry.snapshot import metrics_snapshot
 
-class DeviceInfoWorker(QThread):
-    """Worker thread to handle device operations without blocking the UI"""
+
+class DeviceInfoWorker(QObject):
+    """
+    Persistent single-device polling worker, moved to its own QThread by its
+    owner. The dashboard polls through the shared PollingEngine instead
+    (telemetry/bus.py); this worker suits a window that polls on its own.
+
+    A thin Qt adapter over the Qt-free DevicePoller: the NAPALM session
+    stays open between poll() calls and is only re-established when a getter
+    fails, each poll runs only the getters whose tier is due, and every
+    getter result is re-emitted as its own signal. poll_finished carries the
+    pacer's delay before the next cycle and whether this one succeeded, so
+    the owner schedules cycles back to back, never overlapping, and
+    backs off while the device keeps failing.
+    """
     facts_ready = pyqtSignal(object)
     interfaces_ready = pyqtSignal(object)
     neighbors_ready = pyqtSignal(object)
     routes_ready = pyqtSignal(object)
     error = pyqtSignal(str)
+    poll_finished = pyqtSignal(float, bool)  # seconds until the next cycle, ok
 
-    def __init__(self, driver, hostname: str, username: str, password: str):
+    def __init__(self, driver, hostname: str, username: str, password: str, intervals: dict = None,
+                 store=None, pacing: dict = None):
         super().__init__()
+        self.store = store  # optional MetricsStore, written from this worker's thread
         self.driver = driver
         self.hostname = hostname
         self.username = username
         self.password = password
-
-    def run(self):
-        try:
-            device_open = False
-
-            # Initialize NAPALM driver
-            self.driver = get_network_driver(self.driver)
-            driver = self.driver
-
-            # Handle NXOS - switch to SSH if detected
-            if 'nxos' in str(driver):
-                self.driver = 'nxos_ssh'
-                optional_args = {
-                    'transport': 'ssh',
-                    'port': 22
-                }
-                driver = get_network_driver(self.driver)
-                device = driver(
-                    hostname=self.hostname,
-                    username=self.username,
-                    password=self.password,
-                    optional_args=optional_args
-                )
-
-            # Handle EOS with proper scope for SSH connection
-            elif 'eos' in str(self.driver):
-                optional_args = {
-                     'transport': 'ssh',
-                'use_eapi': False
-                }
-
-                device = driver(
-                    hostname=self.hostname,
-                    username=self.username,
-                    password=self.password,
-                    optional_args=optional_args
-                )
-
-            # Handle all other device types
-            else:
-                device = driver(
-                    hostname=self.hostname,
-                    username=self.username,
-                    password=self.password
-                )
-
-            device.open()
-            device_open = True
-            self.facts = device.get_facts()
-
-            # If "Kernel" in hostname, it's possibly a Nexus device using ios driver
-            if "Kernel" in self.facts['hostname']:
-                device.close()
-                driver = get_network_driver('nxos_ssh')
-                optional_args = {
-                    'transport': 'ssh',
-                    'port': 22
-                }
-                device = driver(
-                    hostname=self.hostname,
-                    username=self.username,
-                    password=self.password,
-                    optional_args=optional_args
-                )
-                device.open()
-                device_open = True
-
-            spanning_tree_output = device.cli(['show spanning-tree'])
-            if 'root' in str(spanning_tree_output).lower():
-                is_switch = True
-            else:
-                is_switch = False
-
-            self.facts = device.get_facts()
-            self.facts['is_switch'] = is_switch
-            self.facts_ready.emit(self.facts)
-
-            # Get interface info using custom parser
-            custom = CustomDriver(device)
-            interfaces, counters = custom.get_interfaces_custom()
-            self.interfaces_ready.emit({"interfaces": interfaces, "counters": counters})
+        self.poller = DevicePoller(hostname, driver, hostname, username, password,
+                                   intervals=intervals, pacing=pacing)
+        self.session = self.poller.session
+        self.schedule = self.poller.schedule
+        self.pacer = self.poller.pacer
+
+        # Same subscribers as the headless daemon, plus the Qt signals
+        self.poller.subscribe(metrics_snapshot.on_poll_event)
+        if store is not None:
+            self.poller.subscribe(store.on_poll_event)
+        self.poller.subscribe(self.dispatch)
+
+    def signals(self):
+        """Getter name -> result signal"""
+        return {
+            'facts': self.facts_ready,
+            'interfaces': self.interfaces_ready,
+            'neighbors': self.neighbors_ready,
+            'routes': self.routes_ready,
+        }
+
+    def dispatch(self, event: PollEvent):
+        """Re-emit a poller event as a Qt signal"""
+        if not event.ok:
+            self.error.emit(event.error)
+            return
+        if event.getter == 'facts':
+            self.facts = event.result
+        if event.getter == 'interfaces':
             print("-------------- parsed data ------------------")
-            pprint(interfaces)
-
-            # Get neighbor info using NAPALM
-            lldp = device.get_lldp_neighbors()
-
-
-            try:
-                arp = device.get_arp_table()
-            except Exception as e:
-                print(f"Error retrieving arp: {e}")
-                arp = {}
-            self.neighbors_ready.emit({"lldp": lldp, "arp": arp})
-
-            # Get route information
-            try:
-                # Get raw CLI output for complete routing table
-                all_routes_output = device.cli(["show ip route"])
-                # Try to get structured route data for default route
-                default_route = {}
-                try:
-                    default_route = device.get_route_to("0.0.0.0/0")
-                except:
-                    pass  # Some platforms might not support this
-
-                route_info = {
-                    "structured_routes": default_route,
-                    "raw_output": all_routes_output.get("show ip route", "")
-                }
-                self.routes_ready.emit(route_info)
-
-            except Exception as e:
-                print("Error getting routes:", str(e))
-                self.routes_ready.emit({})
-
-            device.close()
+            pprint(event.result["interfaces"])
+        self.signals()[event.getter].emit(event.result)
 
+    @pyqtSlot()
+    def poll(self):
+        """Run the getters that are due on the open session"""
+        ok = False
+        try:
+            ok = self.poller.poll()
         except Exception as e:
             traceback.print_exc()
-            self.error.emit(str(e))    # def run(self):
-    #     try:
-    #         # Initialize NAPALM driver
-    #         self.driver = get_network_driver(self.driver)
-    #         driver = self.driver
-    #
-    #         optional_args = {}
-    #
-    #         # Handle NXOS - switch to SSH if detected
-    #         if 'nxos' in str(driver):
-    #             self.driver = 'nxos_ssh'
-    #             optional_args = {
-    #                 'transport': 'ssh',
-    #                 'port': 22
-    #             }
-    #             driver = get_network_driver(self.driver)
-    #
-    #         # Handle EOS - force SSH instead of pyeapi
-    #         elif self.driver == 'eos':
-    #             optional_args = {
-    #                 'transport': 'ssh',
-    #                 'use_eapi': False
-    #             }
-    #
-    #         # Initialize device with optional arguments
-    #         device = driver(
-    #             hostname=self.hostname,
-    #             username=self.username,
-    #             password=self.password,
-    #             optional_args=optional_args
-    #         )
-    #
-    #         device.open()
-    #         self.facts = device.get_facts()
-    #
-    #         # If "Kernel" in hostname, it's possibly a Nexus device using ios driver
-    #         if "Kernel" in self.facts['hostname']:
-    #             device.close()
-    #             driver = get_network_driver('nxos_ssh')
-    #             optional_args = {
-    #                 'transport': 'ssh',
-    #                 'port': 22
-    #             }
-    #             device = driver(
-    #                 hostname=self.hostname,
-    #                 username=self.username,
-    #                 password=self.password,
-    #                 optional_args=optional_args
-    #             )
-    #             device.open()
-    #
-    #         spanning_tree_output = device.cli(['show spanning-tree'])
-    #         if 'root' in str(spanning_tree_output).lower():
-    #             is_switch = True
-    #         else:
-    #             is_switch = False
-    #
-    #         self.facts = device.get_facts()
-    #         self.facts['is_switch'] = is_switch
-    #         self.facts_ready.emit(self.facts)
-    #
-    #         # Get interface info using custom parser
-    #         custom = CustomDriver(device)
-    #         interfaces, counters = custom.get_interfaces_custom()
-    #         self.interfaces_ready.emit({"interfaces""": interfaces, "counters": counters})
-    #         print("-------------- parsed data ------------------")
-    #         pprint(interfaces)
-    #         # Get neighbor info using NAPALM
-    #         lldp = device.get_lldp_neighbors()
-    #         arp = device.get_arp_table()
-    #         self.neighbors_ready.emit({"lldp": lldp, "arp": arp})
-    #
-    #         # Get route information
-    #         try:
-    #             # Get raw CLI output for complete routing table
-    #             all_routes_output = device.cli(["show ip route"])
-    #             # Try to get structured route data for default route
-    #             default_route = {}
-    #             try:
-    #                 default_route = device.get_route_to("0.0.0.0/0")
-    #             except:
-    #                 pass  # Some platforms might not support this
-    #
-    #             route_info = {
-    #                 "structured_routes": default_route,
-    #                 "raw_output": all_routes_output.get("show ip route", "")
-    #             }
-    #             self.routes_ready.emit(route_info)
-    #
-    #         except Exception as e:
-    #             print("Error getting routes:", str(e))
-    #             self.routes_ready.emit({})
-    #
-    #         device.close()
-    #
-    #     except Exception as e:
-    #         traceback.print_exc()
-    #         self.error.emit(str(e))
\ No newline at end of file
+            self.session.close()
+            self.error.emit(str(e))
+        finally:
+            self.poll_finished.emit(self.poller.next_delay(), ok)
+
+    @pyqtSlot(list)
+    def refresh(self, names):
+        """
+        On-demand refresh of specific getters, e.g. when their tab is opened.
+
+        Only getters whose last result is older than their tier are polled,
+        so flipping between tabs does not resend 'show ip route' every time.
+        """
+        names = self.schedule.stale(names)
+        if not names:
+            return
+        self.poller.force(names)
+        self.poll()
+
+    def close(self):
+        """Close the NAPALM session; call once the worker thread has stopped"""
+        self.poller.close()
+        metrics_snapshot.remove_device(self.hostname)
+        if self.store is not None:
+            self.store.flush()
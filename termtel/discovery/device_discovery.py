@@ -4,6 +4,7 @@ import paramiko
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
+from termtel.ssh.expect import read_until_prompt, detect_prompt
 from termtel.tfsm_fire import TextFSMAutoEngine
 
 
@@ -25,6 +26,7 @@ class DeviceDiscovery:
         self.verbose = verbose
         self.logger = self._setup_logger()
         self.engine = TextFSMAutoEngine(template_db, verbose)
+        self.prompt = None
 
     def _setup_logger(self) -> logging.Logger:
         """Configure logging"""
@@ -104,6 +106,10 @@ class DeviceDiscovery:
             channel = client.invoke_shell()
             channel.settimeout(ssh_timeout)
 
+            # Commands complete when this prompt comes back
+            self.prompt = detect_prompt(channel)
+            self.logger.debug(f"Detected prompt: {self.prompt}")
+
             # Disable pagination
             self._send_command(channel, "terminal length 0")
 
@@ -150,25 +156,20 @@ class DeviceDiscovery:
         """Get neighbor information based on device type"""
         try:
             if device_type.lower() == 'cisco_ios':
-                return self._send_command(channel, "show cdp neighbors detail", wait_time=5)
+                return self._send_command(channel, "show cdp neighbors detail", timeout=60)
             elif device_type.lower() == 'arista_eos':
-                return self._send_command(channel, "show lldp neighbors detail", wait_time=5)
+                return self._send_command(channel, "show lldp neighbors detail", timeout=60)
             return None
         except Exception as e:
             self.logger.warning(f"Failed to get neighbor data: {str(e)}")
             return None
 
     def _send_command(self, channel: paramiko.Channel, command: str,
-                      wait_time: float = 2) -> str:
-        """Send command and wait for output"""
+                      timeout: float = 30, idle_timeout: float = 5) -> str:
+        """Send command and return its output once the prompt comes back"""
         try:
             channel.send(command + "\n")
-            time.sleep(wait_time)  # Wait for command completion
-
-            output = ""
-            while channel.recv_ready():
-                output += channel.recv(4096).decode('utf-8')
-            return output
+            return read_until_prompt(channel, self.prompt, timeout=timeout, idle_timeout=idle_timeout)
         except Exception as e:
             raise Exception(f"Command '{command}' failed: {str(e)}")
 
@@ -0,0 +1,195 @@
+"""
+On-disk cache of device fingerprint results.
+
+Fingerprinting costs a login plus several commands, so results are kept per
+host:port in the Termtel config directory (plain host for port 22, so devices
+behind one terminal server on different ports get their own entries). Entries younger than the TTL are used
+as-is; older entries are revalidated with a cheap prompt check before reuse,
+and an entry is dropped when the device's serial number no longer matches.
+"""
+import json
+import os
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+from termtel.helpers.settings import get_config_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 60 * 60
+SERIAL_KEYS = ('SERIAL', 'SERIAL_NUMBER', 'SERIALNUM', 'SERIAL_NUM', 'SN')
+
+
+def extract_serial(parsed_data) -> Optional[str]:
+    """Pull a serial number out of parsed 'show version' data, if the template provides one"""
+    records = parsed_data if isinstance(parsed_data, list) else [parsed_data]
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        for key in SERIAL_KEYS:
+            value = record.get(key) or record.get(key.lower())
+            if isinstance(value, list):
+                value = value[0] if value else None
+            if value:
+                return str(value).strip()
+    return None
+
+
+class FingerprintCache:
+    """JSON backed cache of fingerprint results keyed by host"""
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = DEFAULT_TTL):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self._entries: Dict[str, dict] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(host: str, port=22) -> str:
+        key = str(host).strip().lower()
+        port = int(port or 22)
+        return key if port == 22 else f"{key}:{port}"
+
+    def get(self, host: str, port=22) -> Optional[dict]:
+        """Cached entry for host:port regardless of age, or None"""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(self.make_key(host, port))
+            return dict(entry) if entry else None
+
+    def is_fresh(self, entry: dict) -> bool:
+        """True if the entry was validated within the TTL"""
+        return time.time() - entry.get('validated_at', 0) < self.ttl
+
+    def put(self, host: str, result: dict, driver: Optional[str] = None, prompt: Optional[str] = None,
+            save: bool = True, port=22) -> dict:
+        """
+        Store a successful fingerprint_device() result for host.
+
+        Bulk callers pass save=False and call flush() once at the end.
+        """
+        device_info = result['device_info']
+        now = time.time()
+        entry = {
+            'vendor': device_info.get('vendor'),
+            'paging_commands': device_info.get('paging_commands', []),
+            'template': device_info.get('template'),
+            'parsed_data': device_info.get('parsed_data'),
+            'driver': driver,
+            'prompt': prompt or device_info.get('detected_prompt'),
+            'serial': extract_serial(device_info.get('parsed_data')),
+            'fingerprinted_at': now,
+            'validated_at': now,
+        }
+        with self._lock:
+            self._load()
+            key = self.make_key(host, port)
+            # Keep a switch/router role learned by the telemetry session
+            previous = self._entries.get(key) or {}
+            if isinstance(previous.get('is_switch'), bool):
+                entry['is_switch'] = previous['is_switch']
+            self._entries[key] = entry
+            if save:
+                self._save()
+        return dict(entry)
+
+    def flush(self) -> None:
+        """Write pending entries to disk"""
+        with self._lock:
+            self._load()
+            self._save()
+
+    def touch(self, host: str, port=22) -> None:
+        """Mark an entry as revalidated now"""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(self.make_key(host, port))
+            if entry:
+                entry['validated_at'] = time.time()
+                self._save()
+
+    def update(self, host: str, create: bool = False, port=22, **fields) -> None:
+        """
+        Update fields of an existing entry, e.g. a serial learned from NAPALM facts.
+
+        With create=True a host without an entry gets one holding just these
+        fields; it has no driver or validation time, so it never stands in for
+        a fingerprint.
+        """
+        with self._lock:
+            self._load()
+            key = self.make_key(host, port)
+            entry = self._entries.get(key)
+            if entry is None and create:
+                entry = self._entries[key] = {}
+            if entry is not None:
+                entry.update(fields)
+                self._save()
+
+    def invalidate(self, host: str, port=22) -> None:
+        """Drop the entry for host so the next connect fingerprints again"""
+        with self._lock:
+            self._load()
+            if self._entries.pop(self.make_key(host, port), None) is not None:
+                logger.info(f"Invalidated cached fingerprint for {host}")
+                self._save()
+
+    def check_serial(self, host: str, serial: Optional[str], port=22) -> bool:
+        """
+        Compare a freshly reported serial with the cached one.
+
+        Records the serial if none is cached yet. Returns False and invalidates
+        the entry if the device behind this host has changed.
+        """
+        if not serial:
+            return True
+        entry = self.get(host, port)
+        if not entry:
+            return True
+        cached = entry.get('serial')
+        if not cached:
+            self.update(host, port=port, serial=str(serial).strip())
+            return True
+        if cached.lower() != str(serial).strip().lower():
+            logger.warning(f"Serial for {host} changed ({cached} -> {serial})")
+            self.invalidate(host, port)
+            return False
+        return True
+
+    def _file(self) -> Path:
+        if self.path is None:
+            self.path = get_config_dir() / "fingerprint_cache.json"
+        return self.path
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        path = self._file()
+        if not path.exists():
+            return
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = data
+        except Exception as e:
+            logger.error(f"Failed to load fingerprint cache {path}: {e}")
+
+    def _save(self) -> None:
+        path = self._file()
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f, indent=2, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Failed to save fingerprint cache {path}: {e}")
+
+
+# Process-wide cache shared by the dashboard and the fingerprinting CLI
+fingerprint_cache = FingerprintCache()
@@ -17,9 +17,49 @@ DEFAULT_SETTINGS = {
     },
 'view_settings': {  # New section for view settings
         'telemetry_visible': True
+    },
+    'telemetry': {
+        'fingerprint_cache_ttl': 86400,  # Seconds before a cached fingerprint is revalidated
+        'engine_concurrency': 8,  # Devices polled at the same time across all dashboards
+        'history_retention': 14400,  # Seconds of interface history kept in memory
+        'store_enabled': True,  # Keep telemetry history on disk (telemetry.db)
+        'store_raw_retention': 86400,  # Seconds of full-resolution history on disk
+        'store_rollup_interval': 300,  # Bucket size of the downsampled history
+        'store_rollup_retention': 2592000,  # Seconds of downsampled history on disk
+        'poll_jitter': 0.1,  # Fraction of the dashboard poll delay randomized per cycle
+        'poll_backoff_max': 600,  # Longest delay between retries of a failing device
+        'poll_adaptive': False,  # Poll interfaces faster while utilization is changing
+        'poll_intervals': {  # Seconds between polls of each dashboard getter
+            'facts': 300,
+            'interfaces': 10,
+            'neighbors': 60,
+            'routes': 300
+        }
+    },
+    'reachability': {
+        'enabled': True,
+        'concurrency': 100,  # Simultaneous TCP probes
+        'timeout': 3,  # Seconds per probe
+        'ttl': 60,  # Seconds a probe result stays valid
+        'interval': 120  # Seconds between background rescans of the session tree
     }
 }
 
+
+def get_config_dir(app_name: str = "Termtel") -> Path:
+    """Get the appropriate configuration directory for the current platform."""
+    if sys.platform == "win32":
+        base_dir = Path(os.environ["APPDATA"])
+    elif sys.platform == "darwin":
+        base_dir = Path.home() / "Library" / "Application Support"
+    else:  # Linux and other Unix-like
+        base_dir = Path.home() / ".config"
+
+    config_dir = base_dir / app_name
+    config_dir.mkdir(parents=True, exist_ok=True)
+    return config_dir
+
+
 class SettingsManager:
     """Manages application settings with focus on theme preferences."""
 
@@ -32,16 +72,7 @@ class SettingsManager:
 
     def _get_config_dir(self) -> Path:
         """Get the appropriate configuration directory for the current platform."""
-        if sys.platform == "win32":
-            base_dir = Path(os.environ["APPDATA"])
-        elif sys.platform == "darwin":
-            base_dir = Path.home() / "Library" / "Application Support"
-        else:  # Linux and other Unix-like
-            base_dir = Path.home() / ".config"
-
-        config_dir = base_dir / self.app_name
-        config_dir.mkdir(parents=True, exist_ok=True)
-        return config_dir
+        return get_config_dir(self.app_name)
 
     def load_settings(self) -> None:
         """Load settings from file, creating default if none exists."""
@@ -56,6 +87,12 @@ class SettingsManager:
                     # Update view_settings section
                     if 'view_settings' in loaded_settings:
                         self._settings['view_settings'].update(loaded_settings.get('view_settings', {}))
+                    # Update telemetry section
+                    if 'telemetry' in loaded_settings:
+                        self._settings['telemetry'].update(loaded_settings.get('telemetry', {}))
+                    # Update reachability section
+                    if 'reachability' in loaded_settings:
+                        self._settings['reachability'].update(loaded_settings.get('reachability', {}))
             else:
                 logger.info("No settings file found, creating with defaults")
                 self._settings = DEFAULT_SETTINGS.copy()
@@ -132,3 +169,20 @@ class SettingsManager:
             logger.error(f"Failed to set view setting {key}: {e}")
             return False
 
+    def get(self, section: str, key: str, default: any = None) -> any:
+        """Get a setting from any section, falling back to the built-in default."""
+        try:
+            fallback = DEFAULT_SETTINGS.get(section, {}).get(key, default)
+            return self._settings.get(section, {}).get(key, fallback)
+        except Exception as e:
+            logger.error(f"Failed to get setting {section}.{key}: {e}")
+            return default
+
+    def get_telemetry_setting(self, key: str, default: any = None) -> any:
+        """Get a telemetry-related setting."""
+        try:
+            fallback = DEFAULT_SETTINGS['telemetry'].get(key, default)
+            return self._settings.get('telemetry', {}).get(key, fallback)
+        except Exception as e:
+            logger.error(f"Failed to get telemetry setting {key}: {e}")
+            return default
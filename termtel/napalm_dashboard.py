@@ -1,8 +1,10 @@
+import functools
 import ipaddress
 import math
 import sys
 import traceback
-from time import sleep
+from collections import Counter, defaultdict, deque
+from time import sleep, strftime, localtime, perf_counter
 
 # PyQt imports
 from PyQt6.QtSvgWidgets import QSvgWidget
@@ -12,7 +14,7 @@ from PyQt6.QtWidgets import (
     QMessageBox, QTextEdit, QSizePolicy, QApplication, QDialog
 )
 from PyQt6.QtCharts import QChartView, QValueAxis, QChart, QLineSeries
-from PyQt6.QtCore import Qt, QTimer, QByteArray, QMargins, QThread, QObject, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, QByteArray, QMargins, QThread, QObject, pyqtSignal, QPointF
 from PyQt6.QtGui import QFont, QColor, QPen, QPainter
 
 from termtel.helpers.credslib import SecureCredentials
@@ -22,8 +24,39 @@ from termtel.themes2 import ThemeLibrary, LayeredHUDFrame, ThemeColors
 # from hud import (apply_hud_styling, setup_chart_style, style_series, get_router_svg, get_switch_svg)
 from termtel.hud_icons import get_switch_svg, get_discovering_svg, get_router_svg, get_unknown_svg
 
-from termtel.device_info_worker import DeviceInfoWorker
+from termtel.telemetry.bus import shared_bus
+from termtel.telemetry.poller import GETTERS
+from termtel.telemetry.schedule import PollSchedule
+from termtel.telemetry.snapshot import metrics_snapshot
+from termtel.telemetry.ringbuffer import InterfaceHistory, decimate_minmax
+from termtel.telemetry.store import metrics_store
+from termtel.telemetry.spans import spans
+from termtel.telemetry.route_index import RouteIndex
+from termtel.telemetry.routes import RouteTable, parse_routes, build_route_index
 from termtel.device_fingerprint import DeviceFingerprinter
+from termtel.fingerprint_cache import fingerprint_cache
+from termtel.telemetry.neighbors import ARP_COLUMNS, LLDP_COLUMNS, NeighborTable, ip_sort_keys
+from termtel.widgets.telemetry_models import (
+    ColumnTableModel, KeyedTableModel, RouteTableModel, create_table_view, create_virtual_table_view,
+    selected_key
+)
+
+
+# Lines of raw 'show ip route' shown in the Raw Output tab
+RAW_ROUTE_LINES = 5000
+# Route changes kept in the churn feed
+CHURN_FEED_LENGTH = 1000
+
+
+def ui_span(stage):
+    """Time a dashboard slot as a span of the connected device"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            with spans.span(self.span_device(), stage):
+                return method(self, *args)
+        return wrapper
+    return decorator
 
 
 class FingerprintWorker(QObject):
@@ -39,8 +72,25 @@ class FingerprintWorker(QObject):
         self.password = password
 
     def run(self):
+        started = perf_counter()
         try:
             fingerprinter = DeviceFingerprinter(verbose=True)
+
+            # Reuse a cached fingerprint; stale entries only need a prompt check
+            cached = fingerprint_cache.get(self.hostname)
+            if cached and cached.get('driver'):
+                if fingerprint_cache.is_fresh(cached):
+                    print(f"Using cached fingerprint for {self.hostname}: {cached['driver']}")
+                    self.driver_detected.emit(cached['driver'])
+                    return
+                prompt = fingerprinter.check_prompt(self.hostname, self.username, self.password)
+                if prompt and prompt == cached.get('prompt'):
+                    print(f"Revalidated cached fingerprint for {self.hostname}: {cached['driver']}")
+                    fingerprint_cache.touch(self.hostname)
+                    self.driver_detected.emit(cached['driver'])
+                    return
+                fingerprint_cache.invalidate(self.hostname)
+
             result = fingerprinter.fingerprint_device(
                 host=self.hostname,
                 username=self.username,
@@ -51,25 +101,29 @@ class FingerprintWorker(QObject):
                 raise Exception(result.get("error", "Unknown error in device detection"))
 
             device_info = result["device_info"]
-            vendor = device_info["vendor"]
-            template = device_info["template"]
-
-            # Map fingerprint results to NAPALM drivers
-            if "arista" in vendor.lower() or "arista_eos" in template.lower():
-                driver = "eos"
-            elif "cisco_nxos" in template.lower():
-                driver = "nxos"
-            elif "cisco" in vendor.lower():
-                driver = "ios"
-            else:
-                raise Exception(f"Unsupported device type detected: {vendor}")
+            driver = self.map_driver(device_info["vendor"], device_info["template"])
+            fingerprint_cache.put(self.hostname, result, driver=driver)
 
             self.driver_detected.emit(driver)
         except Exception as e:
             self.error.emit(str(e))
         finally:
+            spans.record(self.hostname, 'fingerprint', perf_counter() - started)
             self.finished.emit()
 
+    @staticmethod
+    def map_driver(vendor, template):
+        """Map fingerprint results to NAPALM drivers"""
+        vendor = (vendor or "").lower()
+        template = (template or "").lower()
+        if "arista" in vendor or "arista_eos" in template:
+            return "eos"
+        elif "cisco_nxos" in template:
+            return "nxos"
+        elif "cisco" in vendor:
+            return "ios"
+        raise Exception(f"Unsupported device type detected: {vendor}")
+
 class DeviceDashboardWidget(QMainWindow):
     def __init__(self, parent=None):
         super().__init__()
@@ -89,12 +143,25 @@ class DeviceDashboardWidget(QMainWindow):
 
         self.setWindowTitle("Network Device Dashboard")
         self.setGeometry(100, 100, 1400, 900)
-        # Initialize history tracking
-        self.interface_history = {}
-        self.interface_speeds = {}
-        self.history_length = 30
         self.theme = parent.theme
 
+        self.settings_manager = settings_manager = getattr(self.refparent, 'settings_manager', None)
+        self.poll_intervals = None
+        history_retention = 4 * 3600
+        if settings_manager is not None:
+            fingerprint_cache.ttl = settings_manager.get_telemetry_setting('fingerprint_cache_ttl')
+            self.poll_intervals = settings_manager.get_telemetry_setting('poll_intervals')
+            history_retention = settings_manager.get_telemetry_setting('history_retention', history_retention)
+
+        # Initialize history tracking: interface x time ring buffer of total rate (bps)
+        self.interface_history = InterfaceHistory(
+            retention=history_retention,
+            interval=PollSchedule(self.poll_intervals).intervals['interfaces']
+        )
+        self.interface_speeds = {}
+        # On-disk history, so the graph survives a restart (None if disabled)
+        self.metrics_store = metrics_store(settings_manager)
+
         self.cred_manager = self.refparent.cred_manager
         # parent no set yet
         # self.cred_manager.unlock(parent.master_password)
@@ -106,11 +173,10 @@ class DeviceDashboardWidget(QMainWindow):
         # self.load_credentials()
         self.custom_driver = None  # Initialize custom_driver
         self.device = None  # Initialize device
-        self.worker = None
-        self.worker_thread = None
-        self.refresh_timer = QTimer()
-        self.refresh_timer.setInterval(30000)
-        self.refresh_timer.timeout.connect(self.refresh_data)
+        # Polled by the application-wide engine; results arrive on the UI thread via the bus
+        self.bus = None
+        self.device_id = None
+        self.poll_failing = False
 
     def setup_ui(self):
         central_widget = QWidget()
@@ -152,16 +218,23 @@ class DeviceDashboardWidget(QMainWindow):
 
     def disconnect_device(self):
         self.cleanup_worker()
-        self.refresh_timer.stop()
         self.is_connected = False
         self.connect_button.setText("Connect")
+        self.interface_history.clear()
+        self.interface_speeds.clear()
+        self.clear_graph()
 
         # Clear data but preserve tabs
         self.device_info.clear()
-        self.interfaces_tree.clear()
-        self.lldp_tree.clear()
-        self.arp_tree.clear()
-        self.route_tree.clear()
+        for model in (self.interface_model, self.lldp_model, self.arp_model, self.route_model):
+            model.clear()
+        self.route_columns_sized = False
+        self.route_table = RouteTable()
+        self.route_index = RouteIndex()
+        self.route_raw_output = None
+        self.neighbor_table = NeighborTable()
+        self.neighbor_search_count.setText("")
+        self.clear_churn()
 
     def handle_connect(self):
         """Handle the connect button click."""
@@ -355,12 +428,16 @@ class DeviceDashboardWidget(QMainWindow):
         split_layout.setContentsMargins(8, 8, 8, 8)
 
         list_layout = QVBoxLayout()
-        self.interfaces_tree = QTreeWidget()
-        self.interfaces_tree.setHeaderLabels(["INTERFACE", "STATUS", "UTILIZATION"])
+        self.interface_model = KeyedTableModel(
+            ["INTERFACE", "STATUS", "UTILIZATION"],
+            formatters={2: lambda value: f"{value:.1f}%"}
+        )
+        self.interface_model.foreground = self.interface_status_color
+        self.interfaces_tree = create_table_view(self.interface_model)
         self.interfaces_tree.setColumnWidth(0, 150)
         self.interfaces_tree.setColumnWidth(1, 80)
         self.interfaces_tree.setColumnWidth(2, 100)
-        self.interfaces_tree.itemSelectionChanged.connect(self.update_interface_graph)
+        self.interfaces_tree.selectionModel().selectionChanged.connect(self.update_interface_graph)
         list_layout.addWidget(self.interfaces_tree)
 
         self.chart = QChart()
@@ -385,15 +462,28 @@ class DeviceDashboardWidget(QMainWindow):
         layout = QVBoxLayout()
         layout.setContentsMargins(8, 8, 8, 8)
 
+        # Instant search over the indexes built on the polling thread
+        search_layout = QHBoxLayout()
+        self.neighbor_search = QLineEdit()
+        self.neighbor_search.setPlaceholderText("Search IP, MAC (or partial MAC), interface or neighbor")
+        self.neighbor_search.textChanged.connect(self.apply_neighbor_search)
+        self.neighbor_search_count = QLabel("")
+        search_layout.addWidget(self.neighbor_search)
+        search_layout.addWidget(self.neighbor_search_count)
+        layout.addLayout(search_layout)
+
+        self.neighbor_table = NeighborTable()
         self.neighbors_tabs = QTabWidget()
-        self.lldp_tree = QTreeWidget()
-        self.lldp_tree.setHeaderLabels(["Local Port", "Neighbor", "Remote Port"])
+        self.lldp_model = ColumnTableModel(LLDP_COLUMNS, key_columns=(0, 1))
+        self.lldp_tree = create_virtual_table_view(self.lldp_model)
         self.neighbors_tabs.addTab(self.lldp_tree, "LLDP")
 
-        self.arp_tree = QTreeWidget()
-        self.arp_tree.setHeaderLabels(["IP Address", "MAC Address", "Interface"])
+        self.arp_model = ColumnTableModel(ARP_COLUMNS, sort_keys={0: ip_sort_keys}, key_columns=(0,))
+        self.arp_tree = create_virtual_table_view(self.arp_model)
         self.neighbors_tabs.addTab(self.arp_tree, "ARP")
 
+        # Opening a tab fetches fresh data instead of waiting for the slow tier
+        self.neighbors_tabs.currentChanged.connect(lambda index: self.request_refresh('neighbors'))
         layout.addWidget(self.neighbors_tabs)
         container.content_layout.addLayout(layout)
         return container
@@ -421,8 +511,14 @@ class DeviceDashboardWidget(QMainWindow):
         table_layout = QVBoxLayout(table_container)
         table_layout.setContentsMargins(0, 0, 0, 0)
 
-        self.route_tree = QTreeWidget()
-        self.route_tree.setHeaderLabels(["Network", "Mask", "Next Hop", "Protocol", "Interface", "Metric"])
+        # Virtual model: only visible rows are ever rendered
+        self.route_model = RouteTableModel()
+        self.route_model.foreground = self.route_protocol_color
+        self.route_tree = create_virtual_table_view(self.route_model)
+        self.route_columns_sized = False
+        self.route_table = RouteTable()
+        self.route_index = RouteIndex()
+        self.route_raw_output = None
         self.route_tree.setColumnWidth(0, 150)
         table_layout.addWidget(self.route_tree)
         self.route_tabs.addTab(table_container, "Table View")
@@ -436,18 +532,49 @@ class DeviceDashboardWidget(QMainWindow):
         raw_layout.addWidget(self.route_raw)
         self.route_tabs.addTab(raw_container, "Raw Output")
 
+        # Route changes between polls, newest first, with per-protocol totals
+        churn_container = QWidget()
+        churn_layout = QVBoxLayout(churn_container)
+        churn_layout.setContentsMargins(0, 0, 0, 0)
+        self.churn_summary = QLabel("No route changes")
+        self.churn_summary.setFont(QFont("Courier New", 9))
+        self.churn_model = KeyedTableModel(
+            ["Time", "Change", "Prefix", "Protocol", "Old Next Hop", "New Next Hop"],
+            formatters={0: lambda value: strftime("%H:%M:%S", localtime(value))}
+        )
+        self.churn_view = create_table_view(self.churn_model)
+        self.churn_view.sortByColumn(0, Qt.SortOrder.DescendingOrder)
+        self.churn_events = deque(maxlen=CHURN_FEED_LENGTH)
+        self.churn_counts = defaultdict(Counter)
+        self.churn_sequence = 0
+        churn_layout.addWidget(self.churn_summary)
+        churn_layout.addWidget(self.churn_view)
+        self.route_tabs.addTab(churn_container, "Churn")
+
+        self.route_tabs.currentChanged.connect(lambda index: self.request_refresh('routes'))
         layout.addWidget(self.route_tabs)
         container.content_layout.addLayout(layout)
         return container
 
     def cleanup_worker(self):
-        """Clean up existing worker thread."""
-        if self.worker_thread and self.worker_thread.isRunning():
-            print("Cleaning up existing worker thread")
-            self.worker_thread.quit()
-            self.worker_thread.wait()
-        self.worker = None
-        self.worker_thread = None
+        """Stop watching the device; the engine closes its session once any running poll ends."""
+        if self.bus is not None:
+            try:
+                self.bus.result_ready.disconnect(self.on_poll_result)
+                self.bus.device_error.disconnect(self.on_poll_error)
+            except TypeError:
+                pass
+            if self.device_id is not None:
+                print(f"Stopped polling {self.device_id}")
+                self.bus.engine.remove_device(self.device_id)
+                metrics_snapshot.remove_device(self.device_id)
+                if self.metrics_store is not None:
+                    self.metrics_store.flush()
+        self.device_id = None
+
+    def closeEvent(self, event):
+        self.cleanup_worker()
+        super().closeEvent(event)
 
     def detect_device_type(self, hostname, username, password):
 
@@ -550,7 +677,7 @@ class DeviceDashboardWidget(QMainWindow):
             self.set_device_icon()
 
     def start_device_worker(self, hostname, username, password, driver):
-        """Start the main device worker with the detected/selected driver"""
+        """Start polling the device with the detected/selected driver"""
         try:
             print(f"Starting connection to {hostname} with driver {driver}")
 
@@ -562,31 +689,48 @@ class DeviceDashboardWidget(QMainWindow):
                 'password': password
             }
 
-            # Create new thread and worker
-            self.worker_thread = QThread()
-            self.worker = DeviceInfoWorker(driver, hostname, username, password)
-            self.worker.moveToThread(self.worker_thread)
-
-            # Connect worker signals
-            self.worker.facts_ready.connect(self.update_device_info)
-            self.worker.interfaces_ready.connect(self.update_interfaces)
-            self.worker.neighbors_ready.connect(self.update_neighbors)
-            self.worker.routes_ready.connect(self.update_routes)
-            self.worker.error.connect(self.handle_error)
-
-            # Connect thread signals
-            self.worker_thread.started.connect(self.worker.run)
-            self.worker.finished.connect(self.worker_thread.quit)
-            self.worker.finished.connect(self.worker.deleteLater)
-            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
-
-            self.worker_thread.start()
-            self.refresh_timer.start()
+            # The shared engine keeps the session open, paces the device and
+            # caps how many devices are polled at once across all dashboards
+            self.cleanup_worker()
+            self.bus = shared_bus(self.settings_manager)
+            self.bus.result_ready.connect(self.on_poll_result)
+            self.bus.device_error.connect(self.on_poll_error)
+            self.poll_failing = False
+            self.device_id = hostname
+            self.bus.engine.add_device(hostname, driver, hostname, username, password,
+                                       intervals=self.poll_intervals)
 
         finally:
             self.connect_button.setEnabled(True)
             self.setCursor(Qt.CursorShape.ArrowCursor)
 
+    def span_device(self):
+        """Device name that UI spans are recorded under"""
+        return (getattr(self, 'current_connection', None) or {}).get('hostname', '')
+
+    def on_poll_result(self, device_id, getter, result):
+        """Route a getter result from the engine to its view"""
+        if device_id != self.device_id:
+            return
+        self.poll_failing = False
+        handler = {
+            'facts': self.update_device_info,
+            'interfaces': self.update_interfaces,
+            'neighbors': self.update_neighbors,
+            'routes': self.update_routes,
+        }.get(getter)
+        if handler is not None:
+            handler(result)
+
+    def on_poll_error(self, device_id, getter, error_msg):
+        if device_id == self.device_id:
+            self.handle_error(error_msg)
+
+    def request_refresh(self, *getters):
+        """Fetch specific getters now if their last result is older than their tier"""
+        if getattr(self, 'bus', None) is not None and getattr(self, 'device_id', None) is not None:
+            self.bus.engine.refresh(self.device_id, getters, stale_only=True)
+
     def handle_fingerprint_error(self, error_msg):
         """Handle errors from the fingerprint worker"""
         self.set_discovery_state(False)  # Reset discovery state
@@ -600,6 +744,7 @@ class DeviceDashboardWidget(QMainWindow):
 
     # Update the update_device_info method
 
+    @ui_span('ui.facts')
     def update_device_info(self, facts):
         """Modified update_device_info to use theme colors"""
         try:
@@ -610,6 +755,10 @@ class DeviceDashboardWidget(QMainWindow):
             self.set_device_icon(facts=facts)
             # Store facts for theme changes
             self.current_facts = facts
+            # A different serial means another device now answers on this host
+            connection = getattr(self, 'current_connection', None)
+            if connection:
+                fingerprint_cache.check_serial(connection['hostname'], facts.get('serial_number'))
             # Define key-value pairs to display
             key_facts = [
                 ("Hostname", facts.get('hostname', 'N/A')),
@@ -698,141 +847,120 @@ class DeviceDashboardWidget(QMainWindow):
         utilization = ((input_rate + output_rate) / (speed_mbps)) * 100
         return f"{utilization:.1f}%"
 
+    @ui_span('ui.interfaces')
     def update_interfaces(self, data):
         """Update interface display and store current rates"""
-        self.interfaces_tree.clear()
         interfaces = data.get('interfaces', {})
         counters = data.get('counters', {})
 
-        print("\nCurrent interface history sizes:")
-        for name, history in self.interface_history.items():
-            print(f"{name}: {len(history)} points")
+        print(f"\nInterface history: {len(self.interface_history)} samples "
+              f"for {len(self.interface_history.names)} interfaces")
 
+        totals = {}
+        rows = []
         for name, details in interfaces.items():
-            # Get raw rate data directly from the interface details
-            rx_rate = float(details.get('input_rate', 0))  # These are in bps
+            # Rates (bps), speed (Mbps) and utilization are computed once per poll
+            # by the session, from counter deltas where the device exposes them
+            rx_rate = float(details.get('input_rate', 0))
             tx_rate = float(details.get('output_rate', 0))
             total_rate = rx_rate + tx_rate
-
-            # Get speed from bandwidth (which comes in Kbit)
-            bandwidth_str = details.get('BANDWIDTH', '10000 Kbit')  # Default to 10Mbit
-            try:
-                if 'Kbit' in bandwidth_str:
-                    speed_mbps = float(bandwidth_str.split()[0]) / 1000  # Convert Kbit to Mbit
-                elif 'Mbit' in bandwidth_str:
-                    speed_mbps = float(bandwidth_str.split()[0])
-                elif 'Gbit' in bandwidth_str:
-                    speed_mbps = float(bandwidth_str.split()[0]) * 1000
-                else:
-                    speed_mbps = 10.0  # Default to 10Mbps if parsing fails
-            except (ValueError, IndexError):
-                speed_mbps = 10.0  # Default to 10Mbps if parsing fails
+            speed_mbps = float(details.get('speed') or 10.0)
+            utilization = float(details.get('utilization', 0.0))
 
             self.interface_speeds[name] = speed_mbps
+            totals[name] = total_rate
 
-            # Initialize history if needed
-            if name not in self.interface_history:
-                print(f"Initializing history for {name}")
-                self.interface_history[name] = []
+            status = "UP" if details.get('is_up') else "DOWN"
+            rows.append((name, (name, status, utilization)))
 
-            # Store current rate in history
-            self.interface_history[name].append(total_rate)
-            print(f"Added point to {name} - now has {len(self.interface_history[name])} points")
+            print(
+                f"{name} - Speed: {speed_mbps}Mbps, Total Rate: {total_rate / 1_000_000:.2f}Mbps, "
+                f"Utilization: {utilization:.2f}% ({details.get('rate_source', 'device')})")
 
-            # Trim history if needed
-            while len(self.interface_history[name]) > self.history_length:
-                self.interface_history[name].pop(0)
+        # One column write for every interface of this poll
+        self.interface_history.record(totals)
 
-            # Calculate utilization based on total rate
-            utilization = (total_rate / (speed_mbps * 1_000_000)) * 100
+        # Only changed cells are repainted; selection and scroll position survive
+        self.interface_model.set_rows(rows)
+        print(f"\nUpdated {len(interfaces)} interfaces")
 
-            # Update interface tree
-            status = "UP" if details.get('is_up') else "DOWN"
-            item = QTreeWidgetItem([
-                name,
-                status,
-                f"{utilization:.1f}%"
-            ])
-
-            if status == "UP":
-                item.setForeground(1, QColor("#22D3EE"))
-            else:
-                item.setForeground(1, QColor("#EF4444"))
+        if self.selected_interface():
+            self.update_interface_graph()
 
-            self.interfaces_tree.addTopLevelItem(item)
+    def selected_interface(self):
+        return selected_key(self.interfaces_tree)
 
-            print(
-                f"{name} - Speed: {speed_mbps}Mbps, Total Rate: {total_rate / 1_000_000:.2f}Mbps, Utilization: {utilization:.2f}%")
+    def interface_status_color(self, values, column):
+        if column != 1:
+            return None
+        theme_colors = self.theme_manager.get_colors(self._current_theme)
+        return QColor(theme_colors['success'] if values[1] == "UP" else theme_colors['error'])
+
+    @staticmethod
+    def route_protocol_color(values, column):
+        if column != 0:
+            return None
+        color = {'C': "#22D3EE", 'L': "#22D3EE", 'S': "#10B981", 'D': "#3B82F6", 'O': "#F59E0B"}.get(values[3][:1])
+        return QColor(color) if color else None
+
+    def interface_utilization(self, interface_name, speed_mbps):
+        """(timestamps, utilization %) for the graph, from disk when the store is enabled"""
+        connection = getattr(self, 'current_connection', None)
+        if self.metrics_store is not None and connection:
+            times, utilization = self.metrics_store.query(connection['hostname'], interface_name, 'utilization')
+            if len(times):
+                return times, utilization
+        # In-memory history holds total rate (bps); convert in one vectorized step
+        times, rates = self.interface_history.series(interface_name)
+        return times, rates * (100.0 / (float(speed_mbps) * 1_000_000))
+
+    def graph_series_for(self, interface_name):
+        """Persistent series for an interface, created and attached on first display"""
+        series = self.graph_series.get(interface_name)
+        if series is None:
+            series = QLineSeries()
+            pen = QPen(QColor("#00FF00"))
+            pen.setWidth(2)
+            series.setPen(pen)
+            self.chart.addSeries(series)
+            series.attachAxis(self.axis_x)
+            series.attachAxis(self.axis_y)
+            self.graph_series[interface_name] = series
+        return series
 
-        self.interfaces_tree.sortItems(0, Qt.SortOrder.AscendingOrder)
-        print(f"\nUpdated {len(interfaces)} interfaces")
+    def clear_graph(self):
+        self.chart.removeAllSeries()
+        self.graph_series = {}
 
     def update_interface_graph(self):
         """Update the interface graph with historical data."""
         try:
-            selected_items = self.interfaces_tree.selectedItems()
-            if not selected_items:
+            interface_name = self.selected_interface()
+            if not interface_name:
                 return
 
-            interface_name = selected_items[0].text(0)
-            if interface_name not in self.interface_history:
+            speed_mbps = self.interface_speeds.get(interface_name, 10.0)
+            times, utilization = self.interface_utilization(interface_name, speed_mbps)
+            if not len(times):
                 print(f"No history data for interface {interface_name}")
                 return
 
-            # Get interface speed and history
-            speed_mbps = self.interface_speeds.get(interface_name, 10.0)
-            history = self.interface_history[interface_name]
+            seconds_ago = times - times[-1]
+            current_util = float(utilization[-1])
+            max_util = float(utilization.max())
+            avg_util = float(utilization.mean())
 
-            print(f"\nUpdating graph for {interface_name}")
-            print(f"Interface speed: {speed_mbps} Mbps")
-            print(f"History points: {len(history)}")
+            # At most two points (min and max) per pixel column of the plot area
+            buckets = max(50, int(self.chart.plotArea().width()))
+            x, y = decimate_minmax(seconds_ago, utilization, buckets)
 
-            # Create series
-            series = QLineSeries()
-            max_util = 0.0
-            total_util = 0.0
-            current_util = 0.0
-
-            # Process each data point
-            for i, rate_bps in enumerate(history):
-                # Convert rate to utilization percentage
-                utilization = (float(rate_bps) / (float(speed_mbps) * 1_000_000)) * 100.0
-
-                # Store current utilization for display
-                if i == len(history) - 1:
-                    current_util = utilization
-
-                # Add point to series
-                series.append(float(i), float(utilization))
-                max_util = max(max_util, utilization)
-                total_util += utilization
-
-                print(f"Point {i}: {utilization:.2f}% ({rate_bps / 1_000_000:.2f} Mbps)")
-
-            # Calculate average
-            avg_util = total_util / len(history) if history else 0
-
-            # Clear and reconfigure chart
-            self.chart.removeAllSeries()
-
-            # Make sure axes are visible
-            self.axis_x.setVisible(True)
-            self.axis_y.setVisible(True)
-
-            # Configure series appearance
-            pen = QPen(QColor("#00FF00"))
-            pen.setWidth(2)
-            series.setPen(pen)
+            series = self.graph_series_for(interface_name)
+            series.replace([QPointF(px, py) for px, py in zip(x.tolist(), y.tolist())])
+            for name, other in self.graph_series.items():
+                other.setVisible(name == interface_name)
 
-            # Add series to chart
-            self.chart.addSeries(series)
-
-            # Explicitly attach axes
-            series.attachAxis(self.axis_x)
-            series.attachAxis(self.axis_y)
-
-            # Set up axis ranges
-            self.axis_x.setRange(0, 30)  # Fixed 30-second window
+            # Set up axis ranges: seconds before the latest sample
+            self.axis_x.setRange(min(float(seconds_ago[0]), -30.0), 0)
 
             if max_util > 0:
                 new_max = math.ceil(max_util / 5.0) * 5.0 + 5.0
@@ -841,7 +969,6 @@ class DeviceDashboardWidget(QMainWindow):
                 elif new_max < 20:
                     new_max = 20
                 self.axis_y.setRange(0, new_max)
-                print(f"Y-axis range set to 0-{new_max}%")
 
             # Update chart title
             self.chart.setTitle(
@@ -849,10 +976,6 @@ class DeviceDashboardWidget(QMainWindow):
                 f"Current: {current_util:.1f}% | Max: {max_util:.1f}% | Avg: {avg_util:.1f}%"
             )
 
-            # Force update
-            self.chart_view.update()
-            self.chart.update()
-
         except Exception as e:
             print(f"Error updating graph: {str(e)}")
             traceback.print_exc()
@@ -879,44 +1002,20 @@ class DeviceDashboardWidget(QMainWindow):
 
     # Modify refresh_data method
     def refresh_data(self):
-        """Refresh interface data and update history"""
+        """Ask the engine to poll every getter of the device now"""
         try:
             # Check if we have connection info
             if not hasattr(self, 'current_connection'):
                 print("No connection information available")
-                self.refresh_timer.stop()
                 return
 
-            # Clean up any existing worker thread
-            self.cleanup_worker()
-
-            # Create new thread and worker
-            conn = self.current_connection
-            print(f"Refreshing data for {conn['hostname']}")
-
-            self.worker_thread = QThread()
-            self.worker = DeviceInfoWorker(
-                conn['driver'],
-                conn['hostname'],
-                conn['username'],
-                conn['password']
-            )
-            self.worker.moveToThread(self.worker_thread)
-
-            # Connect worker signals
-            self.worker.facts_ready.connect(self.update_device_info)
-            self.worker.interfaces_ready.connect(self.update_interfaces)
-            self.worker.neighbors_ready.connect(self.update_neighbors)
-            self.worker.routes_ready.connect(self.update_routes)
-            self.worker.error.connect(self.handle_error)
-
-            # Connect thread signals
-            self.worker_thread.started.connect(self.worker.run)
-            self.worker.finished.connect(self.worker_thread.quit)
-            self.worker.finished.connect(self.worker.deleteLater)
-            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
+            if self.bus is None or self.device_id is None:
+                conn = self.current_connection
+                self.start_device_worker(conn['hostname'], conn['username'], conn['password'], conn['driver'])
+                return
 
-            self.worker_thread.start()
+            print(f"Refreshing data for {self.current_connection['hostname']}")
+            self.bus.engine.refresh(self.device_id, GETTERS)
 
         except Exception as e:
             print(f"Error in refresh_data: {str(e)}")
@@ -928,7 +1027,7 @@ class DeviceDashboardWidget(QMainWindow):
         theme_colors = self.theme_manager.get_colors(self._current_theme)
 
         # Clear and configure chart
-        self.chart.removeAllSeries()
+        self.clear_graph()
         self.chart.setBackgroundVisible(False)
         self.chart.setPlotAreaBackgroundVisible(True)
         self.chart.setBackgroundBrush(QColor(0, 0, 0, 0))
@@ -974,42 +1073,61 @@ class DeviceDashboardWidget(QMainWindow):
         self.chart.addAxis(self.axis_x, Qt.AlignmentFlag.AlignBottom)
         self.chart.addAxis(self.axis_y, Qt.AlignmentFlag.AlignLeft)
 
+    @ui_span('ui.neighbors')
     def update_neighbors(self, data):
-        self.lldp_tree.clear()
-        lldp = data.get('lldp', {})
-        for local_port in lldp:
-            neighbors = lldp[local_port]
-            j = 0
-            while j < len(neighbors):
-                neighbor = neighbors[j]
-                item = QTreeWidgetItem([
-                    local_port,
-                    neighbor.get('hostname', 'N/A'),
-                    neighbor.get('port', 'N/A')
-                ])
-                self.lldp_tree.addTopLevelItem(item)
-                j = j + 1
-
-        self.arp_tree.clear()
-        arp = data.get('arp', [])
-        i = 0
-        while i < len(arp):
-            entry = arp[i]
-            item = QTreeWidgetItem([
-                entry.get('ip', 'N/A'),
-                entry.get('mac', 'N/A'),
-                entry.get('interface', 'N/A')
-            ])
-            self.arp_tree.addTopLevelItem(item)
-            i = i + 1
+        # Indexed on the polling thread; build here only for older callers
+        table = data.get('table')
+        if table is None:
+            table = NeighborTable(data.get('arp', []), data.get('lldp', {}))
+        self.neighbor_table = table
+        self.apply_neighbor_search()
+        self.update_arp_table()
+
+    def update_arp_table(self):
+        """Fill the ARP Route column with the route each address resolves to, looked up as one batch"""
+        table = self.neighbor_table
+        matches = self.route_index.lookup_many(table.arp_ips)
+        for position, match in enumerate(matches):
+            route = ''
+            if match is not None:
+                row, prefix_len = match
+                route = f"{self.route_table.prefix(row)} via {self.route_table.next_hops[row]}"
+            table.arp_routes[position] = route
+        self.arp_model.column_changed(ARP_COLUMNS.index("Route"))
+
+    def apply_neighbor_search(self, *args):
+        """Show only ARP and LLDP rows matching the search box"""
+        table = self.neighbor_table
+        query = self.neighbor_search.text().strip()
+        if not query:
+            self.arp_model.set_columns(table.arp_columns())
+            self.lldp_model.set_columns(table.lldp_columns())
+            self.neighbor_search_count.setText("")
+            return
+
+        arp_rows, lldp_rows = table.search(query)
+        self.arp_model.set_columns(table.arp_columns(), arp_rows)
+        self.lldp_model.set_columns(table.lldp_columns(), lldp_rows)
+        self.neighbor_search_count.setText(f"{len(arp_rows)} ARP / {len(lldp_rows)} LLDP")
+
+        # Jump to the tab that has matches (without triggering a refresh)
+        on_arp = self.neighbors_tabs.currentWidget() is self.arp_tree
+        if (on_arp and not arp_rows and lldp_rows) or (not on_arp and not lldp_rows and arp_rows):
+            self.neighbors_tabs.blockSignals(True)
+            self.neighbors_tabs.setCurrentWidget(self.lldp_tree if on_arp else self.arp_tree)
+            self.neighbors_tabs.blockSignals(False)
 
     def handle_error(self, error_msg):
+        # Polling keeps retrying with backoff; only the first failure in a row is reported
+        if self.poll_failing:
+            print(f"Device still failing: {error_msg}")
+            return
+        self.poll_failing = True
         QMessageBox.critical(
             self,
             "Connection Error",
             "Error connecting to device:\n" + error_msg
         )
-        self.refresh_timer.stop()
 
     def change_theme(self, theme_name):
         """Handle theme changes for the dashboard"""
@@ -1026,7 +1144,7 @@ class DeviceDashboardWidget(QMainWindow):
 
         # Update chart and its components
         self.setup_chart()
-        if hasattr(self, 'interface_history') and self.interfaces_tree.selectedItems():
+        if hasattr(self, 'interface_history') and self.selected_interface():
             self.update_interface_graph()  # Refresh current graph with new colors
 
         # Refresh device info if we have facts
@@ -1035,17 +1153,17 @@ class DeviceDashboardWidget(QMainWindow):
 
         # Update device info tree styling
         tree_style = f"""
-            QTreeWidget {{
+            QTreeView, QTableView {{
                 background-color: transparent;
                 border: none;
                 color: {theme_colors['text']};
                 outline: none;
             }}
-            QTreeWidget::item {{
+            QTreeView::item, QTableView::item {{
                 padding: 5px;
                 border: none;
             }}
-            QTreeWidget::item:selected {{
+            QTreeView::item:selected, QTableView::item:selected {{
                 background-color: {theme_colors['selected_bg']};
             }}
             QHeaderView::section {{
@@ -1059,13 +1177,14 @@ class DeviceDashboardWidget(QMainWindow):
             }}
         """
 
-        # Apply styling to all tree widgets
+        # Apply styling to all tree views
         for tree in [self.device_info, self.interfaces_tree,
                      self.lldp_tree, self.arp_tree, self.route_tree]:
             tree.setStyleSheet(tree_style)
 
-            # Update text colors for all existing items
-            self.update_tree_item_colors(tree, theme_colors['text'])
+        # Update text colors for all existing items
+        self.update_tree_item_colors(self.device_info, theme_colors['text'])
+        self.interface_model.refresh_roles()
 
         # Update device icon
         self.set_device_icon()
@@ -1126,57 +1245,26 @@ class DeviceDashboardWidget(QMainWindow):
 
     def update_interface_colors(self):
         """Update interface status colors based on current theme"""
-        theme_colors = self.theme_manager.get_colors(self._current_theme)
-
-        # Update all interface items
-        root = self.interfaces_tree.invisibleRootItem()
-        for i in range(root.childCount()):
-            item = root.child(i)
-            status = item.text(1)
-            if status == "UP":
-                item.setForeground(1, QColor(theme_colors['success']))
-            else:
-                item.setForeground(1, QColor(theme_colors['error']))
+        # Status colors are looked up from the theme when painted
+        self.interface_model.refresh_roles()
 
     def find_longest_prefix_match(self):
         try:
             search_ip = ipaddress.ip_address(self.route_search.text().strip())
-            best_match = None
-            best_prefix_len = -1
-            matching_item = None
-
-            root = self.route_tree.invisibleRootItem()
-            item_count = root.childCount()
-            i = 0
-            while i < item_count:
-                item = root.child(i)
-                network = item.text(0)
-                mask = item.text(1)
-                try:
-                    network_obj = ipaddress.ip_network(network + "/" + mask)
-                    if search_ip in network_obj:
-                        prefix_len = network_obj.prefixlen
-                        if prefix_len > best_prefix_len:
-                            best_prefix_len = prefix_len
-                            best_match = network_obj
-                            matching_item = item
-                except ValueError:
-                    pass
-                i = i + 1
-
-            if matching_item:
-                i = 0
-                while i < item_count:
-                    root.child(i).setBackground(0, QColor(0, 0, 0, 0))
-                    i = i + 1
-                matching_item.setBackground(0, QColor("#22D3EE", 40))
-                self.route_tree.scrollToItem(matching_item)
+            match = self.route_index.lookup(str(search_ip))
+
+            if match is not None:
+                row, prefix_len = match
+                matching_route = self.route_table.row(row)
+                best_match = ipaddress.ip_network(f"{matching_route[0]}/{prefix_len}", strict=False)
+                self.route_model.highlight(row)
+                self.route_model.scroll_to(self.route_tree, row)
                 QMessageBox.information(
                     self,
                     "Route Found",
                     "Found matching route:\nNetwork: " + str(best_match) +
-                    "\nNext Hop: " + matching_item.text(2) +
-                    "\nInterface: " + matching_item.text(4)
+                    "\nNext Hop: " + matching_route[2] +
+                    "\nInterface: " + matching_route[4]
                 )
             else:
                 QMessageBox.warning(
@@ -1192,108 +1280,73 @@ class DeviceDashboardWidget(QMainWindow):
                 "Please enter a valid IP address.\nError: " + str(e)
             )
 
+    def record_churn(self, churn):
+        """Append route changes to the churn feed and per-protocol counters"""
+        if not churn.events:
+            return
+        for event in churn.events:
+            self.churn_sequence += 1
+            self.churn_events.append((self.churn_sequence, (
+                event.timestamp,
+                event.kind.upper(),
+                event.prefix,
+                event.protocol,
+                ", ".join(event.old_next_hops),
+                ", ".join(event.new_next_hops),
+            )))
+            self.churn_counts[event.protocol][event.kind] += 1
+        self.churn_model.set_rows(self.churn_events)
+        self.churn_summary.setText("   ".join(
+            f"{protocol or '?'}: +{counts['added']} -{counts['removed']} ~{counts['changed']}"
+            for protocol, counts in sorted(self.churn_counts.items())
+        ))
+        print(f"Route churn: {len(churn.events)} prefixes changed")
+
+    def clear_churn(self):
+        self.churn_events.clear()
+        self.churn_counts.clear()
+        self.churn_model.clear()
+        self.churn_summary.setText("No route changes")
+
+    @ui_span('ui.routes')
     def update_routes(self, route_info):
-        self.route_tree.clear()
         try:
-            structured_routes = route_info.get("structured_routes", {})
-            for prefix in structured_routes:
-                routes = structured_routes[prefix]
-                j = 0
-                while j < len(routes):
-                    route = routes[j]
-                    network, mask = prefix.split('/')
-                    item = QTreeWidgetItem([
-                        network,
-                        mask,
-                        route.get('next_hop', ''),
-                        route.get('protocol', ''),
-                        route.get('outgoing_interface', ''),
-                        str(route.get('preference', ''))
-                    ])
-                    self.route_tree.addTopLevelItem(item)
-                    j = j + 1
-
             raw_output = route_info.get("raw_output", "")
-            self.route_raw.setText(raw_output)
-
-            lines = raw_output.split('\n')
-            current_network = None
-            current_mask = None
-            idx = 0
-            while idx < len(lines):
-                line = lines[idx].strip()
-                if line and not line.startswith('Codes:') and not line.startswith('Gateway of'):
-                    if 'is subnetted' in line:
-                        parts = line.split()
-                        current_network = parts[0]
-                    else:
-                        if (line.startswith('C') or line.startswith('L') or
-                            line.startswith('S') or line.startswith('D') or
-                            line.startswith('O') or line.startswith('B') or
-                            line.startswith('*')):
-                            parts = line.split()
-                            protocol = parts[0].replace('*', '')
-                            if 'via' in line:
-                                prefix = parts[1]
-                                if '/' not in prefix and current_network:
-                                    network = prefix
-                                else:
-                                    network, mask = prefix.split('/')
-                                via_index = 0
-                                v = 0
-                                while v < len(parts):
-                                    if parts[v] == 'via':
-                                        via_index = v
-                                    v = v + 1
-                                next_hop = parts[via_index + 1].rstrip(',')
-                                interface = ''
-                                last_part = parts[len(parts)-1]
-                                if 'Ethernet' in last_part or 'Loopback' in last_part:
-                                    interface = last_part
-                                metric = ''
-                                if '[' in line and ']' in line:
-                                    start_idx = line.index('[') + 1
-                                    end_idx = line.index(']')
-                                    metric = line[start_idx:end_idx]
-                                item = QTreeWidgetItem([
-                                    network,
-                                    mask,
-                                    next_hop,
-                                    protocol,
-                                    interface,
-                                    metric
-                                ])
-                                if protocol in ['C', 'L']:
-                                    item.setForeground(0, QColor("#22D3EE"))
-                                elif protocol == 'S':
-                                    item.setForeground(0, QColor("#10B981"))
-                                elif protocol == 'D':
-                                    item.setForeground(0, QColor("#3B82F6"))
-                                elif protocol == 'O':
-                                    item.setForeground(0, QColor("#F59E0B"))
-                                self.route_tree.addTopLevelItem(item)
-                            else:
-                                if 'is directly connected' in line:
-                                    network, mask = parts[1].split('/')
-                                    next_hop = 'directly connected'
-                                    interface = parts[len(parts)-1]
-                                    metric = ''
-                                    item = QTreeWidgetItem([
-                                        network,
-                                        mask,
-                                        next_hop,
-                                        protocol,
-                                        interface,
-                                        metric
-                                    ])
-                                    self.route_tree.addTopLevelItem(item)
-
-                idx = idx + 1
-
-            i = 0
-            while i < self.route_tree.columnCount():
-                self.route_tree.resizeColumnToContents(i)
-                i = i + 1
+            if raw_output and raw_output == self.route_raw_output:
+                return  # unchanged table: keep scroll position and sort
+            self.route_raw_output = raw_output
+
+            # A full table is megabytes of text; the raw tab only shows the head
+            lines = raw_output.split('\n', RAW_ROUTE_LINES)
+            if len(lines) > RAW_ROUTE_LINES:
+                lines[-1] = f"... output truncated after {RAW_ROUTE_LINES} lines, see Table View"
+            self.route_raw.setPlainText('\n'.join(lines))
+
+            # Parsed and indexed on the polling thread; parse here only for older callers
+            table = route_info.get("table")
+            if table is None:
+                table = parse_routes(route_info)
+            index = route_info.get("index")
+            self.route_index = index if index is not None else build_route_index(table)
+            self.route_table = table
+
+            # Only changed rows go to the view when the poller diffed against what is shown
+            churn = route_info.get("churn")
+            if churn is not None and churn.new is table:
+                self.route_model.apply_churn(churn)
+                self.record_churn(churn)
+            else:
+                self.route_model.set_table(table)
+
+            if self.route_model.rowCount() and not self.route_columns_sized:
+                self.route_columns_sized = True
+                i = 0
+                while i < self.route_model.columnCount():
+                    self.route_tree.resizeColumnToContents(i)
+                    i = i + 1
+
+            # Re-resolve ARP entries against the new table
+            self.update_arp_table()
 
         except Exception as e:
             print("Error updating routes:", e)
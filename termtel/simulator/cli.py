@@ -0,0 +1,297 @@
+# simulator/cli.py
+"""
+termtel-sim: run, record and benchmark simulated devices.
+
+    termtel-sim serve --count 300 --platform ios --platform nxos --latency 0.05 --sessions sim.yaml
+    termtel-sim record 10.0.0.1 --platform ios -u admin -o core1.yaml
+    termtel-sim bench --target fingerprint --count 100 --concurrency 32 --rounds 3
+    termtel-sim bench --target poll --sessions sim.yaml --concurrency 32
+
+`serve` writes the fleet as a sessions.yaml that the GUI, bulk fingerprinting
+and termtel-daemon all read. `bench` drives one of termtel's SSH paths
+against every device, of a fleet it starts in-process or of one already
+running under `serve`, and prints per-stage percentiles from the span
+recorder.
+"""
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+import yaml
+
+from termtel.simulator.profiles import BUILTIN_COMMANDS, PLATFORMS, Topology, load_recording
+from termtel.simulator.server import Behavior, DeviceSimulator, build_fleet, sessions_inventory
+from termtel.telemetry.daemon import driver_for
+from termtel.telemetry.spans import spans
+
+logger = logging.getLogger(__name__)
+
+BENCH_TARGETS = ('shell', 'exec', 'fingerprint', 'poll')
+PAGING_VENDORS = {'ios': 'cisco', 'nxos': 'cisco', 'eos': 'arista'}
+
+
+class LiteralDumper(yaml.SafeDumper):
+    """Writes multi-line command output as readable block scalars"""
+
+
+LiteralDumper.add_representer(
+    str, lambda dumper, value: dumper.represent_scalar(
+        'tag:yaml.org,2002:str', value, style='|' if '\n' in value else None)
+)
+
+
+def fleet_options(func):
+    """Options shared by serve and bench"""
+    options = [
+        click.option('--count', default=10, show_default=True, help='Number of devices.'),
+        click.option('--platform', 'platforms', multiple=True, type=click.Choice(PLATFORMS),
+                     help='Platforms to cycle through (repeatable, default all).'),
+        click.option('--recording', 'recordings', multiple=True, type=click.Path(exists=True, dir_okay=False),
+                     help='Replay outputs from a `record` file (repeatable).'),
+        click.option('--interfaces', default=8, show_default=True, help='Interfaces per device.'),
+        click.option('--arp', default=16, show_default=True, help='ARP entries per device.'),
+        click.option('--routes', default=50, show_default=True, help='Routes per device.'),
+        click.option('--churn', default=0.0, show_default=True, help='Fraction of routes that flap.'),
+        click.option('--latency', default=0.0, show_default=True, help='Seconds before each command output.'),
+        click.option('--latency-jitter', default=0.0, show_default=True, help='+/- seconds of latency.'),
+        click.option('--throughput', default=0.0, show_default=True, help='Output bytes/sec, 0 for unlimited.'),
+        click.option('--login-delay', default=0.0, show_default=True, help='Seconds spent authenticating.'),
+        click.option('--paging/--no-paging', default=True, show_default=True,
+                     help="Paginate output until 'terminal length 0'."),
+        click.option('--echo/--no-echo', default=True, show_default=True, help='Echo typed input.'),
+        click.option('--split-prompt', default=0.0, show_default=True,
+                     help='Send the prompt this many seconds after the output.'),
+        click.option('--user-mode', is_flag=True, help="Start at 'host>' and require 'enable'."),
+        click.option('--drop-rate', default=0.0, show_default=True, help='Probability a command drops the session.'),
+        click.option('--username', '-u', default='admin', show_default=True, help='Accepted username.'),
+        click.option('--password', '-p', default='admin', show_default=True, help='Accepted password.'),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def make_simulator(count, platforms, recordings, interfaces, arp, routes, churn, latency, latency_jitter,
+                   throughput, login_delay, paging, echo, split_prompt, user_mode, drop_rate, username,
+                   password, base_port=0, host='127.0.0.1') -> DeviceSimulator:
+    devices = build_fleet(
+        count, platforms=platforms or PLATFORMS, base_port=base_port, interfaces=interfaces, arp=arp,
+        routes=routes, churn=churn, recordings=[load_recording(path) for path in recordings] or None,
+    )
+    behavior = Behavior(
+        latency=latency, latency_jitter=latency_jitter, throughput=throughput, login_delay=login_delay,
+        paging=paging, echo=echo, split_prompt=split_prompt, user_mode=user_mode, drop_rate=drop_rate,
+    )
+    return DeviceSimulator(devices, behavior, username=username, password=password, host=host)
+
+
+@click.group()
+@click.option('-v', '--verbose', is_flag=True, help='Debug logging.')
+def cli(verbose):
+    """Local SSH device simulator for benchmarks and load tests."""
+    logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    logging.getLogger('paramiko').setLevel(logging.WARNING)
+
+
+@cli.command()
+@fleet_options
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to listen on.')
+@click.option('--base-port', default=0, show_default=True,
+              help='Device i listens on base-port + i; 0 picks free ports.')
+@click.option('--sessions', 'sessions_path', type=click.Path(dir_okay=False),
+              help='Write the fleet as a sessions.yaml here.')
+def serve(host, base_port, sessions_path, **options):
+    """Run simulated devices until interrupted."""
+    simulator = make_simulator(base_port=base_port, host=host, **options)
+    simulator.start()
+    if sessions_path:
+        with open(sessions_path, 'w') as f:
+            yaml.safe_dump(sessions_inventory(simulator), f, default_flow_style=False)
+        click.echo(f"Wrote {sessions_path}")
+    ports = [device.port for device in simulator.devices]
+    click.echo(f"{len(ports)} devices on {host} ports {min(ports)}-{max(ports)}, "
+               f"login {options['username']}/{options['password']}")
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    while not stop.wait(30):
+        logger.info(f"Stats: {simulator.stats()}")
+    simulator.stop()
+    click.echo(f"Stats: {simulator.stats()}")
+
+
+@cli.command()
+@click.argument('host')
+@click.option('--port', default=22, show_default=True)
+@click.option('--username', '-u', required=True)
+@click.option('--password', '-p', envvar='TERMTEL_PASSWORD', prompt=True, hide_input=True,
+              help='Password (env TERMTEL_PASSWORD).')
+@click.option('--platform', type=click.Choice(PLATFORMS), required=True,
+              help='Platform whose built-in commands are recorded by default.')
+@click.option('--command', '-c', 'commands', multiple=True, help='Command to record (repeatable).')
+@click.option('--output', '-o', required=True, type=click.Path(dir_okay=False), help='Recording file (YAML).')
+@click.option('--timeout', default=60.0, show_default=True, help='Seconds to wait for each command.')
+def record(host, port, username, password, platform, commands, output, timeout):
+    """Capture command outputs from a real device for replay."""
+    from termtel.device_fingerprint import DeviceFingerprinter
+    from termtel.ssh.expect import detect_prompt, read_until_prompt
+    from termtel.ssh.transport_pool import transport_pool
+
+    if not commands:
+        commands = [command for command in BUILTIN_COMMANDS[platform](Topology(platform, 'x', 0))
+                    if not command.startswith('terminal')]
+
+    transport = transport_pool.acquire(host, port=port, username=username, password=password)
+    try:
+        channel = transport_pool.open_shell(transport)
+        prompt = detect_prompt(channel)
+        if not prompt:
+            raise click.ClickException(f"No prompt from {host}")
+        for command in DeviceFingerprinter.PAGING_COMMANDS[PAGING_VENDORS[platform]]:
+            channel.send(command + '\n')
+            read_until_prompt(channel, prompt, timeout=timeout)
+
+        outputs = {}
+        for command in commands:
+            channel.send(command + '\n')
+            lines = read_until_prompt(channel, prompt, timeout=timeout).replace('\r', '').split('\n')
+            # Drop the command echo and the trailing prompt
+            if lines and command in lines[0]:
+                lines = lines[1:]
+            if lines and prompt.rstrip('#>$') in lines[-1]:
+                lines = lines[:-1]
+            outputs[command] = '\n'.join(lines).rstrip() + '\n'
+            click.echo(f"{command}: {len(outputs[command])} bytes")
+        channel.close()
+    finally:
+        transport_pool.release(transport, close=True)
+
+    recording = {
+        'platform': platform,
+        'hostname': prompt.rstrip('#>$ ').split('(')[0],
+        'server_version': transport.remote_version,
+        'commands': outputs,
+    }
+    with open(output, 'w') as f:
+        yaml.dump(recording, f, Dumper=LiteralDumper, default_flow_style=False, sort_keys=False)
+    click.echo(f"Recorded {len(outputs)} commands to {output}")
+
+
+def session_targets(path: str):
+    """Devices of a sessions.yaml (e.g. from `serve --sessions`) as bench targets"""
+    with open(path) as f:
+        folders = yaml.safe_load(f) or []
+    return [
+        {'name': session.get('display_name') or session['host'], 'host': str(session['host']),
+         'port': int(session.get('port') or 22), 'platform': driver_for(session.get('DeviceType')) or 'ios'}
+        for folder in folders for session in folder.get('sessions', []) or []
+    ]
+
+
+def bench_once(target: str, device: dict, username: str, password: str, pollers: dict) -> None:
+    """One visit of a benchmark target to one device"""
+    host, port = device['host'], device['port']
+    if target == 'shell':
+        # The terminal path: pooled transport, xterm shell, prompt, one command
+        from termtel.ssh.expect import detect_prompt, read_until_prompt
+        from termtel.ssh.transport_pool import transport_pool
+        transport = transport_pool.acquire(host, port=port, username=username, password=password)
+        try:
+            channel = transport_pool.open_shell(transport, term='xterm')
+            prompt = detect_prompt(channel)
+            channel.send('show version\n')
+            read_until_prompt(channel, prompt)
+            channel.close()
+        finally:
+            transport_pool.release(transport)
+    elif target == 'exec':
+        from termtel.ssh.pysshpass import ssh_client
+        ssh_client(host, username, password, 'show version', invoke_shell=False, prompt='#', prompt_count=1,
+                   timeout=10, disable_auto_add_policy=False, look_for_keys=False, inter_command_time=0,
+                   port=port)
+    elif target == 'fingerprint':
+        from termtel.device_fingerprint import DeviceFingerprinter
+        result = DeviceFingerprinter().fingerprint_device(host, username, password, port=port)
+        if not result.get('success'):
+            raise RuntimeError(result.get('error') or 'fingerprint failed')
+    else:
+        # The dashboard path: one DevicePoller (persistent NAPALM session) per device
+        from termtel.telemetry.poller import DevicePoller
+        poller = pollers.get(device['name'])
+        if poller is None:
+            poller = pollers[device['name']] = DevicePoller(
+                device['name'], device['platform'], f"{host}:{port}", username, password)
+        poller.force(poller.schedule.intervals)
+        if not poller.poll():
+            raise RuntimeError(poller.last_error)
+
+
+@cli.command()
+@fleet_options
+@click.option('--target', type=click.Choice(BENCH_TARGETS), default='fingerprint', show_default=True,
+              help='shell: pooled xterm shell (ssh_manager); exec: pysshpass; '
+                   'fingerprint: DeviceFingerprinter; poll: DevicePoller/NAPALM (PollingEngine).')
+@click.option('--concurrency', default=16, show_default=True, help='Devices visited at the same time.')
+@click.option('--rounds', default=1, show_default=True, help='Visits per device.')
+@click.option('--sessions', 'sessions_path', type=click.Path(exists=True, dir_okay=False),
+              help='Bench a fleet already running under `serve --sessions` instead of starting one; '
+                   'keeps the simulator out of the measured process.')
+@click.option('--export', 'export_path', type=click.Path(dir_okay=False),
+              help='Also write per-device span stats to a .csv or .json file.')
+def bench(target, concurrency, rounds, sessions_path, export_path, **options):
+    """Drive one of termtel's SSH paths against a local fleet and print stage percentiles."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        # Per-connection and per-command logging of the code under test
+        logging.getLogger('termtel.ssh').setLevel(logging.WARNING)
+    username, password = options['username'], options['password']
+    simulator = None
+    if sessions_path:
+        devices = session_targets(sessions_path)
+    else:
+        simulator = make_simulator(**options)
+        simulator.start()
+        devices = [{'name': device.name, 'host': simulator.host, 'port': device.port,
+                    'platform': device.profile.platform} for device in simulator.devices]
+    pollers = {}
+    spans.clear()
+
+    def visit(device):
+        try:
+            with spans.span(device['name'], f'bench.{target}'):
+                bench_once(target, device, username, password, pollers)
+        except Exception as e:
+            logger.warning(f"{device['name']}: {e}")
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(rounds):
+                list(pool.map(visit, devices))
+        elapsed = time.perf_counter() - started
+        for poller in pollers.values():
+            poller.close()
+    finally:
+        if simulator is not None:
+            simulator.stop()
+
+    visits = len(devices) * rounds
+    click.echo(f"{target}: {visits} visits in {elapsed:.2f}s ({visits / elapsed:.1f}/s), concurrency {concurrency}")
+    if simulator is not None:
+        stats = simulator.stats()
+        click.echo(f"simulator: {stats['logins']} logins, {stats['commands']} commands, "
+                   f"{stats['bytes_sent']} bytes sent")
+    click.echo(f"{'stage':<24}{'count':>7}{'errors':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for row in spans.summary():
+        click.echo(f"{row['stage']:<24}{row['count']:>7}{row['errors']:>7}{row['p50_ms']:>10.1f}"
+                   f"{row['p90_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}")
+    if export_path:
+        click.echo(f"Wrote {spans.export(export_path)} rows to {export_path}")
+
+
+if __name__ == '__main__':
+    cli()
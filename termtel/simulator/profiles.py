@@ -0,0 +1,691 @@
+# simulator/profiles.py
+"""
+Device personalities for the SSH simulator.
+
+A DeviceProfile answers CLI commands for one fake device. The built-in ios,
+nxos and eos profiles render their outputs from a small synthetic topology
+(interfaces whose byte counters grow with time, ARP, LLDP and a routing
+table of configurable size) in the formats read by the fingerprinter, the
+custom interface parser and the NAPALM ios, nxos_ssh and eos (ssh) getters.
+Outputs recorded from real devices with `termtel-sim record` override or
+extend the built-in commands.
+"""
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+import yaml
+
+PLATFORMS = ('ios', 'nxos', 'eos')
+
+# DeviceType written to the generated sessions.yaml, read back by the daemon
+DEVICE_TYPES = {'ios': 'cisco_ios', 'nxos': 'cisco_nxos', 'eos': 'arista_eos'}
+
+INVALID_INPUT = {
+    'ios': "% Invalid input detected at '^' marker.",
+    'nxos': "% Invalid command at '^' marker.",
+    'eos': "% Invalid input",
+}
+SERVER_VERSIONS = {
+    'ios': 'SSH-2.0-Cisco-1.25',
+    'nxos': 'SSH-2.0-OpenSSH_8.3',
+    'eos': 'SSH-2.0-OpenSSH_7.8',
+}
+BANNERS = {
+    'ios': '',
+    'nxos': ("Cisco Nexus Operating System (NX-OS) Software\n"
+             "TAC support: http://www.cisco.com/tac\n"
+             "Copyright (C) 2002-2021, Cisco and/or its affiliates.\n"),
+    'eos': '',
+}
+MODELS = {'ios': 'IOSv', 'nxos': 'N9K-C93180YC-EX', 'eos': 'vEOS-lab'}
+
+# Seconds a churning route keeps the same next hop
+CHURN_PERIOD = 30
+
+Output = Union[str, Callable[[], str]]
+
+
+def interface_name(platform: str, index: int, short: bool = False) -> str:
+    if platform == 'ios':
+        return f"{'Gi' if short else 'GigabitEthernet'}0/{index}"
+    if platform == 'nxos':
+        return f"{'Eth' if short else 'Ethernet'}1/{index + 1}"
+    return f"{'Et' if short else 'Ethernet'}{index + 1}"
+
+
+def dotted_mac(value: int) -> str:
+    digits = f"{value:012x}"
+    return '.'.join(digits[i:i + 4] for i in range(0, 12, 4))
+
+
+def colon_mac(value: int) -> str:
+    digits = f"{value:012x}"
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def uptime_text(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    weeks, minutes = divmod(minutes, 7 * 24 * 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{weeks} weeks, {days} days, {hours} hours, {minutes} minutes"
+
+
+@dataclass
+class SimInterface:
+    index: int
+    name: str
+    short: str
+    mac: int
+    address: str  # 10.x.y.1, /24
+    speed_mbps: int
+    rate_bps: float  # steady traffic rate each direction
+    base_octets: int
+
+
+@dataclass
+class Topology:
+    """Deterministic synthetic state of one device, seeded by its index."""
+    platform: str
+    hostname: str
+    index: int
+    interfaces: int = 8
+    arp: int = 16
+    routes: int = 50
+    churn: float = 0.0  # fraction of routes whose next hop flips every CHURN_PERIOD
+    started: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        rng = random.Random(self.index)
+        self.serial = f"SIM{self.index:08d}"
+        self.boot_offset = rng.randint(3600, 90 * 86400)
+        site = self.index % 250
+        self.ports: List[SimInterface] = []
+        for k in range(max(1, self.interfaces)):
+            self.ports.append(SimInterface(
+                index=k,
+                name=interface_name(self.platform, k),
+                short=interface_name(self.platform, k, short=True),
+                mac=0x525400000000 + (self.index << 8) + k,
+                address=f"10.{k % 250}.{site}.1",
+                speed_mbps=1000,
+                rate_bps=rng.uniform(1e5, 5e7),
+                base_octets=rng.randint(10 ** 6, 10 ** 10),
+            ))
+        self.arp_entries = []
+        for j in range(self.arp):
+            port = self.ports[j % len(self.ports)]
+            self.arp_entries.append({
+                'ip': f"10.{port.index % 250}.{site}.{2 + (j // len(self.ports)) % 250}",
+                'mac': 0x005056000000 + (self.index << 16) + j,
+                'port': port,
+                'age': rng.randint(0, 240),
+            })
+        self.lldp_entries = [
+            (self.ports[k], f"sim-{self.platform}-{(self.index + k + 1) % 10000:04d}",
+             interface_name(self.platform, k))
+            for k in range(min(4, len(self.ports)))
+        ]
+
+    @property
+    def uptime(self) -> float:
+        return self.boot_offset + time.time() - self.started
+
+    def octets(self, port: SimInterface) -> int:
+        return int(port.base_octets + port.rate_bps / 8 * (time.time() - self.started))
+
+    def route_entries(self):
+        """(network, length, next hop, port) for the dynamic routes"""
+        bucket = int(time.time() // CHURN_PERIOD)
+        flapping = int(self.churn * 1000)
+        for i in range(self.routes):
+            hop = i
+            if (i % 1000) < flapping:
+                hop += bucket
+            port = self.ports[hop % len(self.ports)]
+            network = f"{100 + (i >> 16) % 100}.{(i >> 8) & 255}.{i & 255}.0"
+            yield network, 24, f"10.{port.index % 250}.{self.index % 250}.2", port
+
+
+# Cisco IOS
+
+def ios_commands(topo: Topology) -> Dict[str, Output]:
+    def show_version():
+        return (
+            "Cisco IOS Software, IOSv Software (VIOS-ADVENTERPRISEK9-M), Version 15.9(3)M4, RELEASE SOFTWARE (fc3)\n"
+            "Technical Support: http://www.cisco.com/techsupport\n"
+            "Copyright (c) 1986-2021 by Cisco Systems, Inc.\n"
+            "Compiled Thu 28-Jan-21 14:04 by prod_rel_team\n\n\n"
+            "ROM: Bootstrap program is IOSv\n\n"
+            f"{topo.hostname} uptime is {uptime_text(topo.uptime)}\n"
+            "System returned to ROM by reload\n"
+            'System image file is "flash0:/vios-adventerprisek9-m"\n'
+            "Last reload reason: Unknown reason\n\n"
+            "cisco IOSv (revision 1.0) with  with 460137K/62464K bytes of memory.\n"
+            f"Processor board ID {topo.serial}\n"
+            f"{len(topo.ports)} Gigabit Ethernet interfaces\n"
+            "DRAM configuration is 72 bits wide with parity disabled.\n"
+            "256K bytes of non-volatile configuration memory.\n"
+            "2097152K bytes of ATA System CompactFlash 0 (Read/Write)\n\n"
+            "Configuration register is 0x0\n"
+        )
+
+    def show_interfaces():
+        blocks = []
+        for port in topo.ports:
+            octets = topo.octets(port)
+            packets = octets // 600
+            rate = int(port.rate_bps)
+            blocks.append(
+                f"{port.name} is up, line protocol is up \n"
+                f"  Hardware is iGbE, address is {dotted_mac(port.mac)} (bia {dotted_mac(port.mac)})\n"
+                f"  Description: sim link {port.index}\n"
+                f"  Internet address is {port.address}/24\n"
+                f"  MTU 1500 bytes, BW {port.speed_mbps * 1000} Kbit/sec, DLY 10 usec, \n"
+                "     reliability 255/255, txload 1/255, rxload 1/255\n"
+                "  Encapsulation ARPA, loopback not set\n"
+                "  Keepalive set (10 sec)\n"
+                "  Full Duplex, 1Gbps, media type is RJ45\n"
+                "  output flow-control is unsupported, input flow-control is unsupported\n"
+                "  ARP type: ARPA, ARP Timeout 04:00:00\n"
+                "  Last input 00:00:00, output 00:00:00, output hang never\n"
+                '  Last clearing of "show interface" counters never\n'
+                "  Input queue: 0/75/0/0 (size/max/drops/flushes); Total output drops: 0\n"
+                "  Queueing strategy: fifo\n"
+                "  Output queue: 0/40 (size/max)\n"
+                f"  5 minute input rate {rate} bits/sec, {rate // 4800} packets/sec\n"
+                f"  5 minute output rate {rate} bits/sec, {rate // 4800} packets/sec\n"
+                f"     {packets} packets input, {octets} bytes, 0 no buffer\n"
+                "     Received 0 broadcasts (0 IP multicasts)\n"
+                "     0 runts, 0 giants, 0 throttles \n"
+                "     0 input errors, 0 CRC, 0 frame, 0 overrun, 0 ignored\n"
+                "     0 watchdog, 0 multicast, 0 pause input\n"
+                f"     {packets} packets output, {octets} bytes, 0 underruns\n"
+                "     0 output errors, 0 collisions, 1 interface resets\n"
+                "     0 unknown protocol drops\n"
+                "     0 babbles, 0 late collision, 0 deferred\n"
+                "     0 lost carrier, 0 no carrier, 0 pause output\n"
+                "     0 output buffer failures, 0 output buffers swapped out\n"
+            )
+        return ''.join(blocks)
+
+    def show_ip_interface_brief():
+        lines = ["Interface                  IP-Address      OK? Method Status                Protocol"]
+        for port in topo.ports:
+            lines.append(f"{port.name:<26} {port.address:<15} YES NVRAM  up                    up      ")
+        return '\n'.join(lines) + '\n'
+
+    def show_arp():
+        lines = ["Protocol  Address          Age (min)  Hardware Addr   Type   Interface"]
+        for port in topo.ports:
+            lines.append(f"Internet  {port.address:<16} {'-':>10}  {dotted_mac(port.mac)}  ARPA   {port.name}")
+        for entry in topo.arp_entries:
+            lines.append(f"Internet  {entry['ip']:<16} {entry['age']:>10}  {dotted_mac(entry['mac'])}  ARPA   "
+                         f"{entry['port'].name}")
+        return '\n'.join(lines) + '\n'
+
+    def show_lldp_neighbors():
+        lines = [
+            "Capability codes:",
+            "    (R) Router, (B) Bridge, (T) Telephone, (C) DOCSIS Cable Device",
+            "    (W) WLAN Access Point, (P) Repeater, (S) Station, (O) Other",
+            "",
+            "Device ID           Local Intf     Hold-time  Capability      Port ID",
+        ]
+        for port, neighbor, remote in topo.lldp_entries:
+            lines.append(f"{neighbor:<20}{port.short:<15}{120:<11}{'R':<16}{remote}")
+        lines += ["", f"Total entries displayed: {len(topo.lldp_entries)}"]
+        return '\n'.join(lines) + '\n'
+
+    def show_lldp_neighbors_detail():
+        blocks = []
+        for port, neighbor, remote in topo.lldp_entries:
+            blocks.append(
+                "------------------------------------------------\n"
+                f"Local Intf: {port.short}\n"
+                f"Chassis id: {dotted_mac(port.mac + 0x10000)}\n"
+                f"Port id: {remote}\n"
+                f"Port Description: {remote}\n"
+                f"System Name: {neighbor}\n\n"
+                "System Description: \n"
+                "Cisco IOS Software, IOSv Software (VIOS-ADVENTERPRISEK9-M), Version 15.9(3)M4, RELEASE SOFTWARE (fc3)\n"
+                "Technical Support: http://www.cisco.com/techsupport\n"
+                "Copyright (c) 1986-2021 by Cisco Systems, Inc.\n"
+                "Compiled Thu 28-Jan-21 14:04 by prod_rel_team\n\n"
+                "Time remaining: 100 seconds\n"
+                "System Capabilities: B,R\n"
+                "Enabled Capabilities: R\n"
+                "Management Addresses:\n"
+                f"    IP: {port.address[:-1]}2\n"
+                "Auto Negotiation - not supported\n"
+                "Physical media capabilities - not advertised\n"
+                "Media Attachment Unit type - not advertised\n"
+                "Vlan ID: - not advertised\n\n"
+            )
+        return ''.join(blocks) + f"\nTotal entries displayed: {len(topo.lldp_entries)}\n"
+
+    def show_ip_route():
+        gateway = f"10.0.{topo.index % 250}.254"
+        lines = [
+            "Codes: L - local, C - connected, S - static, R - RIP, M - mobile, B - BGP",
+            "       D - EIGRP, EX - EIGRP external, O - OSPF, IA - OSPF inter area ",
+            "       N1 - OSPF NSSA external type 1, N2 - OSPF NSSA external type 2",
+            "       E1 - OSPF external type 1, E2 - OSPF external type 2",
+            "       i - IS-IS, su - IS-IS summary, L1 - IS-IS level-1, L2 - IS-IS level-2",
+            "       * - candidate default, U - per-user static route",
+            "",
+            f"Gateway of last resort is {gateway} to network 0.0.0.0",
+            "",
+            f"S*    0.0.0.0/0 [1/0] via {gateway}",
+        ]
+        for port in topo.ports:
+            network = port.address.rsplit('.', 1)[0] + '.0'
+            lines.append(f"C        {network}/24 is directly connected, {port.name}")
+            lines.append(f"L        {port.address}/32 is directly connected, {port.name}")
+        for network, length, hop, port in topo.route_entries():
+            lines.append(f"O        {network}/{length} [110/2] via {hop}, 1d02h, {port.name}")
+        return '\n'.join(lines) + '\n'
+
+    return {
+        'show version': show_version,
+        'show hosts': "Default domain is sim.local\nName/address lookup uses domain service\n"
+                      "Name servers are 255.255.255.255\n",
+        'show ip interface brief': show_ip_interface_brief,
+        'show interfaces': show_interfaces,
+        'show arp': show_arp,
+        'show ip arp': show_arp,
+        'show lldp neighbors': show_lldp_neighbors,
+        'show lldp neighbors detail': show_lldp_neighbors_detail,
+        'show ip route': show_ip_route,
+        'show spanning-tree summary': "No spanning tree instance exists.\n",
+        'terminal length 0': '',
+        'terminal width 511': '',
+        'terminal no monitor': '',
+    }
+
+
+# Cisco NX-OS
+
+def nxos_commands(topo: Topology) -> Dict[str, Output]:
+    def show_version():
+        return (
+            "Cisco Nexus Operating System (NX-OS) Software\n"
+            "TAC support: http://www.cisco.com/tac\n"
+            "Copyright (C) 2002-2021, Cisco and/or its affiliates.\n\n"
+            "Software\n"
+            "  BIOS: version 07.69\n"
+            " NXOS: version 9.3(8)\n"
+            "  BIOS compile time:  04/08/2021\n"
+            "  NXOS image file is: bootflash:///nxos.9.3.8.bin\n"
+            "  NXOS compile time:  8/20/2021 9:00:00 [08/20/2021 18:23:45]\n\n\n"
+            "Hardware\n"
+            f"  cisco Nexus9000 C93180YC-EX chassis (\"24x40/50G+8x100G\")\n"
+            "  Intel(R) Xeon(R) CPU  @ 1.80GHz with 24632932 kB of memory.\n"
+            f"  Processor Board ID {topo.serial}\n\n"
+            f"  Device name: {topo.hostname}\n"
+            "  bootflash:   53298520 kB\n"
+            f"Kernel uptime is {int(topo.uptime // 86400)} day(s), {int(topo.uptime % 86400 // 3600)} hour(s), "
+            f"{int(topo.uptime % 3600 // 60)} minute(s), {int(topo.uptime % 60)} second(s)\n"
+        )
+
+    def show_interface():
+        blocks = []
+        for port in topo.ports:
+            octets = topo.octets(port)
+            packets = octets // 600
+            rate = int(port.rate_bps)
+            blocks.append(
+                f"{port.name} is up\n"
+                "admin state is up, Dedicated Interface\n"
+                f"  Hardware: 100/1000/10000/25000 Ethernet, address: {dotted_mac(port.mac)} "
+                f"(bia {dotted_mac(port.mac)})\n"
+                f"  Description: sim link {port.index}\n"
+                f"  Internet Address is {port.address}/24\n"
+                f"  MTU 1500 bytes, BW {port.speed_mbps * 1000} Kbit , DLY 10 usec\n"
+                "  reliability 255/255, txload 1/255, rxload 1/255\n"
+                "  Encapsulation ARPA, medium is broadcast\n"
+                "  full-duplex, 1000 Mb/s, media type is 1G\n"
+                "  Last link flapped 1d02h\n"
+                f"  30 seconds input rate {rate} bits/sec, {rate // 4800} packets/sec\n"
+                f"  30 seconds output rate {rate} bits/sec, {rate // 4800} packets/sec\n"
+                "  RX\n"
+                f"    {packets} unicast packets  0 multicast packets  0 broadcast packets\n"
+                f"    {packets} input packets  {octets} bytes\n"
+                "    0 input error  0 short frame  0 overrun   0 underrun  0 ignored\n"
+                "  TX\n"
+                f"    {packets} unicast packets  0 multicast packets  0 broadcast packets\n"
+                f"    {packets} output packets  {octets} bytes\n"
+                "    0 output error  0 collision  0 deferred  0 late collision\n\n"
+            )
+        return ''.join(blocks)
+
+    def show_interface_status():
+        lines = [
+            "",
+            "--------------------------------------------------------------------------------",
+            "Port          Name               Status    Vlan      Duplex  Speed   Type",
+            "--------------------------------------------------------------------------------",
+        ]
+        for port in topo.ports:
+            lines.append(f"{port.short:<13} {'sim link ' + str(port.index):<18} connected routed    full    1000    10g")
+        return '\n'.join(lines) + '\n'
+
+    def show_inventory():
+        return (f'NAME: "Chassis",  DESCR: "Nexus9000 C93180YC-EX chassis"\n'
+                f"PID: N9K-C93180YC-EX   ,  VID: V03  ,  SN: {topo.serial}\n\n")
+
+    def show_ip_arp():
+        lines = [
+            "",
+            "Flags: * - Adjacencies learnt on non-active FHRP router",
+            "",
+            "IP ARP Table for all contexts",
+            f"Total number of entries: {len(topo.arp_entries)}",
+            "Address         Age       MAC Address     Interface       Flags",
+        ]
+        for entry in topo.arp_entries:
+            age = time.strftime('%H:%M:%S', time.gmtime(entry['age'] * 60))
+            lines.append(f"{entry['ip']:<15} {age}  {dotted_mac(entry['mac'])}  {entry['port'].name:<15} ")
+        return '\n'.join(lines) + '\n'
+
+    def show_lldp_neighbors_detail():
+        blocks = [
+            "Capability codes:\n"
+            "  (R) Router, (B) Bridge, (T) Telephone, (C) DOCSIS Cable Device\n"
+            "  (W) WLAN Access Point, (P) Repeater, (S) Station, (O) Other\n"
+            "Device ID            Local Intf      Hold-time  Capability  Port ID  \n\n"
+        ]
+        for port, neighbor, remote in topo.lldp_entries:
+            blocks.append(
+                f"Chassis id: {dotted_mac(port.mac + 0x10000)}\n"
+                f"Port id: {remote}\n"
+                f"Local Port id: {port.short}\n"
+                f"Port Description: {remote}\n"
+                f"System Name: {neighbor}\n"
+                "System Description: Cisco Nexus Operating System (NX-OS) Software 9.3(8)\n"
+                "Time remaining: 101 seconds\n"
+                "System Capabilities: B, R\n"
+                "Enabled Capabilities: B, R\n"
+                f"Management Address: {port.address[:-1]}2\n"
+                "Management Address IPV6: not advertised\n"
+                "Vlan ID: not advertised\n\n\n"
+            )
+        return ''.join(blocks) + f"Total entries displayed: {len(topo.lldp_entries)}\n"
+
+    def show_ip_route():
+        gateway = f"10.0.{topo.index % 250}.254"
+        lines = [
+            'IP Route Table for VRF "default"',
+            "'*' denotes best ucast next-hop",
+            "'**' denotes best mcast next-hop",
+            "'[x/y]' denotes [preference/metric]",
+            "'%<string>' in via output denotes VRF <string>",
+            "",
+            "0.0.0.0/0, ubest/mbest: 1/0",
+            f"    *via {gateway}, [1/0], 5w0d, static",
+        ]
+        for port in topo.ports:
+            network = port.address.rsplit('.', 1)[0] + '.0'
+            lines += [
+                f"{network}/24, ubest/mbest: 1/0, attached",
+                f"    *via {port.address}, {port.short}, [0/0], 5w0d, direct",
+                f"{port.address}/32, ubest/mbest: 1/0, attached",
+                f"    *via {port.address}, {port.short}, [0/0], 5w0d, local",
+            ]
+        for network, length, hop, port in topo.route_entries():
+            lines += [
+                f"{network}/{length}, ubest/mbest: 1/0",
+                f"    *via {hop}, {port.short}, [110/41], 1d02h, ospf-1, intra",
+            ]
+        return '\n'.join(lines) + '\n'
+
+    return {
+        'show version': show_version,
+        'show hosts': "DNS lookup enabled\nDefault domain for vrf:default is sim.local\n",
+        'show hostname': f"{topo.hostname}\n",
+        'show interface': show_interface,
+        'show interface status': show_interface_status,
+        'show inventory': show_inventory,
+        'show ip arp': show_ip_arp,
+        'show ip arp vrf all': show_ip_arp,
+        'show lldp neighbors detail': show_lldp_neighbors_detail,
+        'show ip route': show_ip_route,
+        'show spanning-tree summary': (
+            "Switch is in rapid-pvst mode\n"
+            "Root bridge for: none\n"
+            "Port Type Default                        is disable\n"
+        ),
+        'terminal length 0': '',
+        'terminal width 511': '',
+    }
+
+
+# Arista EOS
+
+def eos_commands(topo: Topology) -> Dict[str, Output]:
+    def version():
+        return {
+            'modelName': MODELS['eos'],
+            'internalVersion': '4.28.3M-29130394.4283M',
+            'version': '4.28.3M',
+            'serialNumber': topo.serial,
+            'systemMacAddress': colon_mac(topo.ports[0].mac),
+            'bootupTimestamp': time.time() - topo.uptime,
+            'hardwareRevision': '',
+            'architecture': 'x86_64',
+            'memTotal': 4002104,
+            'memFree': 2563464,
+        }
+
+    def show_version():
+        data = version()
+        return (
+            f"Arista {data['modelName']}\n"
+            f"Hardware version: \n"
+            f"Serial number: {data['serialNumber']}\n"
+            f"System MAC address: {dotted_mac(topo.ports[0].mac)}\n\n"
+            f"Software image version: {data['version']}\n"
+            "Architecture: x86_64\n"
+            f"Internal build version: {data['internalVersion']}\n\n"
+            f"Uptime: {uptime_text(topo.uptime)}\n"
+            "Total memory: 4002104 kB\n"
+            "Free memory: 2563464 kB\n"
+        )
+
+    def interfaces_json():
+        interfaces = {}
+        for port in topo.ports:
+            octets = topo.octets(port)
+            interfaces[port.name] = {
+                'name': port.name,
+                'description': f"sim link {port.index}",
+                'hardware': 'ethernet',
+                'interfaceStatus': 'connected',
+                'lineProtocolStatus': 'up',
+                'physicalAddress': colon_mac(port.mac),
+                'mtu': 1500,
+                'bandwidth': port.speed_mbps * 1_000_000,
+                'lastStatusChangeTimestamp': time.time() - 3600,
+                'interfaceAddress': [{'primaryIp': {'address': port.address, 'maskLen': 24}}],
+                'interfaceCounters': {
+                    'inOctets': octets, 'outOctets': octets,
+                    'inUcastPkts': octets // 600, 'outUcastPkts': octets // 600,
+                    'inMulticastPkts': 0, 'outMulticastPkts': 0,
+                    'inBroadcastPkts': 0, 'outBroadcastPkts': 0,
+                    'inDiscards': 0, 'outDiscards': 0,
+                    'totalInErrors': 0, 'totalOutErrors': 0,
+                },
+                'interfaceStatistics': {'inBitsRate': port.rate_bps, 'outBitsRate': port.rate_bps},
+            }
+        return {'interfaces': interfaces}
+
+    def show_interfaces():
+        blocks = []
+        for port in topo.ports:
+            octets = topo.octets(port)
+            packets = octets // 600
+            rate = port.rate_bps / 1e6
+            blocks.append(
+                f"{port.name} is up, line protocol is up (connected)\n"
+                f"  Hardware is Ethernet, address is {dotted_mac(port.mac)} (bia {dotted_mac(port.mac)})\n"
+                f"  Description: sim link {port.index}\n"
+                f"  Internet address is {port.address}/24\n"
+                "  Broadcast address is 255.255.255.255\n"
+                f"  IP MTU 1500 bytes , BW {port.speed_mbps * 1000} kbit\n"
+                "  Full-duplex, 1Gb/s, auto negotiation: off, uni-link: n/a\n"
+                "  Up 1 day, 2 hours, 3 minutes, 4 seconds\n"
+                "  Loopback Mode : None\n"
+                "  2 link status changes since last clear\n"
+                "  Last clearing of \"show interface\" counters never\n"
+                f"  5 minutes input rate {rate:.1f} Mbps (0.0% with framing overhead), {int(port.rate_bps // 4800)} packets/sec\n"
+                f"  5 minutes output rate {rate:.1f} Mbps (0.0% with framing overhead), {int(port.rate_bps // 4800)} packets/sec\n"
+                f"     {packets} packets input, {octets} bytes\n"
+                "     Received 0 broadcasts, 0 multicast\n"
+                "     0 runts, 0 giants\n"
+                "     0 input errors, 0 CRC, 0 alignment, 0 symbol, 0 input discards\n"
+                "     0 PAUSE input\n"
+                f"     {packets} packets output, {octets} bytes\n"
+                "     Sent 0 broadcasts, 0 multicast\n"
+                "     0 output errors, 0 collisions\n"
+                "     0 late collision, 0 deferred, 0 output discards\n"
+                "     0 PAUSE output\n"
+            )
+        return ''.join(blocks)
+
+    def lldp_json():
+        return {'lldpNeighbors': [
+            {'port': port.name, 'neighborDevice': neighbor, 'neighborPort': remote, 'ttl': 120}
+            for port, neighbor, remote in topo.lldp_entries
+        ]}
+
+    def arp_json():
+        return {'vrfs': {'default': {'ipV4Neighbors': [
+            {'address': entry['ip'], 'hwAddress': dotted_mac(entry['mac']),
+             'interface': entry['port'].name, 'age': entry['age'] * 60}
+            for entry in topo.arp_entries
+        ]}}}
+
+    def show_ip_route():
+        gateway = f"10.0.{topo.index % 250}.254"
+        lines = [
+            "VRF: default",
+            "Codes: C - connected, S - static, K - kernel, ",
+            "       O - OSPF, IA - OSPF inter area, E1 - OSPF external type 1,",
+            "       B - Other BGP Routes, B I - iBGP, B E - eBGP,",
+            "",
+            "Gateway of last resort:",
+            f" S        0.0.0.0/0 [1/0] via {gateway}, {topo.ports[0].name}",
+            "",
+        ]
+        for port in topo.ports:
+            network = port.address.rsplit('.', 1)[0] + '.0'
+            lines.append(f" C        {network}/24 is directly connected, {port.name}")
+        for network, length, hop, port in topo.route_entries():
+            lines.append(f" O        {network}/{length} [110/20] via {hop}, {port.name}")
+        return '\n'.join(lines) + '\n'
+
+    def as_json(build):
+        return lambda: json.dumps(build(), indent=2)
+
+    return {
+        'show version': show_version,
+        'show version | json': as_json(version),
+        'show hostname': f"Hostname: {topo.hostname}\nFQDN:     {topo.hostname}.sim.local\n",
+        'show hostname | json': json.dumps({'hostname': topo.hostname, 'fqdn': f"{topo.hostname}.sim.local"}),
+        'show interfaces': show_interfaces,
+        'show interfaces | json': as_json(interfaces_json),
+        'show lldp neighbors | json': as_json(lldp_json),
+        'show arp vrf all | json': as_json(arp_json),
+        'show ip route': show_ip_route,
+        'show spanning-tree summary': "Spanning tree mode: mstp\nRoot bridge for: none\n",
+        'terminal length 0': "Pagination disabled.\n",
+        'terminal width 511': "Width set to 511 columns.\n",
+        'terminal width 32767': "Width set to 32767 columns.\n",
+    }
+
+
+BUILTIN_COMMANDS = {'ios': ios_commands, 'nxos': nxos_commands, 'eos': eos_commands}
+
+
+def load_recording(path: str) -> dict:
+    """A recording written by `termtel-sim record`: platform, hostname, prompt, commands"""
+    with open(path) as f:
+        recording = yaml.safe_load(f) or {}
+    if not isinstance(recording.get('commands'), dict):
+        raise ValueError(f"{path} has no 'commands' mapping")
+    return recording
+
+
+def apply_filter(output: str, expression: str) -> Optional[str]:
+    """Cisco-style '| include|exclude|begin|section <regex>' on output, None if unsupported"""
+    verb, _, pattern = expression.strip().partition(' ')
+    verb = verb.lower()
+    try:
+        regex = re.compile(pattern.strip())
+    except re.error:
+        return None
+    lines = output.split('\n')
+    if verb and 'include'.startswith(verb):
+        lines = [line for line in lines if regex.search(line)]
+    elif verb and 'exclude'.startswith(verb):
+        lines = [line for line in lines if not regex.search(line)]
+    elif verb and 'begin'.startswith(verb):
+        for row, line in enumerate(lines):
+            if regex.search(line):
+                lines = lines[row:]
+                break
+        else:
+            lines = []
+    else:
+        return None
+    return '\n'.join(lines).strip('\n') + '\n' if lines else ''
+
+
+class DeviceProfile:
+    """Prompt, banners and command table of one simulated device."""
+
+    def __init__(self, platform: str, hostname: str, topology: Optional[Topology] = None,
+                 recording: Optional[dict] = None):
+        recording = recording or {}
+        platform = recording.get('platform', platform)
+        if platform not in PLATFORMS:
+            raise ValueError(f"Unknown platform '{platform}', expected one of {', '.join(PLATFORMS)}")
+        self.platform = platform
+        self.hostname = hostname
+        self.topology = topology or Topology(platform, hostname, 0)
+        self.server_version = recording.get('server_version') or SERVER_VERSIONS[platform]
+        self.banner = recording.get('banner', BANNERS[platform]) or ''
+        self.invalid = INVALID_INPUT[platform]
+
+        self.commands: Dict[str, Output] = BUILTIN_COMMANDS[platform](self.topology)
+        recorded_host = recording.get('hostname')
+        for command, output in (recording.get('commands') or {}).items():
+            output = str(output or '')
+            if recorded_host:
+                output = output.replace(recorded_host, hostname)
+            self.commands[' '.join(command.split())] = output
+
+    def prompt(self, privileged: bool = True, config: bool = False) -> str:
+        if config:
+            return f"{self.hostname}(config)#"
+        return f"{self.hostname}{'#' if privileged else '>'}"
+
+    def respond(self, command: str) -> Optional[str]:
+        """Output of a command, or None when the device would reject it"""
+        command = ' '.join(command.split())
+        output = self.commands.get(command)
+        if output is None and '|' in command:
+            base, _, expression = command.partition('|')
+            base_output = self.commands.get(base.strip())
+            if base_output is not None and expression.strip() != 'json':
+                text = base_output() if callable(base_output) else base_output
+                return apply_filter(text, expression)
+        if output is None:
+            return None
+        output = output() if callable(output) else output
+        # Devices always end output with a newline, so the prompt starts its own line
+        return output if not output or output.endswith('\n') else output + '\n'
@@ -0,0 +1,441 @@
+# simulator/server.py
+"""
+Local SSH device simulator.
+
+Runs any number of fake network devices on localhost, one listening port
+each, behind a single acceptor thread. Every login gets a paramiko server
+Transport that answers interactive shells (prompt, echo, paging, enable)
+and exec requests from the device's DeviceProfile. Behavior adds the
+latency, throughput limits and prompt quirks that make real devices slow,
+so the SSH, fingerprinting and polling paths can be measured repeatably
+without lab gear. Several hundred devices need a few thousand file
+descriptors; raise `ulimit -n` for larger fleets.
+"""
+import logging
+import random
+import selectors
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import paramiko
+
+from termtel.simulator.profiles import DEVICE_TYPES, PLATFORMS, DeviceProfile, Topology
+
+logger = logging.getLogger(__name__)
+# Server-side transports log every client hang-up as an error; that is normal here
+TRANSPORT_LOG = f"{__name__}.transport"
+logging.getLogger(TRANSPORT_LOG).setLevel(logging.CRITICAL)
+
+EXIT_COMMANDS = {'exit', 'quit', 'logout'}
+MORE_PROMPT = ' --More-- '
+
+
+@dataclass
+class Behavior:
+    """How a simulated device paces and shapes its answers"""
+    latency: float = 0.0  # seconds before each command's output starts
+    latency_jitter: float = 0.0  # +/- seconds added to latency
+    throughput: float = 0.0  # output bytes per second, 0 for unlimited
+    login_delay: float = 0.0  # seconds spent in password authentication
+    chunk_size: int = 4096  # output is written in chunks of this size
+    echo: bool = True  # echo typed characters like a pty
+    paging: bool = True  # paginate output until 'terminal length 0'
+    page_lines: int = 24
+    split_prompt: float = 0.0  # if > 0, send the prompt this many seconds after the output
+    user_mode: bool = False  # start at 'host>' and require 'enable'
+    drop_rate: float = 0.0  # probability that a command drops the connection
+
+    def delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.latency_jitter, self.latency_jitter))
+
+
+@dataclass
+class SimulatedDevice:
+    name: str
+    profile: DeviceProfile
+    port: int = 0  # 0 until the simulator binds it
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        'connections': 0, 'logins': 0, 'failed_logins': 0, 'commands': 0, 'bytes_sent': 0, 'drops': 0,
+    })
+
+
+class DeviceServer(paramiko.ServerInterface):
+    """paramiko server side of one connection to a simulated device"""
+
+    def __init__(self, simulator: 'DeviceSimulator', device: SimulatedDevice):
+        self.simulator = simulator
+        self.device = device
+        self.requests: Dict[int, tuple] = {}  # channel id -> ('shell',) or ('exec', command)
+        self.ready = threading.Condition()
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        if self.simulator.behavior.login_delay:
+            time.sleep(self.simulator.behavior.login_delay)
+        if self.simulator.accepts(username, password):
+            self.device.stats['logins'] += 1
+            return paramiko.AUTH_SUCCESSFUL
+        self.device.stats['failed_logins'] += 1
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_window_change_request(self, channel, width, height, pixelwidth, pixelheight):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self._request(channel, ('shell',))
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        self._request(channel, ('exec', command.decode('utf-8', errors='replace')))
+        return True
+
+    def _request(self, channel, request):
+        with self.ready:
+            self.requests[channel.get_id()] = request
+            self.ready.notify_all()
+
+    def wait_request(self, channel, timeout: float = 10.0) -> Optional[tuple]:
+        with self.ready:
+            self.ready.wait_for(lambda: channel.get_id() in self.requests, timeout)
+            return self.requests.pop(channel.get_id(), None)
+
+
+class ChannelSession:
+    """Interactive CLI or one exec command on a channel"""
+
+    def __init__(self, channel: paramiko.Channel, device: SimulatedDevice, behavior: Behavior):
+        self.channel = channel
+        self.device = device
+        self.profile = device.profile
+        self.behavior = behavior
+        self.privileged = not behavior.user_mode
+        self.config = False
+        self.paging = behavior.paging
+        self._pending = ''  # typed input not yet consumed
+
+    # Output
+
+    def send(self, text: str) -> None:
+        data = text.replace('\r\n', '\n').replace('\n', '\r\n').encode('utf-8')
+        size = max(1, self.behavior.chunk_size)
+        for start in range(0, len(data), size):
+            chunk = data[start:start + size]
+            self.channel.sendall(chunk)
+            self.device.stats['bytes_sent'] += len(chunk)
+            if self.behavior.throughput > 0:
+                time.sleep(len(chunk) / self.behavior.throughput)
+
+    def send_prompt(self) -> None:
+        if self.behavior.split_prompt:
+            time.sleep(self.behavior.split_prompt)
+        self.send(self.profile.prompt(self.privileged, self.config))
+
+    # Input
+
+    def read_key(self) -> Optional[str]:
+        """One typed character, None once the client has gone"""
+        while not self._pending:
+            data = self.channel.recv(1024)
+            if not data:
+                return None
+            self._pending = data.decode('utf-8', errors='replace')
+        key, self._pending = self._pending[0], self._pending[1:]
+        return key
+
+    def read_line(self, echo: bool = True) -> Optional[str]:
+        echo = echo and self.behavior.echo
+        line, typed = [], []
+        while True:
+            if typed and not self._pending:
+                # Echo whatever arrived in one write, not a packet per character
+                self.send(''.join(typed))
+                typed = []
+            key = self.read_key()
+            if key is None:
+                return None
+            if key in '\r\n':
+                if key == '\r' and self._pending.startswith('\n'):
+                    self._pending = self._pending[1:]
+                if echo:
+                    self.send(''.join(typed) + '\n')
+                return ''.join(line)
+            if key in '\x7f\x08':
+                if line:
+                    line.pop()
+                    if echo:
+                        typed.append('\b \b')
+                continue
+            line.append(key)
+            if echo:
+                typed.append(key)
+
+    # Sessions
+
+    def run_exec(self, command: str) -> None:
+        self.device.stats['commands'] += 1
+        time.sleep(self.behavior.delay())
+        output = self.profile.respond(command)
+        if output is None:
+            self.send(self.profile.invalid + '\n')
+            self.channel.send_exit_status(1)
+        else:
+            self.send(output)
+            self.channel.send_exit_status(0)
+        self.channel.close()
+
+    def run_shell(self) -> None:
+        if self.profile.banner:
+            self.send('\n' + self.profile.banner + '\n')
+        self.send_prompt()
+        while True:
+            line = self.read_line()
+            if line is None:
+                return
+            command = ' '.join(line.split())
+            if command:
+                self.device.stats['commands'] += 1
+                if self.behavior.drop_rate and random.random() < self.behavior.drop_rate:
+                    self.device.stats['drops'] += 1
+                    self.channel.get_transport().close()
+                    return
+                if not self.handle(command):
+                    self.channel.close()
+                    return
+            self.send_prompt()
+
+    def handle(self, command: str) -> bool:
+        """Run one CLI command; False ends the session"""
+        words = command.lower().split()
+        if command.lower() in EXIT_COMMANDS:
+            if self.config:
+                self.config = False
+                return True
+            return False
+        if words[0] in ('en', 'enable'):
+            if not self.privileged:
+                self.send('Password: ')
+                self.read_line(echo=False)
+                self.privileged = True
+            return True
+        if words[0] in ('disable',):
+            self.privileged = False
+            return True
+        if words[:2] in (['conf', 't'], ['configure', 'terminal']):
+            self.config = True
+            self.send("Enter configuration commands, one per line.  End with CNTL/Z.\n")
+            return True
+        if words[0] == 'end':
+            self.config = False
+            return True
+        if words[:2] in (['terminal', 'length'], ['term', 'len']) and len(words) == 3:
+            self.paging = self.behavior.paging and words[2] != '0'
+
+        time.sleep(self.behavior.delay())
+        output = self.profile.respond(command)
+        if output is None:
+            self.send(self.profile.invalid + '\n')
+        else:
+            self.send_paged(output)
+        return True
+
+    def send_paged(self, output: str) -> None:
+        lines = output.split('\n')
+        page = max(1, self.behavior.page_lines - 1)
+        if not self.paging or len(lines) <= page + 1:
+            self.send(output)
+            return
+        row = 0
+        while row < len(lines):
+            chunk = lines[row:row + page]
+            row += page
+            self.send('\n'.join(chunk) + ('\n' if row < len(lines) else ''))
+            if row >= len(lines):
+                return
+            self.send(MORE_PROMPT)
+            key = self.read_key()
+            self.send('\b' * len(MORE_PROMPT) + ' ' * len(MORE_PROMPT) + '\b' * len(MORE_PROMPT))
+            if key is None or key in 'qQ':
+                self.send('\n')
+                return
+            if key in '\r\n':
+                page = 1
+
+
+class DeviceSimulator:
+    """A fleet of simulated devices on localhost ports."""
+
+    def __init__(self, devices: List[SimulatedDevice], behavior: Optional[Behavior] = None,
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 host: str = '127.0.0.1', host_key: Optional[paramiko.PKey] = None):
+        self.devices = devices
+        self.behavior = behavior or Behavior()
+        self.username = username
+        self.password = password
+        self.host = host
+        self.host_key = host_key or paramiko.RSAKey.generate(2048)
+
+        self._selector = selectors.DefaultSelector()
+        self._listeners: List[socket.socket] = []
+        self._transports: List[paramiko.Transport] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def accepts(self, username: str, password: str) -> bool:
+        """None for username or password accepts anything"""
+        return ((self.username is None or username == self.username)
+                and (self.password is None or password == self.password))
+
+    # Lifecycle
+
+    def start(self) -> None:
+        for device in self.devices:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((self.host, device.port))
+            listener.listen(64)
+            listener.setblocking(False)
+            device.port = listener.getsockname()[1]
+            self._listeners.append(listener)
+            self._selector.register(listener, selectors.EVENT_READ, device)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._accept_loop, name="sim-accept", daemon=True)
+        self._thread.start()
+        logger.info(f"Simulating {len(self.devices)} devices on {self.host}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        for listener in self._listeners:
+            self._selector.unregister(listener)
+            listener.close()
+        self._listeners.clear()
+        with self._lock:
+            transports, self._transports = self._transports, []
+        for transport in transports:
+            transport.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Totals over all devices"""
+        totals: Dict[str, int] = {}
+        for device in self.devices:
+            for key, value in device.stats.items():
+                totals[key] = totals.get(key, 0) + value
+        with self._lock:
+            totals['active'] = sum(1 for transport in self._transports if transport.is_active())
+        return totals
+
+    # Connections
+
+    def _accept_loop(self) -> None:
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(timeout=0.5):
+                try:
+                    sock, _ = key.fileobj.accept()
+                except (BlockingIOError, OSError):
+                    continue
+                sock.setblocking(True)
+                key.data.stats['connections'] += 1
+                threading.Thread(target=self._serve_connection, args=(sock, key.data),
+                                 name=f"sim-{key.data.name}", daemon=True).start()
+
+    def _serve_connection(self, sock: socket.socket, device: SimulatedDevice) -> None:
+        transport = paramiko.Transport(sock)
+        transport.set_log_channel(TRANSPORT_LOG)
+        transport.local_version = device.profile.server_version
+        transport.add_server_key(self.host_key)
+        server = DeviceServer(self, device)
+        with self._lock:
+            self._transports = [t for t in self._transports if t.is_active()]
+            self._transports.append(transport)
+        try:
+            transport.start_server(server=server)
+        except (paramiko.SSHException, EOFError, OSError) as e:
+            logger.debug(f"{device.name}: negotiation failed: {e}")
+            transport.close()
+            return
+
+        while transport.is_active() and not self._stop.is_set():
+            channel = transport.accept(timeout=1)
+            if channel is None:
+                continue
+            threading.Thread(target=self._serve_channel, args=(channel, server, device),
+                             name=f"sim-{device.name}-chan", daemon=True).start()
+
+    def _serve_channel(self, channel: paramiko.Channel, server: DeviceServer, device: SimulatedDevice) -> None:
+        request = server.wait_request(channel)
+        session = ChannelSession(channel, device, self.behavior)
+        try:
+            if request is None:
+                channel.close()
+            elif request[0] == 'exec':
+                session.run_exec(request[1])
+            else:
+                session.run_shell()
+        except (OSError, EOFError, paramiko.SSHException) as e:
+            logger.debug(f"{device.name}: channel closed: {e}")
+        finally:
+            channel.close()
+
+
+def build_fleet(count: int, platforms=PLATFORMS, base_port: int = 0, interfaces: int = 8,
+                arp: int = 16, routes: int = 50, churn: float = 0.0,
+                recordings: Optional[List[dict]] = None) -> List[SimulatedDevice]:
+    """
+    count devices cycling through platforms (or through recordings, when given).
+
+    base_port 0 lets the OS pick a free port per device; otherwise device i
+    listens on base_port + i.
+    """
+    devices = []
+    for index in range(count):
+        recording = recordings[index % len(recordings)] if recordings else None
+        platform = (recording or {}).get('platform') or platforms[index % len(platforms)]
+        name = f"sim-{platform}-{index:04d}"
+        topology = Topology(platform, name, index, interfaces=interfaces, arp=arp, routes=routes, churn=churn)
+        devices.append(SimulatedDevice(
+            name=name,
+            profile=DeviceProfile(platform, name, topology, recording),
+            port=base_port + index if base_port else 0,
+        ))
+    return devices
+
+
+def sessions_inventory(simulator: DeviceSimulator, folder: str = 'Simulator') -> List[dict]:
+    """The running fleet as a sessions.yaml folder, for the GUI, bulk fingerprinting and termtel-daemon"""
+    sessions = []
+    for device in simulator.devices:
+        sessions.append({
+            'DeviceType': DEVICE_TYPES[device.profile.platform],
+            'Model': '',
+            'SerialNumber': device.profile.topology.serial,
+            'SoftwareVersion': '',
+            'Vendor': 'Arista' if device.profile.platform == 'eos' else 'Cisco',
+            'credsid': '1',
+            'display_name': device.name,
+            'host': simulator.host,
+            'port': str(device.port),
+        })
+    return [{'folder_name': folder, 'sessions': sessions}]
@@ -0,0 +1,126 @@
+# ssh/expect.py
+"""
+Expect-style reading for interactive SSH channels.
+
+Instead of sleeping a fixed time and draining whatever has arrived, readers
+block on the channel and return as soon as the device prompt comes back,
+bounded by an overall deadline and an optional idle timeout.
+"""
+import re
+import select
+import time
+from typing import Optional, Pattern, Union
+
+# Matches a typical CLI prompt as the whole last line of output: router#,
+# switch>, user@host>, user@host:~$, FGT (global) #, <HUAWEI>, [~HUAWEI].
+# The line must start with the hostname, so banner lines such as "#####",
+# "--->" or "cost: $" do not count.
+GENERIC_PROMPT = re.compile(r"^[<\[]?~?\*?[A-Za-z0-9][\w.\-@/:~]*(?: ?\([\w\-/ ]*\) ?)?[#>$\]]\s*$")
+
+# Newlines sent while waiting for a prompt candidate to repeat
+PROMPT_CONFIRM_ATTEMPTS = 3
+
+# Upper bound for a single blocking wait so callers notice closed channels
+MAX_WAIT = 1.0
+
+
+def wait_readable(channel, timeout: float) -> bool:
+    """Block until the channel has data or EOF, or timeout seconds pass. No busy waiting."""
+    if channel.recv_ready() or channel.closed or channel.eof_received:
+        return True
+    readable, _, _ = select.select([channel], [], [], max(0.0, timeout))
+    return bool(readable)
+
+
+def prompt_pattern(prompt: str) -> Pattern:
+    """
+    Build a pattern for a detected prompt that also matches its mode variants.
+
+    "router1#" matches "router1(config)#" and "router1>", "<HUAWEI>" matches
+    "[~HUAWEI]", "user@fw>" matches "user@fw#".
+    """
+    base = prompt.strip().rstrip('#>$]').strip().lstrip('<[~*')
+    return re.compile(r"^[<\[]?~?\*?" + re.escape(base) + r"[^\r\n]{0,48}[#>$\]]\s*$")
+
+
+def last_line(text: str) -> str:
+    """Last line of output with carriage returns removed"""
+    return text.replace('\r', '').rsplit('\n', 1)[-1]
+
+
+def read_until_prompt(channel, prompt: Union[str, Pattern, None] = None, timeout: float = 10.0,
+                      idle_timeout: Optional[float] = None, encoding: str = 'utf-8') -> str:
+    """
+    Read from an interactive channel until the prompt is seen.
+
+    Args:
+        channel: paramiko Channel with an interactive shell
+        prompt: detected prompt text, a compiled pattern, or None for GENERIC_PROMPT
+        timeout: overall deadline in seconds
+        idle_timeout: give up after this many seconds without new data (None disables)
+        encoding: text encoding of the device output
+
+    Returns:
+        Everything received, whether the prompt was seen or a timeout fired
+    """
+    if prompt is None:
+        pattern = GENERIC_PROMPT
+    elif isinstance(prompt, re.Pattern):
+        pattern = prompt
+    else:
+        pattern = prompt_pattern(prompt)
+
+    output = []
+    tail = ""
+    deadline = time.monotonic() + timeout
+    last_data = time.monotonic()
+
+    while True:
+        now = time.monotonic()
+        wait = min(deadline - now, MAX_WAIT)
+        if idle_timeout is not None:
+            wait = min(wait, idle_timeout - (now - last_data))
+        if wait <= 0:
+            break
+
+        if not wait_readable(channel, wait):
+            continue
+
+        data = channel.recv(65535)
+        if not data:
+            break  # EOF / channel closed
+
+        text = data.decode(encoding, errors='replace')
+        output.append(text)
+        last_data = time.monotonic()
+
+        # Only the tail matters for prompt matching; avoid rescanning large outputs
+        tail = (tail + text)[-1024:]
+        if pattern.search(last_line(tail)):
+            break
+
+    return "".join(output)
+
+
+def detect_prompt(channel, timeout: float = 10.0, idle_timeout: Optional[float] = 2.0,
+                  drain_banner: bool = True) -> Optional[str]:
+    """
+    Drain the login banner, then send bare newlines until the same prompt comes back twice.
+
+    The banner is consumed first so the extra prompt produced by the newline
+    does not linger in the channel and end the next command read early. A
+    candidate is only accepted once it repeats, so a banner or MOTD line that
+    happens to look like a prompt is never pinned as the prompt.
+    """
+    if drain_banner:
+        read_until_prompt(channel, None, timeout=timeout, idle_timeout=idle_timeout)
+    previous = None
+    for _ in range(PROMPT_CONFIRM_ATTEMPTS):
+        channel.send("\n")
+        output = read_until_prompt(channel, None, timeout=timeout, idle_timeout=idle_timeout)
+        lines = [line.strip() for line in output.replace('\r', '').split('\n') if line.strip()]
+        candidate = next((line for line in reversed(lines) if GENERIC_PROMPT.search(line)), None)
+        if candidate is not None and candidate == previous:
+            return candidate
+        previous = candidate
+    return None
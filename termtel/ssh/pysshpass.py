@@ -1,3 +1,4 @@
+import re
 import sys
 import paramiko
 import click
@@ -8,6 +9,8 @@ import os
 import logging
 from pathlib import Path
 
+from termtel.ssh.expect import wait_readable, MAX_WAIT
+
 
 def setup_logging(host):
     """Configure logging with fallback to current directory"""
@@ -34,7 +37,7 @@ def setup_logging(host):
 
 
 def ssh_client(host, user, password, cmds, invoke_shell, prompt, prompt_count, timeout,
-               disable_auto_add_policy, look_for_keys, inter_command_time, connect_only=False):
+               disable_auto_add_policy, look_for_keys, inter_command_time, connect_only=False, port=22):
     """SSH Client for running remote commands."""
     logger = setup_logging(host)
 
@@ -50,6 +53,7 @@ def ssh_client(host, user, password, cmds, invoke_shell, prompt, prompt_count, t
     try:
         client.connect(
             hostname=host,
+            port=int(port),
             username=user,
             password=password,
             look_for_keys=look_for_keys,
@@ -77,17 +81,24 @@ def ssh_client(host, user, password, cmds, invoke_shell, prompt, prompt_count, t
 
     def execute_direct_command(command, timeout):
         stdin, stdout, stderr = client.exec_command(command)
-        start_time = time.time()
+        channel = stdout.channel
         output = ""
+        last_data = time.monotonic()
         while True:
-            if stdout.channel.recv_ready():
-                output_chunk = stdout.channel.recv(4096).decode('utf-8')
-                logger.info(output_chunk.rstrip())
-                output += output_chunk
-                start_time = time.time()
-            if time.time() - start_time > timeout:
+            idle_left = timeout - (time.monotonic() - last_data)
+            if idle_left <= 0:
                 logger.info("Command timed out.")
                 break
+            if not wait_readable(channel, min(idle_left, MAX_WAIT)):
+                continue
+            output_chunk = channel.recv(4096)
+            if not output_chunk:
+                # EOF: the device finished the command and closed the channel
+                break
+            output_chunk = output_chunk.decode('utf-8', errors='replace')
+            logger.info(output_chunk.rstrip())
+            output += output_chunk
+            last_data = time.monotonic()
         return output
 
     if invoke_shell:
@@ -100,7 +111,7 @@ def ssh_client(host, user, password, cmds, invoke_shell, prompt, prompt_count, t
         output_queue = Queue()
         read_thread = threading.Thread(
             target=read_output,
-            args=(channel, output_queue, prompt, prompt_count, logger)
+            args=(channel, output_queue, prompt, prompt_count, logger, timeout)
         )
         read_thread.daemon = True
         read_thread.start()
@@ -108,6 +119,7 @@ def ssh_client(host, user, password, cmds, invoke_shell, prompt, prompt_count, t
         for cmd in [cmd.strip() for cmd in cmds.split(',') if cmd.strip()]:
             execute_command_in_shell(channel, cmd)
 
+        output = None
         try:
             output = output_queue.get(timeout=timeout)
             logger.info("\nExiting: Prompt detected.")
@@ -115,7 +127,8 @@ def ssh_client(host, user, password, cmds, invoke_shell, prompt, prompt_count, t
             logger.info("\nExiting due to timeout.")
 
         channel.close()
-        return
+        client.close()
+        return output
     else:
         output = ""
         for cmd in [cmd.strip() for cmd in cmds.split(',') if cmd.strip()]:
@@ -125,22 +138,72 @@ def ssh_client(host, user, password, cmds, invoke_shell, prompt, prompt_count, t
         return output
 
 
-def read_output(channel, output_queue, prompt, prompt_count, logger):
+# A prompt line is one hostname-like token, optionally with a mode in
+# parentheses, followed by the prompt: "router1#", "sw-1(config-if)#",
+# "FGT (global) #". Banner and config lines with spaces or starting with
+# punctuation ("#####", "--->", "cost: $") do not qualify.
+PROMPT_LINE = r"^(?=[A-Za-z0-9])[\w.\-@/:~]*(?: ?\([\w\-/ ]*\) ?)?(?:{})\s*$"
+
+
+def compile_prompt(prompt):
+    """
+    Compile a prompt into a regex matched against single output lines.
+
+    Prompts are regular expressions (e.g. "#|>|\\$") for the end of the
+    prompt line; anything that is not a valid pattern is matched literally.
+    The pattern is anchored to the start of the line so only whole prompt
+    lines match, not output that merely ends in a prompt character.
+    """
+    if isinstance(prompt, re.Pattern):
+        return prompt
+    try:
+        re.compile(prompt)
+    except re.error:
+        prompt = re.escape(prompt)
+    return re.compile(PROMPT_LINE.format(prompt))
+
+
+def read_output(channel, output_queue, prompt, prompt_count, logger, timeout=None):
+    prompt_re = compile_prompt(prompt)
+    deadline = None if timeout is None else time.monotonic() + timeout
     counter = 0
     output = ""
+    partial = ""
+    partial_counted = False
     while True:
-        if channel.recv_ready():
-            output_chunk = channel.recv(4096).decode('utf-8').replace('\r', '')
-            logger.info(output_chunk.rstrip())
-            output += output_chunk
-
-            for line in output_chunk.split("\n"):
-                if (prompt in line) and ("-" in line):
-                    counter += 1
-                    if counter >= prompt_count:
-                        output_queue.put(output)
-                        return
-
-        if channel.closed:
+        wait = MAX_WAIT
+        if deadline is not None:
+            wait = min(wait, deadline - time.monotonic())
+            if wait <= 0:
+                output_queue.put(output)
+                return
+
+        if not wait_readable(channel, wait):
+            continue
+
+        output_chunk = channel.recv(4096) if not channel.closed else b""
+        if not output_chunk:
+            output_queue.put(output)
+            return
+
+        output_chunk = output_chunk.decode('utf-8', errors='replace').replace('\r', '')
+        logger.info(output_chunk.rstrip())
+        output += output_chunk
+
+        # Only whole lines are final; the trailing partial line is usually the
+        # prompt itself, so check it too but count it once.
+        lines = (partial + output_chunk).split("\n")
+        partial = lines.pop()
+        for i, line in enumerate(lines):
+            if i == 0 and partial_counted:
+                partial_counted = False
+                continue
+            if prompt_re.match(line):
+                counter += 1
+        if not partial_counted and partial and prompt_re.match(partial):
+            counter += 1
+            partial_counted = True
+
+        if counter >= prompt_count:
             output_queue.put(output)
-            return
\ No newline at end of file
+            return
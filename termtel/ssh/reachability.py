@@ -0,0 +1,167 @@
+# ssh/reachability.py
+"""
+Concurrent TCP reachability checks for saved sessions.
+
+All sessions are probed from one asyncio loop with a concurrency limit
+instead of a blocking socket (or a QThread) per host. Results are cached
+with a TTL so opening a tab can read the last known state without touching
+the network.
+"""
+import asyncio
+import socket
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+Target = Tuple[str, int]
+
+# How often a running scan checks its stop flag, in seconds
+STOP_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class ReachabilityResult:
+    host: str
+    port: int
+    reachable: bool
+    error: Optional[str] = None
+    latency: Optional[float] = None  # seconds to complete the TCP handshake
+    checked_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.checked_at
+
+
+class ReachabilityScanner:
+    """Probes many host:port targets concurrently and caches the results."""
+
+    def __init__(self, concurrency: int = 100, timeout: float = 3.0, ttl: float = 60.0):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.ttl = ttl
+        self._cache: Dict[Target, ReachabilityResult] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(host: str, port) -> Target:
+        return str(host).strip(), int(port)
+
+    def get_cached(self, host: str, port=22, max_age: Optional[float] = None) -> Optional[ReachabilityResult]:
+        """Last result for host:port if it is younger than max_age (default: the TTL)."""
+        try:
+            key = self.make_key(host, port)
+        except ValueError:
+            return None
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            result = self._cache.get(key)
+        if result and result.age <= max_age:
+            return result
+        return None
+
+    def store(self, result: ReachabilityResult) -> None:
+        with self._lock:
+            self._cache[(result.host, result.port)] = result
+
+    async def probe(self, host: str, port: int) -> ReachabilityResult:
+        """Single non-blocking TCP connect."""
+        started = time.monotonic()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=self.timeout)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+            return ReachabilityResult(host, port, True, latency=time.monotonic() - started)
+        except asyncio.TimeoutError:
+            return ReachabilityResult(host, port, False, f"Connection timed out after {self.timeout:g} seconds")
+        except ConnectionRefusedError:
+            return ReachabilityResult(host, port, False,
+                                      "Connection refused - service may not be running on the specified port")
+        except socket.gaierror:
+            return ReachabilityResult(host, port, False, "Could not resolve hostname")
+        except Exception as e:
+            return ReachabilityResult(host, port, False, str(e))
+
+    async def scan(self, targets: Iterable[Target],
+                   on_result: Optional[Callable[[ReachabilityResult], None]] = None,
+                   stop: Optional[threading.Event] = None) -> List[ReachabilityResult]:
+        """
+        Probe all targets, at most `concurrency` at a time, caching each result as it lands.
+
+        Setting `stop` (from any thread) cancels the probes still pending or in
+        flight; the results gathered so far are returned.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def bounded(host, port):
+            async with semaphore:
+                result = await self.probe(host, port)
+            self.store(result)
+            if on_result:
+                on_result(result)
+            return result
+
+        keys = []
+        for host, port in targets:
+            try:
+                key = self.make_key(host, port)
+            except ValueError:
+                logger.warning(f"Skipping {host}: invalid port {port}")
+                continue
+            if key not in keys:
+                keys.append(key)
+
+        started = time.monotonic()
+        pending = {asyncio.ensure_future(bounded(host, port)) for host, port in keys}
+        done = set()
+        while pending:
+            finished, pending = await asyncio.wait(pending, timeout=STOP_POLL_INTERVAL)
+            done |= finished
+            if stop is not None and stop.is_set():
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                logger.info(f"Reachability scan stopped, {len(pending)} probes cancelled")
+                break
+
+        results = [task.result() for task in done if not task.cancelled()]
+        up = sum(1 for r in results if r.reachable)
+        logger.info(f"Reachability scan: {up}/{len(results)} up in {time.monotonic() - started:.1f}s")
+        return results
+
+
+class ReachabilityScanThread(QThread):
+    """Runs one scan on a private event loop and reports each result to the UI thread."""
+    status_changed = pyqtSignal(object)  # ReachabilityResult
+    scan_finished = pyqtSignal(int, int)  # reachable, total
+
+    def __init__(self, targets: Iterable[Target], scanner: Optional['ReachabilityScanner'] = None, parent=None):
+        super().__init__(parent)
+        self.targets = list(targets)
+        self.scanner = scanner or reachability
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Cancel the probes that have not finished yet; safe to call from the UI thread."""
+        self._stop.set()
+
+    def run(self):
+        try:
+            results = asyncio.run(self.scanner.scan(self.targets, self.status_changed.emit, self._stop))
+            self.scan_finished.emit(sum(1 for r in results if r.reachable), len(results))
+        except Exception as e:
+            logger.error(f"Reachability scan failed: {e}")
+            self.scan_finished.emit(0, 0)
+
+
+# Process-wide scanner shared by the session tree and the terminal tabs
+reachability = ReachabilityScanner()
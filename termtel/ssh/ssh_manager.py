@@ -3,6 +3,8 @@ import paramiko
 import asyncio
 import base64
 
+from termtel.ssh.transport_pool import transport_pool
+
 class SSHClientManager:
     def __init__(self):
         self.clients = {}
@@ -10,16 +12,15 @@ class SSHClientManager:
     async def create_client(self, tab_id):
         ssh_client = paramiko.SSHClient()
         ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        self.clients[tab_id] = {'client': ssh_client, 'channel': None}
+        self.clients[tab_id] = {'client': ssh_client, 'channel': None, 'transport': None}
 
     async def connect(self, tab_id, hostname, port, username, password, websocket):
-        ssh_client = self.clients[tab_id]['client']
         try:
-            transport = paramiko.Transport((hostname, int(port)))
-            transport.set_keepalive(60)
-            transport.connect(username=username, password=password)
-            ssh_client._transport = transport
-            channel = ssh_client.invoke_shell(term="xterm")
+            transport = await asyncio.to_thread(
+                transport_pool.acquire, hostname, int(port), username, password
+            )
+            self.clients[tab_id]['transport'] = transport
+            channel = transport_pool.open_shell(transport, term="xterm")
             self.clients[tab_id]['channel'] = channel
         except paramiko.SSHException as e:
             await self.handle_ssh_error(tab_id, hostname, e, websocket)
@@ -45,10 +46,11 @@ class SSHClientManager:
         client_data = self.clients.pop(tab_id, None)
         if client_data:
             channel = client_data['channel']
-            client = client_data['client']
+            transport = client_data.get('transport')
             if channel:
                 channel.close()
-            client.close()
+            if transport:
+                transport_pool.release(transport)
 
     async def listen_to_ssh_output(self, tab_id, websocket):
         while True:
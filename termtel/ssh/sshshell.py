@@ -3,6 +3,8 @@ from .sshshellreader import ShellReaderThread
 from PyQt6.QtWidgets import QMessageBox
 import paramiko
 
+from termtel.ssh.transport_pool import transport_pool
+
 
 class Backend(QObject):
     send_output = pyqtSignal(str)
@@ -11,47 +13,34 @@ class Backend(QObject):
     def __init__(self, host, username, password=None, port='22', key_path=None, parent_widget=None, parent=None):
         super().__init__(parent)
         self.parent_widget = parent_widget
-        self.client = None
+        self.transport = None
         self.channel = None
         self.reader_thread = None
 
         try:
-            self.client = paramiko.SSHClient()
-            self.client.load_system_host_keys()  # Load known host keys from the system
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())  # Automatically add unknown hosts
             host = str(host).strip()
             username = str(username).strip()
 
+            # Authenticated transports are shared through the pool, so a second
+            # tab (or the dashboard) for the same device skips the login.
+            private_key = None
             if key_path:
-                try:
-                    private_key = paramiko.RSAKey(filename=key_path.strip())
-                    self.client.connect(hostname=host, username=username, pkey=private_key)
-                    transport = self.client.get_transport()
-                    transport.set_keepalive(60)
-                except paramiko.AuthenticationException as e:
-                    self.notify("Login Failure", f"Authentication Failed: {host}")
-                    return
-                except paramiko.SSHException as e:
-                    self.notify("Login Failure", f"Connection Failed: {host} Reason: {e}")
-                    return
-                except Exception as e:
-                    self.notify("Error", str(e))
-                    return
+                private_key = paramiko.RSAKey(filename=key_path.strip())
             else:
                 password = str(password).strip()
-                try:
-                    self.client.connect(hostname=host, port=int(port), username=username, password=password, look_for_keys=False)
-                    transport = self.client.get_transport()
-                    transport.set_keepalive(60)
-                except paramiko.AuthenticationException as e:
-                    self.notify("Login Failure", f"Authentication Failed: {host}")
-                    return
-                except paramiko.SSHException as e:
-                    self.notify("Login Failure", f"Connection Failed: {host} Reason: {e}")
-                    return
-                except Exception as e:
-                    self.notify("Error", str(e))
-                    return
+
+            try:
+                self.transport = transport_pool.acquire(host, port=port, username=username,
+                                                        password=password, pkey=private_key)
+            except paramiko.AuthenticationException as e:
+                self.notify("Login Failure", f"Authentication Failed: {host}")
+                return
+            except paramiko.SSHException as e:
+                self.notify("Login Failure", f"Connection Failed: {host} Reason: {e}")
+                return
+            except Exception as e:
+                self.notify("Error", str(e))
+                return
 
             self.setup_shell()
 
@@ -61,16 +50,19 @@ class Backend(QObject):
 
     def setup_shell(self):
         try:
-            self.channel = self.client.invoke_shell("xterm")
+            self.channel = self.transport.open_session()
+            self.channel.get_pty("xterm")
+            self.channel.invoke_shell()
             self.channel.set_combine_stderr(True)
             print("Invoked Shell!")
         except Exception as e:
             print(f"Shell not supported, falling back to pty...")
-            transport = self.client.get_transport()
-            options = transport.get_security_options()
+            options = self.transport.get_security_options()
             print(options)
 
-            self.channel = transport.open_session()
+            if self.channel is not None:
+                self.channel.close()
+            self.channel = self.transport.open_session()
             self.channel.get_pty()  # Request a pseudo-terminal
             self.channel.set_combine_stderr(True)
 
@@ -120,12 +112,18 @@ class Backend(QObject):
         else:
             print("Error: Channel is not ready or doesn't exist")
 
+    def disconnect(self):
+        """Close the shell channel and hand the transport back to the pool."""
+        if self.channel:
+            self.channel.close()
+            self.channel = None
+
+        if self.transport:
+            transport_pool.release(self.transport)
+            self.transport = None
+
     def __del__(self):
         if self.reader_thread and self.reader_thread.isRunning():
             self.reader_thread.terminate()
 
-        if self.channel:
-            self.channel.close()
-
-        if self.client:
-            self.client.close()
+        self.disconnect()
@@ -0,0 +1,250 @@
+# ssh/transport_pool.py
+"""
+Shared pool of authenticated paramiko Transports.
+
+One device visit used to open a separate SSH login for the terminal, the
+fingerprinting pass and the dashboard. The pool keeps one authenticated
+Transport per (host, port, username, credentials) and hands out new channels
+on it, so only the first consumer pays for the TCP connect, key exchange and
+login. A caller with different credentials never gets someone else's login.
+"""
+import hashlib
+import hmac
+import os
+import socket
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+# (host, port, username, keyed digest of the password or private key)
+PoolKey = Tuple[str, int, str, str]
+
+
+@dataclass
+class PooledTransport:
+    """A pooled Transport together with its bookkeeping"""
+    key: PoolKey
+    transport: paramiko.Transport
+    refcount: int = 0
+    created: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    last_checked: float = field(default_factory=time.monotonic)
+
+
+class TransportPool:
+    """Reference counted pool of authenticated Transports keyed by (host, port, username, credentials)."""
+
+    def __init__(self, idle_timeout: float = 300, health_check_interval: float = 30,
+                 keepalive: int = 60, connect_timeout: float = 10, reap_interval: float = 30):
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.keepalive = keepalive
+        self.connect_timeout = connect_timeout
+        self.reap_interval = reap_interval
+
+        self._entries: Dict[PoolKey, PooledTransport] = {}
+        self._lock = threading.RLock()
+        # Serialise logins per key so two callers racing for the same device
+        # do not both authenticate.
+        self._key_locks: Dict[PoolKey, threading.Lock] = {}
+        self._reaper = None
+        self._stop = threading.Event()
+        # Per-process secret so credential digests in keys and stats() cannot be brute forced offline
+        self._secret = os.urandom(16)
+
+    def make_key(self, host: str, port, username: str, password: Optional[str] = None,
+                 pkey: Optional[paramiko.PKey] = None) -> PoolKey:
+        secret = pkey.asbytes() if pkey is not None else (password or '').encode('utf-8')
+        digest = hmac.new(self._secret, secret, hashlib.sha256).hexdigest()[:16]
+        return str(host).strip(), int(port), str(username).strip(), digest
+
+    def acquire(self, host: str, port=22, username: str = '', password: Optional[str] = None,
+                pkey: Optional[paramiko.PKey] = None, timeout: Optional[float] = None) -> paramiko.Transport:
+        """
+        Get an authenticated Transport for host/port/username, logging in only if needed.
+
+        A pooled Transport is only reused for the same credentials; a different
+        password or key logs in again instead of riding on the earlier login.
+
+        Every successful acquire must be paired with a release().
+
+        Raises:
+            paramiko.AuthenticationException: credentials were rejected
+            paramiko.SSHException / OSError: the device could not be reached
+        """
+        key = self.make_key(host, port, username, password, pkey)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and self._is_healthy(entry):
+                    entry.refcount += 1
+                    entry.last_used = time.monotonic()
+                    logger.debug(f"Reusing transport for {key} (refs={entry.refcount})")
+                    return entry.transport
+                if entry:
+                    logger.info(f"Discarding unhealthy transport for {key}")
+                    self._discard(entry)
+
+            transport = self._connect(key, password, pkey, timeout or self.connect_timeout)
+
+            with self._lock:
+                entry = PooledTransport(key=key, transport=transport, refcount=1)
+                self._entries[key] = entry
+                self._ensure_reaper()
+            return transport
+
+    def release(self, transport: paramiko.Transport, close: bool = False) -> None:
+        """
+        Give back a Transport obtained from acquire().
+
+        With close=True the Transport is closed once nobody else holds it,
+        for one-shot callers such as bulk runs that will not be back soon.
+        """
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.transport is transport:
+                    entry.refcount = max(0, entry.refcount - 1)
+                    entry.last_used = time.monotonic()
+                    logger.debug(f"Released transport for {entry.key} (refs={entry.refcount})")
+                    if not transport.is_active() or (close and entry.refcount == 0):
+                        self._discard(entry)
+                    return
+        # Not pooled (already discarded); make sure it does not leak.
+        try:
+            transport.close()
+        except Exception:
+            pass
+
+    def open_shell(self, transport: paramiko.Transport, term: str = 'vt100',
+                   width: int = 80, height: int = 24) -> paramiko.Channel:
+        """Open an interactive shell channel on a pooled Transport."""
+        channel = transport.open_session(timeout=self.connect_timeout)
+        channel.get_pty(term=term, width=width, height=height)
+        channel.invoke_shell()
+        return channel
+
+    def exec_command(self, transport: paramiko.Transport, command: str) -> paramiko.Channel:
+        """Run a single command on a new exec channel of a pooled Transport."""
+        channel = transport.open_session(timeout=self.connect_timeout)
+        channel.exec_command(command)
+        return channel
+
+    def reap_idle(self) -> int:
+        """Close unused Transports that have been idle too long or died. Returns the number closed."""
+        now = time.monotonic()
+        closed = 0
+        with self._lock:
+            for entry in list(self._entries.values()):
+                idle = entry.refcount == 0 and now - entry.last_used > self.idle_timeout
+                if idle or not entry.transport.is_active():
+                    logger.info(f"Closing {'idle' if idle else 'dead'} transport for {entry.key}")
+                    self._discard(entry)
+                    closed += 1
+            self._prune_key_locks()
+        return closed
+
+    def close_all(self) -> None:
+        """Close every pooled Transport and stop the reaper."""
+        self._stop.set()
+        with self._lock:
+            for entry in list(self._entries.values()):
+                self._discard(entry)
+            self._prune_key_locks()
+
+    def stats(self) -> Dict[PoolKey, dict]:
+        """Snapshot of the pool for diagnostics."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: {
+                    'refcount': entry.refcount,
+                    'age': now - entry.created,
+                    'idle': now - entry.last_used,
+                    'active': entry.transport.is_active(),
+                }
+                for key, entry in self._entries.items()
+            }
+
+    def _connect(self, key: PoolKey, password: Optional[str], pkey: Optional[paramiko.PKey],
+                 timeout: float) -> paramiko.Transport:
+        host, port, username, _ = key
+        logger.info(f"Opening new transport to {host}:{port} as {username}")
+        sock = socket.create_connection((host, port), timeout=timeout)
+        transport = paramiko.Transport(sock)
+        try:
+            transport.start_client(timeout=timeout)
+            if pkey is not None:
+                transport.auth_publickey(username, pkey)
+            else:
+                try:
+                    transport.auth_password(username, password or '')
+                except paramiko.BadAuthenticationType as e:
+                    # Some devices only offer keyboard-interactive for password logins
+                    if 'keyboard-interactive' not in e.allowed_types:
+                        raise
+                    transport.auth_interactive_dumb(username, lambda title, instructions, prompts: [
+                        password or '' for _ in prompts
+                    ])
+            if not transport.is_authenticated():
+                raise paramiko.AuthenticationException(f"Authentication failed for {username}@{host}")
+            transport.set_keepalive(self.keepalive)
+            return transport
+        except Exception:
+            transport.close()
+            raise
+
+    def _is_healthy(self, entry: PooledTransport) -> bool:
+        transport = entry.transport
+        if not (transport.is_active() and transport.is_authenticated()):
+            return False
+        now = time.monotonic()
+        if now - entry.last_checked < self.health_check_interval:
+            return True
+        try:
+            transport.send_ignore()
+            entry.last_checked = now
+            return True
+        except Exception as e:
+            logger.debug(f"Health check failed for {entry.key}: {e}")
+            return False
+
+    def _discard(self, entry: PooledTransport) -> None:
+        self._entries.pop(entry.key, None)
+        try:
+            entry.transport.close()
+        except Exception:
+            pass
+
+    def _prune_key_locks(self) -> None:
+        """Drop login locks of keys that have no transport and no login in progress"""
+        for key, key_lock in list(self._key_locks.items()):
+            if key not in self._entries and not key_lock.locked():
+                del self._key_locks[key]
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper and self._reaper.is_alive():
+            return
+        self._stop.clear()
+        self._reaper = threading.Thread(target=self._reap_loop, name="ssh-transport-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        while not self._stop.wait(self.reap_interval):
+            try:
+                self.reap_idle()
+            except Exception as e:
+                logger.error(f"Transport reaper error: {e}")
+
+
+# Process-wide pool shared by the terminal, fingerprinting and discovery
+transport_pool = TransportPool()
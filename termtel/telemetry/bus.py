@@ -0,0 +1,68 @@
+# telemetry/bus.py
+"""
+Qt side of the polling engine.
+
+TelemetryBus re-emits engine events as Qt signals. The engine publishes from
+its worker threads; Qt queues those signals to each receiver's thread, so
+dashboard slots connected to the shared bus run on the UI thread.
+"""
+from typing import Optional
+
+from PyQt6.QtCore import QCoreApplication, QObject, pyqtSignal
+
+from termtel.telemetry.engine import PollingEngine
+from termtel.telemetry.poller import PollEvent
+from termtel.telemetry.snapshot import metrics_snapshot
+from termtel.telemetry.store import metrics_store
+
+
+class TelemetryBus(QObject):
+    event = pyqtSignal(object)  # every PollEvent
+    result_ready = pyqtSignal(str, str, object)  # device_id, getter, result
+    device_error = pyqtSignal(str, str, str)  # device_id, getter, error
+
+    def __init__(self, engine: PollingEngine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        engine.subscribe(self._on_event)
+
+    def _on_event(self, event: PollEvent):
+        self.event.emit(event)
+        if event.ok:
+            self.result_ready.emit(event.device_id, event.getter, event.result)
+        else:
+            self.device_error.emit(event.device_id, event.getter, event.error)
+
+    def shutdown(self):
+        self.engine.unsubscribe(self._on_event)
+        self.engine.stop()
+        store = metrics_store()
+        if store is not None:
+            store.flush()
+
+
+_shared_bus: Optional[TelemetryBus] = None
+
+
+def shared_bus(settings_manager=None) -> TelemetryBus:
+    """Application-wide engine and bus, created and started on first use"""
+    global _shared_bus
+    if _shared_bus is None:
+        concurrency, jitter, backoff_max, adaptive = 8, 0.1, 600, False
+        if settings_manager is not None:
+            concurrency = settings_manager.get_telemetry_setting('engine_concurrency', concurrency)
+            jitter = settings_manager.get_telemetry_setting('poll_jitter', jitter)
+            backoff_max = settings_manager.get_telemetry_setting('poll_backoff_max', backoff_max)
+            adaptive = settings_manager.get_telemetry_setting('poll_adaptive', adaptive)
+        engine = PollingEngine(concurrency=concurrency, jitter=jitter, backoff_max=backoff_max,
+                               adaptive=adaptive)
+        engine.subscribe(metrics_snapshot.on_poll_event)
+        store = metrics_store(settings_manager)
+        if store is not None:
+            engine.subscribe(store.on_poll_event)
+        engine.start()
+        _shared_bus = TelemetryBus(engine)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_shared_bus.shutdown)
+    return _shared_bus
@@ -0,0 +1,59 @@
+# telemetry/classify.py
+"""
+Switch/router classification.
+
+Decided once per device, cheapest source first: a role remembered in the
+fingerprint cache, then the model number from the facts the dashboard
+already fetched, and only then a 'show spanning-tree summary' probe, which
+stays a few lines long however many VLANs the box carries (the full
+'show spanning-tree' used before grows with every VLAN and port).
+"""
+import re
+from typing import Callable, Optional
+
+# Model number patterns -> is_switch; first match wins
+MODEL_ROLES = [
+    # Catalyst 1000/1200/1300 (C1000-24T-4G-L, C1000FE-...) before the ISR 1100 pattern
+    (re.compile(r'WS-C|C9[2-6]|C3[6-8]50|C29[0-9]{2}|C1[0-3]00(FE)?-|IE-|N[2-9]K|NEXUS|DCS-|CCS-|VEOS|CEOS',
+                re.I), True),
+    (re.compile(r'ISR|ASR|CSR|C8[0-9]{2}|C11[0-9]{2}|CISCO[0-9]{4}|7[26]0[0-9]', re.I), False),
+]
+
+STP_PROBE = 'show spanning-tree summary'
+# Probe output of a device that is running spanning tree
+STP_ACTIVE_RE = re.compile(r'switch is in|spanning tree mode|spanning-tree mode|root bridge for', re.I)
+# Probe output of a device without spanning tree (or without the command)
+STP_ABSENT_RE = re.compile(r'no spanning tree|not enabled|invalid input|incomplete command|not supported', re.I)
+
+
+def classify_model(model: Optional[str]) -> Optional[bool]:
+    """True for a switch, False for a router, None when the model is not recognised"""
+    if not model:
+        return None
+    for pattern, is_switch in MODEL_ROLES:
+        if pattern.search(model):
+            return is_switch
+    return None
+
+
+def parse_stp_summary(output: str) -> bool:
+    """is_switch from 'show spanning-tree summary' output"""
+    if not output or STP_ABSENT_RE.search(output):
+        return False
+    return bool(STP_ACTIVE_RE.search(output))
+
+
+def classify_device(facts: dict, run_command: Callable[[str], str], cached: Optional[dict] = None) -> bool:
+    """
+    is_switch for a device.
+
+    cached is the host's fingerprint cache entry, if any; run_command(cmd)
+    returns CLI output and is only called when neither the cache nor the
+    model decides.
+    """
+    if cached and isinstance(cached.get('is_switch'), bool):
+        return cached['is_switch']
+    is_switch = classify_model(facts.get('model'))
+    if is_switch is None:
+        is_switch = parse_stp_summary(run_command(STP_PROBE))
+    return is_switch
@@ -0,0 +1,273 @@
+# telemetry/daemon.py
+"""
+Headless telemetry daemon.
+
+Polls a list of devices with the same Qt-free core the dashboard uses
+(PollingEngine / DevicePoller) and writes every result as JSON Lines, to the
+metrics store (telemetry.db), or both. Optionally serves the OpenMetrics
+snapshot on --metrics-port for Prometheus to scrape.
+
+Devices file: either a list of devices
+
+    defaults: {driver: ios, username: admin, password_env: NET_PASSWORD}
+    devices:
+      - {name: core1, host: 10.0.0.1, driver: eos}
+      - {host: 10.0.0.2, port: 2222}
+
+or a termtel sessions.yaml, whose DeviceType picks the driver.
+"""
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import click
+import yaml
+
+from termtel.telemetry.engine import PollingEngine
+from termtel.telemetry.poller import PollEvent
+from termtel.telemetry.schedule import DEFAULT_INTERVALS
+from termtel.telemetry.snapshot import CONTENT_TYPE, metrics_snapshot
+from termtel.telemetry.store import MetricsStore
+
+logger = logging.getLogger(__name__)
+
+# Substrings of a sessions.yaml DeviceType -> NAPALM driver, first match wins
+DEVICE_TYPE_DRIVERS = [
+    ('nxos', 'nxos'),
+    ('nexus', 'nxos'),
+    ('eos', 'eos'),
+    ('arista', 'eos'),
+    ('ios', 'ios'),
+    ('cisco', 'ios'),
+]
+# Result keys that are in-memory indexes or bulky raw text, not telemetry
+SKIPPED_KEYS = {'table', 'index', 'churn', 'raw_output'}
+
+
+def driver_for(device_type: str) -> Optional[str]:
+    """NAPALM driver for a sessions.yaml DeviceType, or None"""
+    device_type = (device_type or '').lower()
+    for needle, driver in DEVICE_TYPE_DRIVERS:
+        if needle in device_type:
+            return driver
+    return None
+
+
+def load_devices(path: str, username: Optional[str] = None, password: Optional[str] = None,
+                 driver: Optional[str] = None) -> List[dict]:
+    """
+    Devices to poll from a devices file or a sessions.yaml.
+
+    Per-device values win over the file's defaults, which win over the
+    command line. Devices without a host or a driver are skipped.
+    """
+    with open(path) as f:
+        data = yaml.safe_load(f) or {}
+
+    defaults = {'username': username, 'password': password, 'driver': driver}
+    if isinstance(data, dict):
+        defaults.update({key: value for key, value in (data.get('defaults') or {}).items() if value})
+        entries = data.get('devices') or []
+    else:
+        # sessions.yaml: list of folders with sessions
+        entries = []
+        for folder in data:
+            for session in folder.get('sessions', []) or []:
+                entries.append({
+                    'name': session.get('display_name'),
+                    'host': session.get('host'),
+                    'port': session.get('port'),
+                    'driver': driver_for(session.get('DeviceType')),
+                })
+
+    devices, seen = [], set()
+    for entry in entries:
+        device = dict(defaults)
+        device.update({key: value for key, value in entry.items() if value})
+        host = str(device.get('host', '')).strip()
+        name = str(device.get('name') or host)
+        if not host or name in seen:
+            continue
+        port = str(device.get('port') or '22')
+        if port != '22':
+            host = f"{host}:{port}"  # DeviceSession splits it off again
+        if not device.get('driver'):
+            logger.warning(f"Skipping {name}: no driver (set 'driver' or pass --driver)")
+            continue
+        password_env = device.get('password_env')
+        if password_env:
+            device['password'] = os.environ.get(password_env, device.get('password'))
+        seen.add(name)
+        devices.append({
+            'device_id': name,
+            'driver': device['driver'],
+            'hostname': host,
+            'username': device.get('username') or '',
+            'password': device.get('password') or '',
+            'intervals': device.get('intervals'),
+        })
+    return devices
+
+
+def event_record(event: PollEvent) -> dict:
+    """A PollEvent as a JSON-serialisable dict, one line of the JSON Lines output"""
+    record = {
+        'timestamp': event.timestamp,
+        'device': event.device_id,
+        'getter': event.getter,
+        'ok': event.ok,
+        'duration': round(event.duration, 4),
+    }
+    if not event.ok:
+        record['error'] = event.error
+        return record
+
+    result = event.result or {}
+    if event.getter == 'routes':
+        table, churn = result.get('table'), result.get('churn')
+        record['result'] = {
+            'routes': len(table) if table is not None else None,
+            'default_route': result.get('structured_routes'),
+        }
+        if churn is not None:
+            record['result']['churn'] = [
+                {'prefix': e.prefix, 'kind': e.kind, 'protocol': e.protocol,
+                 'old_next_hops': list(e.old_next_hops), 'new_next_hops': list(e.new_next_hops)}
+                for e in churn.events
+            ]
+    else:
+        record['result'] = {key: value for key, value in result.items() if key not in SKIPPED_KEYS}
+    return record
+
+
+class JsonLinesWriter:
+    """PollingEngine subscriber appending one JSON object per event to a file (or stdout for '-')"""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._stream = sys.stdout if path == '-' else open(path, 'a', buffering=1)
+
+    def on_poll_event(self, event: PollEvent) -> None:
+        line = json.dumps(event_record(event), default=str)
+        with self._lock:
+            self._stream.write(line + '\n')
+            self._stream.flush()
+
+    def close(self) -> None:
+        if self._stream is not sys.stdout:
+            self._stream.close()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics_snapshot.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve_metrics(host: str, port: int) -> ThreadingHTTPServer:
+    """Serve /metrics from a background thread"""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="telemetry-metrics", daemon=True).start()
+    return server
+
+
+def parse_intervals(values) -> Dict[str, float]:
+    """('interfaces=30', 'routes=600') -> {'interfaces': 30.0, 'routes': 600.0}"""
+    intervals = {}
+    for value in values:
+        name, _, seconds = value.partition('=')
+        if name not in DEFAULT_INTERVALS:
+            raise click.BadParameter(f"unknown getter '{name}', expected one of {', '.join(DEFAULT_INTERVALS)}")
+        try:
+            intervals[name] = float(seconds)
+        except ValueError:
+            raise click.BadParameter(f"'{value}' is not getter=seconds")
+    return intervals
+
+
+@click.command()
+@click.argument('devices_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--username', envvar='TERMTEL_USERNAME', help='Default username (env TERMTEL_USERNAME).')
+@click.option('--password', envvar='TERMTEL_PASSWORD', help='Default password (env TERMTEL_PASSWORD).')
+@click.option('--driver', type=click.Choice(['ios', 'eos', 'nxos']), help='Driver for devices that do not set one.')
+@click.option('--jsonl', 'jsonl_path', help="Append results as JSON Lines to this file ('-' for stdout).")
+@click.option('--store/--no-store', default=True, show_default=True, help='Write interface history to the metrics store.')
+@click.option('--store-path', type=click.Path(dir_okay=False), help='Metrics store file (default: telemetry.db in the config dir).')
+@click.option('--concurrency', default=8, show_default=True, help='Devices polled at the same time.')
+@click.option('--jitter', default=0.1, show_default=True, help='Fraction of each delay randomized.')
+@click.option('--backoff-max', default=600.0, show_default=True, help='Longest delay between retries of a failing device.')
+@click.option('--adaptive', is_flag=True, help='Poll interfaces faster while utilization is changing.')
+@click.option('--interval', 'intervals', multiple=True, metavar='GETTER=SECONDS',
+              help='Override a getter interval, e.g. --interval interfaces=30 (repeatable).')
+@click.option('--metrics-port', type=int, help='Serve OpenMetrics on this port at /metrics.')
+@click.option('--metrics-host', default='127.0.0.1', show_default=True, help='Address for --metrics-port.')
+@click.option('-v', '--verbose', is_flag=True, help='Debug logging.')
+def main(devices_file, username, password, driver, jsonl_path, store, store_path, concurrency, jitter,
+         backoff_max, adaptive, intervals, metrics_port, metrics_host, verbose):
+    """Poll DEVICES_FILE without the GUI until interrupted."""
+    logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    intervals = parse_intervals(intervals)
+    devices = load_devices(devices_file, username, password, driver)
+    if not devices:
+        raise click.ClickException(f"No pollable devices in {devices_file}")
+    if not jsonl_path and not store and metrics_port is None:
+        raise click.ClickException("Nothing to write: pass --jsonl, --store or --metrics-port")
+
+    engine = PollingEngine(concurrency=concurrency, jitter=jitter, backoff_max=backoff_max, adaptive=adaptive)
+    engine.subscribe(metrics_snapshot.on_poll_event)
+
+    metrics_db = writer = server = None
+    if store:
+        metrics_db = MetricsStore(store_path)
+        engine.subscribe(metrics_db.on_poll_event)
+    if jsonl_path:
+        writer = JsonLinesWriter(jsonl_path)
+        engine.subscribe(writer.on_poll_event)
+    if metrics_port is not None:
+        server = serve_metrics(metrics_host, metrics_port)
+        logger.info(f"Serving metrics on http://{metrics_host}:{metrics_port}/metrics")
+
+    for device in devices:
+        device_intervals = dict(device.pop('intervals') or {})
+        device_intervals.update(intervals)
+        engine.add_device(intervals=device_intervals, **device)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    logger.info(f"Polling {len(devices)} devices, concurrency {concurrency}")
+    engine.start()
+    try:
+        while not stop.wait(60):
+            if metrics_db is not None:
+                metrics_db.flush()
+    finally:
+        logger.info("Stopping")
+        engine.stop()
+        if server is not None:
+            server.shutdown()
+        if metrics_db is not None:
+            metrics_db.close()
+        if writer is not None:
+            writer.close()
+
+
+if __name__ == '__main__':
+    main()
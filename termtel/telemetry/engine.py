@@ -0,0 +1,202 @@
+# telemetry/engine.py
+"""
+Multi-device polling engine.
+
+Keeps any number of devices under watch at once. Each device has its own
+DevicePoller (session, schedule and pacing); a single scheduler thread hands
+due devices to a bounded worker pool, so the number of simultaneous device
+conversations never exceeds the concurrency cap. Results are published to
+subscribers as PollEvents; the engine itself has no Qt dependency.
+"""
+import random
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from termtel.telemetry.poller import DevicePoller, PollEvent
+from termtel.telemetry.session import DeviceSession
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WatchedDevice:
+    device_id: str
+    poller: DevicePoller
+    next_run: float = 0.0
+    busy: bool = False
+    removed: bool = False
+
+    @property
+    def session(self) -> DeviceSession:
+        return self.poller.session
+
+
+class PollingEngine:
+    """Polls many devices on per-device schedules with a global concurrency cap."""
+
+    def __init__(self, concurrency: int = 8, jitter: float = 0.1,
+                 session_factory: Callable[..., DeviceSession] = DeviceSession,
+                 backoff_max: float = 600.0, adaptive: bool = False):
+        self.concurrency = max(1, int(concurrency))
+        self.jitter = jitter
+        self.backoff_max = backoff_max
+        self.adaptive = adaptive
+        self.session_factory = session_factory
+
+        self._devices: Dict[str, WatchedDevice] = {}
+        self._subscribers: List[Callable[[PollEvent], None]] = []
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # Subscribers
+
+    def subscribe(self, callback: Callable[[PollEvent], None]) -> None:
+        """callback(event) is called from a worker thread for every result"""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[PollEvent], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, event: PollEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Telemetry subscriber {callback} failed: {e}")
+
+    # Devices
+
+    def add_device(self, device_id: str, driver: str, hostname: str, username: str, password: str,
+                   intervals: Optional[Dict[str, float]] = None) -> None:
+        """Start watching a device; replaces an existing device with the same id"""
+        self.remove_device(device_id)
+        poller = DevicePoller(
+            device_id, driver, hostname, username, password, intervals=intervals,
+            pacing={'jitter': self.jitter, 'backoff_max': self.backoff_max, 'adaptive': self.adaptive},
+            session_factory=self.session_factory,
+        )
+        poller.subscribe(self.publish)
+        device = WatchedDevice(
+            device_id=device_id,
+            poller=poller,
+            # Spread first polls so a large watch list does not log in all at once
+            next_run=time.monotonic() + random.uniform(0, self.jitter * poller.schedule.tick_interval),
+        )
+        with self._lock:
+            self._devices[device_id] = device
+        logger.info(f"Watching {device_id} ({hostname})")
+        self._wake.set()
+
+    def remove_device(self, device_id: str) -> None:
+        with self._lock:
+            device = self._devices.pop(device_id, None)
+        if device is None:
+            return
+        device.removed = True
+        if not device.busy:
+            device.session.close()
+        logger.info(f"Stopped watching {device_id}")
+
+    def refresh(self, device_id: str, getters: Iterable[str], stale_only: bool = False) -> None:
+        """
+        Poll specific getters of a device as soon as a worker is free.
+
+        With stale_only, getters whose last result is still within their
+        interval are left to their tier.
+        """
+        with self._lock:
+            device = self._devices.get(device_id)
+            if device is None:
+                return
+            if stale_only:
+                getters = device.poller.schedule.stale(getters)
+                if not getters:
+                    return
+            device.poller.force(getters)
+            device.next_run = time.monotonic()
+        self._wake.set()
+
+    def devices(self) -> List[str]:
+        with self._lock:
+            return list(self._devices)
+
+    def status(self) -> Dict[str, dict]:
+        """Per-device snapshot for diagnostics"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                device_id: {
+                    'hostname': device.session.hostname,
+                    'connected': device.session.is_open,
+                    'busy': device.busy,
+                    'next_poll_in': max(0.0, device.next_run - now),
+                    'failures': device.poller.pacer.failures,
+                    'interface_interval': device.poller.schedule.interval('interfaces'),
+                    'last_error': device.poller.last_error,
+                }
+                for device_id, device in self._devices.items()
+            }
+
+    # Lifecycle
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="telemetry-poll")
+        self._thread = threading.Thread(target=self._run, name="telemetry-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop scheduling, let running polls finish and close every session"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            devices = list(self._devices.values())
+        for device in devices:
+            device.session.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            next_wake = now + 1.0
+            with self._lock:
+                for device in self._devices.values():
+                    if device.busy:
+                        continue
+                    if device.next_run <= now:
+                        device.busy = True
+                        self._executor.submit(self._poll_device, device)
+                    else:
+                        next_wake = min(next_wake, device.next_run)
+            self._wake.wait(max(0.0, next_wake - time.monotonic()))
+            self._wake.clear()
+
+    def _poll_device(self, device: WatchedDevice) -> None:
+        try:
+            device.poller.poll(should_stop=lambda: device.removed or self._stop.is_set())
+        finally:
+            device.next_run = time.monotonic() + device.poller.next_delay()
+            device.busy = False
+            if device.removed:
+                device.poller.close()
+            self._wake.set()
@@ -0,0 +1,152 @@
+# telemetry/neighbors.py
+"""
+ARP and LLDP tables with search indexes.
+
+Built on the polling thread from get_arp_table() / get_lldp_neighbors()
+results. Lookups by IP, MAC and interface are dict hits; partial MACs, IPs
+and neighbor names are resolved with a bisect over sorted keys, so finding
+where a MAC lives stays instant on routers with 50k+ ARP entries.
+"""
+import ipaddress
+import re
+import socket
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ARP_COLUMNS = ["IP Address", "MAC Address", "Interface", "Age", "Route"]
+LLDP_COLUMNS = ["Local Port", "Neighbor", "Remote Port"]
+
+HEX_RE = re.compile(r'[^0-9a-f]')
+MAC_QUERY_RE = re.compile(r'^[0-9a-f.:\-]+$', re.IGNORECASE)
+IP_QUERY_RE = re.compile(r'^[0-9.]+$')
+INTERFACE_RE = re.compile(r'^([a-z][a-z\-]*)\s*([0-9][0-9/.:]*)$')
+
+
+def normalize_mac(mac: str) -> str:
+    """'AA:BB:CC:DD:EE:FF', 'aabb.ccdd.eeff' -> 'aabbccddeeff'"""
+    return HEX_RE.sub('', str(mac).lower())
+
+
+def interface_key(name: str) -> str:
+    """'GigabitEthernet0/1' and 'Gi0/1' -> 'gi0/1', so short and long names match"""
+    name = str(name).strip().lower()
+    match = INTERFACE_RE.match(name)
+    if not match:
+        return name
+    return match.group(1)[:2] + match.group(2)
+
+
+def ip_sort_keys(ips: Sequence[str]) -> np.ndarray:
+    """Numeric sort keys for IP strings; anything that is not IPv4 sorts last"""
+    keys = np.full(len(ips), 1 << 32, dtype=np.uint64)
+    for row, ip in enumerate(ips):
+        try:
+            keys[row] = int.from_bytes(socket.inet_aton(ip), 'big')
+        except (OSError, TypeError):
+            pass
+    return keys
+
+
+def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    """Slice of sorted keys starting with prefix"""
+    return bisect_left(keys, prefix), bisect_left(keys, prefix + '\U0010ffff')
+
+
+class NeighborTable:
+    """One poll's ARP and LLDP entries, columnar, with hash and prefix indexes."""
+
+    def __init__(self, arp: Optional[Iterable[dict]] = None, lldp: Optional[Dict[str, List[dict]]] = None):
+        self.arp_ips: List[str] = []
+        self.arp_macs: List[str] = []
+        self.arp_interfaces: List[str] = []
+        self.arp_ages: List[str] = []
+        self.arp_routes: List[str] = []  # filled in by the dashboard from the route index
+        self.lldp_local: List[str] = []
+        self.lldp_neighbors: List[str] = []
+        self.lldp_remote: List[str] = []
+
+        self.by_ip: Dict[str, int] = {}
+        self.by_mac: Dict[str, List[int]] = defaultdict(list)
+        self.by_interface: Dict[str, List[int]] = defaultdict(list)
+        self.lldp_by_interface: Dict[str, List[int]] = defaultdict(list)
+        self.lldp_by_neighbor: Dict[str, List[int]] = defaultdict(list)
+
+        for row, entry in enumerate(arp or []):
+            ip, mac = entry.get('ip', 'N/A'), entry.get('mac', 'N/A')
+            interface = entry.get('interface', 'N/A')
+            age = entry.get('age')
+            self.arp_ips.append(ip)
+            self.arp_macs.append(mac)
+            self.arp_interfaces.append(interface)
+            self.arp_ages.append('' if age is None or age == -1 else str(age))
+            self.by_ip.setdefault(ip, row)
+            self.by_mac[normalize_mac(mac)].append(row)
+            self.by_interface[interface_key(interface)].append(row)
+        self.arp_routes = [''] * len(self.arp_ips)
+
+        for local_port, neighbors in (lldp or {}).items():
+            for neighbor in neighbors:
+                row = len(self.lldp_local)
+                name = neighbor.get('hostname', 'N/A')
+                self.lldp_local.append(local_port)
+                self.lldp_neighbors.append(name)
+                self.lldp_remote.append(neighbor.get('port', 'N/A'))
+                self.lldp_by_interface[interface_key(local_port)].append(row)
+                self.lldp_by_neighbor[name.lower()].append(row)
+
+        self._ips = sorted(self.by_ip)
+        self._macs = sorted(self.by_mac)
+        self._neighbors = sorted(self.lldp_by_neighbor)
+
+    def arp_columns(self) -> List[Sequence[str]]:
+        return [self.arp_ips, self.arp_macs, self.arp_interfaces, self.arp_ages, self.arp_routes]
+
+    def lldp_columns(self) -> List[Sequence[str]]:
+        return [self.lldp_local, self.lldp_neighbors, self.lldp_remote]
+
+    def search(self, query: str) -> Tuple[List[int], List[int]]:
+        """
+        (ARP rows, LLDP rows) matching query.
+
+        Full IPs, MACs and interface names match exactly; partial IPs and MACs
+        (any separator style) and neighbor names match by prefix.
+        """
+        query = query.strip()
+        arp_rows, lldp_rows = set(), set()
+        if not query:
+            return [], []
+
+        ip_like = bool(IP_QUERY_RE.match(query)) and '.' in query
+        try:
+            ipaddress.ip_address(query)
+            if query in self.by_ip:
+                arp_rows.add(self.by_ip[query])
+        except ValueError:
+            if ip_like:
+                start, end = _prefix_range(self._ips, query)
+                arp_rows.update(self.by_ip[ip] for ip in self._ips[start:end])
+
+        # '10.1' reads as an IP prefix; it is only tried as a dotted MAC if no IP matched
+        if MAC_QUERY_RE.match(query) and not (ip_like and arp_rows):
+            mac = normalize_mac(query)
+            if len(mac) >= 2:
+                start, end = _prefix_range(self._macs, mac)
+                for key in self._macs[start:end]:
+                    arp_rows.update(self.by_mac[key])
+
+        key = interface_key(query)
+        arp_rows.update(self.by_interface.get(key, ()))
+        lldp_rows.update(self.lldp_by_interface.get(key, ()))
+
+        start, end = _prefix_range(self._neighbors, query.lower())
+        for name in self._neighbors[start:end]:
+            lldp_rows.update(self.lldp_by_neighbor[name])
+
+        # A MAC's ARP interface also finds the LLDP neighbor on that port
+        for interface in {self.arp_interfaces[row] for row in arp_rows}:
+            lldp_rows.update(self.lldp_by_interface.get(interface_key(interface), ()))
+
+        return sorted(arp_rows), sorted(lldp_rows)
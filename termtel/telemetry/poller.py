@@ -0,0 +1,125 @@
+# telemetry/poller.py
+"""
+Qt-free poll cycle for one device.
+
+DevicePoller owns a device's DeviceSession, PollSchedule and AdaptivePacer
+and runs the getters that are due, publishing every result or failure as a
+PollEvent to its subscribers. The multi-device PollingEngine (behind the
+dashboard and the headless daemon) and the single-device DeviceInfoWorker
+all drive this same cycle; they only differ in what subscribes to the
+events (Qt signals, the metrics snapshot and store, a JSON Lines file).
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from termtel.telemetry.schedule import AdaptivePacer, PollSchedule
+from termtel.telemetry.session import DeviceSession
+from termtel.telemetry.spans import spans
+
+logger = logging.getLogger(__name__)
+
+GETTERS = ('facts', 'interfaces', 'neighbors', 'routes')
+
+
+@dataclass
+class PollEvent:
+    """One getter result (or failure) for one device"""
+    device_id: str
+    getter: str
+    result: Any = None
+    error: Optional[str] = None
+    duration: float = 0.0
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class DevicePoller:
+    """Runs the due getters of one device and publishes PollEvents."""
+
+    def __init__(self, device_id: str, driver: str, hostname: str, username: str, password: str,
+                 intervals: Optional[Dict[str, float]] = None, pacing: Optional[dict] = None,
+                 session_factory: Callable[..., DeviceSession] = DeviceSession):
+        self.device_id = device_id
+        self.session = session_factory(driver, hostname, username, password)
+        self.schedule = PollSchedule(intervals)
+        self.pacer = AdaptivePacer(self.schedule, **(pacing or {}))
+        self.last_error: Optional[str] = None
+        self._subscribers: List[Callable[[PollEvent], None]] = []
+
+    def subscribe(self, callback: Callable[[PollEvent], None]) -> None:
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[PollEvent], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, event: PollEvent) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Poll subscriber {callback} failed for {self.device_id}: {e}")
+
+    def poll(self, should_stop: Callable[[], bool] = lambda: False) -> bool:
+        """
+        Run the getters that are due, in order, each on its own.
+
+        A getter that fails on a healthy connection is put on its own backoff
+        and the rest still run. A lost connection ends the cycle. The pacer
+        backs the whole device off only when the connection was lost or every
+        getter failed, so next_delay() gives the time until the next cycle.
+        Returns True if every getter succeeded.
+        """
+        succeeded, failed, lost, utilization = 0, 0, False, None
+        for name in self.schedule.due():
+            if should_stop():
+                break
+            started = time.monotonic()
+            try:
+                with spans.span(self.session.hostname, f'getter.{name}'):
+                    result = getattr(self.session, f"get_{name}")()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"{self.device_id}: {name} failed: {e}")
+                failed += 1
+                lost = self.session.connection_lost(e)
+                if lost:
+                    self.session.close()
+                else:
+                    self.schedule.fail([name])
+                self.publish(PollEvent(self.device_id, name, error=str(e),
+                                       duration=time.monotonic() - started))
+                if lost:
+                    break
+                continue
+            succeeded += 1
+            self.schedule.mark([name])
+            if name == 'interfaces':
+                utilization = {
+                    interface: details.get('utilization', 0.0)
+                    for interface, details in result.get('interfaces', {}).items()
+                }
+            self.publish(PollEvent(self.device_id, name, result=result, duration=time.monotonic() - started))
+
+        if not failed:
+            self.last_error = None
+        if lost or (failed and not succeeded):
+            self.pacer.record_failure()
+        else:
+            self.pacer.record_success(utilization)
+        return not failed
+
+    def next_delay(self) -> float:
+        return self.pacer.next_delay()
+
+    def force(self, names) -> None:
+        self.schedule.force(names)
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,111 @@
+# telemetry/rates.py
+"""
+Interface rates from counter deltas.
+
+Device-reported rates (INPUT_RATE/OUTPUT_RATE) are a 5 minute EWMA on IOS,
+so short spikes never show up. Rates here are computed from octet and packet
+counter deltas between two polls, for all interfaces of a device in one
+vectorized step. A counter that goes backwards is a reset (clear counters,
+reload, flapping interface) and that sample becomes a gap rather than a
+spike; only a tracker told its counters are 32-bit treats a decrease from
+just below 2**32 as a wrap.
+"""
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Column order of the counter matrix
+COUNTER_FIELDS = ('rx_octets', 'tx_octets', 'rx_unicast_packets', 'tx_unicast_packets')
+
+MASK_32 = np.uint64(0xFFFFFFFF)
+# A 32-bit counter only wraps from its top quarter; lower values going backwards are resets
+WRAP_32_FLOOR = np.uint64(0xC0000000)
+
+# A delta implying more than this multiple of line rate is a reset, not traffic
+MAX_LINE_RATE_FACTOR = 1.5
+
+
+class CounterRateTracker:
+    """Keeps the previous counter sample per interface and turns new samples into rates."""
+
+    def __init__(self, max_gap: float = 900.0, counter_bits: int = 64):
+        # Samples further apart than this are not differenced (stale baseline)
+        self.max_gap = max_gap
+        # CLI counters are 64-bit; 32 for sources such as SNMP ifInOctets
+        self.counter_bits = counter_bits
+        self._previous: Dict[str, np.ndarray] = {}
+        self._timestamp: Optional[float] = None
+
+    def reset(self) -> None:
+        self._previous.clear()
+        self._timestamp = None
+
+    def update(self, counters: Dict[str, Sequence[int]], speeds_bps: Optional[Dict[str, float]] = None,
+               timestamp: Optional[float] = None) -> Dict[str, Tuple[float, float, float, float]]:
+        """
+        Add a sample and return per-interface rates.
+
+        Args:
+            counters: name -> (rx_octets, tx_octets, rx_packets, tx_packets)
+            speeds_bps: name -> line rate, used to reject impossible deltas
+            timestamp: sample time (defaults to now)
+
+        Returns:
+            name -> (rx_bps, tx_bps, rx_pps, tx_pps) for interfaces with a valid
+            previous sample; interfaces that are new or were reset are omitted
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        names = list(counters)
+        current = np.array([counters[name] for name in names], dtype=np.uint64).reshape(len(names), 4)
+
+        previous_timestamp = self._timestamp
+        previous = self._previous
+        self._previous = {name: current[i] for i, name in enumerate(names)}
+        self._timestamp = timestamp
+
+        if previous_timestamp is None or not names:
+            return {}
+        elapsed = timestamp - previous_timestamp
+        if elapsed <= 0 or elapsed > self.max_gap:
+            return {}
+
+        has_previous = np.array([name in previous for name in names])
+        if not has_previous.any():
+            return {}
+        names = [name for name, present in zip(names, has_previous) if present]
+        current = current[has_previous]
+        before = np.array([previous[name] for name in names], dtype=np.uint64).reshape(len(names), 4)
+
+        # A 64-bit counter does not wrap in practice, so going backwards is a
+        # reset. A 32-bit counter just below 2**32 wraps modulo 2**32.
+        decreased = current < before
+        delta = current - before
+        if self.counter_bits == 32:
+            wrapped = decreased & (before >= WRAP_32_FLOOR) & (before <= MASK_32)
+            delta = np.where(wrapped, delta & MASK_32, delta)
+        else:
+            wrapped = np.zeros_like(decreased)
+        delta = delta.astype(np.float64)
+
+        rates = delta / elapsed
+        rates[:, :2] *= 8  # octets -> bits
+
+        valid = np.ones(len(names), dtype=bool)
+        if speeds_bps:
+            speeds = np.array([speeds_bps.get(name, 0.0) or 0.0 for name in names], dtype=np.float64)
+            too_fast = (rates[:, 0] > speeds * MAX_LINE_RATE_FACTOR) | (rates[:, 1] > speeds * MAX_LINE_RATE_FACTOR)
+            valid &= ~((speeds > 0) & too_fast)
+        valid &= ~(decreased & ~wrapped).any(axis=1)
+
+        return {name: tuple(float(v) for v in rates[i]) for i, name in enumerate(names) if valid[i]}
+
+
+def utilization(rx_bps: np.ndarray, tx_bps: np.ndarray, speed_bps: np.ndarray) -> np.ndarray:
+    """(rx + tx) / speed as a percentage for every interface at once; 0 where speed is unknown"""
+    rx_bps = np.asarray(rx_bps, dtype=np.float64)
+    tx_bps = np.asarray(tx_bps, dtype=np.float64)
+    speed_bps = np.asarray(speed_bps, dtype=np.float64)
+    result = np.zeros_like(speed_bps)
+    np.divide((rx_bps + tx_bps) * 100.0, speed_bps, out=result, where=speed_bps > 0)
+    return result
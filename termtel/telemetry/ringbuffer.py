@@ -0,0 +1,216 @@
+# telemetry/ringbuffer.py
+"""
+Fixed-size NumPy ring buffers for telemetry history.
+
+Appends are O(1) writes into preallocated arrays, memory stays flat no
+matter how long a device is watched, and min/max/avg are vectorized over the
+stored samples instead of looping over Python lists.
+"""
+import math
+import time
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity circular buffer of (timestamp, value) samples."""
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        self.capacity = max(1, int(capacity))
+        self._times = np.zeros(self.capacity, dtype=np.float64)
+        self._values = np.zeros(self.capacity, dtype=dtype)
+        self._head = 0  # next slot to write
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, value: float, timestamp: Optional[float] = None) -> None:
+        self._times[self._head] = time.time() if timestamp is None else timestamp
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+
+    def _ordered(self, array: np.ndarray) -> np.ndarray:
+        if self._size < self.capacity:
+            return array[:self._size].copy()
+        return np.concatenate((array[self._head:], array[:self._head]))
+
+    def timestamps(self) -> np.ndarray:
+        """Sample times, oldest first"""
+        return self._ordered(self._times)
+
+    def values(self) -> np.ndarray:
+        """Sample values, oldest first"""
+        return self._ordered(self._values)
+
+    def since(self, seconds: float, now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) for the last `seconds`, oldest first"""
+        now = time.time() if now is None else now
+        times = self.timestamps()
+        start = np.searchsorted(times, now - seconds, side='left')
+        return times[start:], self.values()[start:]
+
+    def last(self, default: float = 0.0) -> float:
+        if not self._size:
+            return default
+        return float(self._values[(self._head - 1) % self.capacity])
+
+    # Order does not matter for aggregates, so they run on the raw storage
+    def min(self) -> float:
+        return float(self._values[:self._size].min()) if self._size else 0.0
+
+    def max(self) -> float:
+        return float(self._values[:self._size].max()) if self._size else 0.0
+
+    def mean(self) -> float:
+        return float(self._values[:self._size].mean()) if self._size else 0.0
+
+
+class InterfaceHistory:
+    """
+    Interface x time matrix for one device.
+
+    All interfaces share a single time axis (one column per poll), so a poll
+    is recorded with one vectorized column write and per-poll statistics
+    across every interface are a single NumPy reduction.
+    """
+
+    def __init__(self, retention: float = 4 * 3600, interval: float = 10):
+        self.retention = retention
+        self.interval = interval
+        self.capacity = max(2, int(math.ceil(retention / max(interval, 0.1))))
+        self._times = np.zeros(self.capacity, dtype=np.float64)
+        self._data = np.full((0, self.capacity), np.nan, dtype=np.float64)
+        self._rows: Dict[str, int] = {}
+        self._head = 0
+        self._size = 0
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _add_rows(self, names: List[str]) -> None:
+        """Assign rows to new interfaces, growing the matrix by doubling so filling it stays linear"""
+        needed = len(self._rows) + len(names)
+        if needed > len(self._data):
+            grown = np.full((max(needed, 2 * len(self._data), 16), self.capacity), np.nan, dtype=np.float64)
+            grown[:len(self._rows)] = self._data[:len(self._rows)]
+            self._data = grown
+        for name in names:
+            self._rows[name] = len(self._rows)
+
+    def record(self, values: Dict[str, float], timestamp: Optional[float] = None) -> None:
+        """Store one poll; interfaces missing from values get NaN for this sample"""
+        new = [name for name in values if name not in self._rows]
+        if new:
+            self._add_rows(new)
+        rows = np.fromiter((self._rows[name] for name in values), dtype=np.intp, count=len(values))
+        column = self._head
+        self._times[column] = time.time() if timestamp is None else timestamp
+        self._data[:, column] = np.nan
+        if len(rows):
+            self._data[rows, column] = np.fromiter(values.values(), dtype=np.float64, count=len(values))
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _order(self) -> np.ndarray:
+        if self._size < self.capacity:
+            return np.arange(self._size)
+        return np.roll(np.arange(self.capacity), -self._head)
+
+    def series(self, name: str, seconds: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) for one interface, oldest first, skipping gaps"""
+        row = self._rows.get(name)
+        if row is None or not self._size:
+            return np.empty(0), np.empty(0)
+        order = self._order()
+        times = self._times[order]
+        values = self._data[row, order]
+        mask = ~np.isnan(values)
+        if seconds is not None:
+            mask &= times >= times[-1] - seconds
+        return times[mask], values[mask]
+
+    def latest(self) -> Dict[str, float]:
+        """Most recent value of every interface that reported in the last poll"""
+        if not self._size:
+            return {}
+        column = self._data[:, (self._head - 1) % self.capacity]
+        return {name: float(column[row]) for name, row in self._rows.items() if not np.isnan(column[row])}
+
+    def stats(self, name: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """min/max/avg/current per interface (or just `name`), computed in one pass"""
+        if not self._size or not self._rows:
+            return {}
+        if name is not None:
+            if name not in self._rows:
+                return {}
+            names = [name]
+            rows = np.array([self._rows[name]])
+        else:
+            names = list(self._rows)
+            rows = np.arange(len(names))
+        filled = self._data[rows][:, self._order()]
+        # All-NaN rows (interfaces gone for the whole window) would warn
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            mins = np.nanmin(filled, axis=1)
+            maxs = np.nanmax(filled, axis=1)
+            avgs = np.nanmean(filled, axis=1)
+        current = filled[:, -1]
+        result = {}
+        for i, interface in enumerate(names):
+            if np.isnan(maxs[i]):
+                continue
+            result[interface] = {
+                'min': float(mins[i]),
+                'max': float(maxs[i]),
+                'avg': float(avgs[i]),
+                'current': 0.0 if np.isnan(current[i]) else float(current[i]),
+            }
+        return result
+
+    def clear(self) -> None:
+        self._data = np.full((0, self.capacity), np.nan, dtype=np.float64)
+        self._rows.clear()
+        self._head = 0
+        self._size = 0
+
+
+def decimate_minmax(times: np.ndarray, values: np.ndarray, buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a series to at most 2 * buckets points for plotting.
+
+    The time range is cut into equal-width buckets (one per pixel column) and
+    each non-empty bucket becomes its min and max at the bucket's center, so
+    spikes survive that plain subsampling would drop. Short series are
+    returned unchanged.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    buckets = max(1, int(buckets))
+    if len(times) <= 2 * buckets or times[-1] <= times[0]:
+        return times, values
+    edges = np.linspace(times[0], times[-1], buckets + 1)
+    starts = np.searchsorted(times, edges[:-1], side='left')
+    # Drop empty buckets (gaps); reduceat needs strictly increasing start indexes
+    keep = np.r_[starts[1:] > starts[:-1], True]
+    keep &= starts < len(times)
+    starts = starts[keep]
+    centers = ((edges[:-1] + edges[1:]) / 2)[keep]
+    mins = np.minimum.reduceat(values, starts)
+    maxs = np.maximum.reduceat(values, starts)
+    return np.repeat(centers, 2), np.column_stack((mins, maxs)).ravel()
@@ -0,0 +1,168 @@
+# telemetry/route_index.py
+"""
+Longest-prefix-match index over a routing table.
+
+Prefixes are stored as integers in one hash table per prefix length, so a
+lookup is at most 33 (IPv4) or 129 (IPv6) dict probes, longest length first,
+with no per-route ipaddress objects. IPv4 also keeps a sorted NumPy array per
+length for batch lookups: resolving every ARP entry against the table is one
+searchsorted per prefix length for the whole batch.
+"""
+import ipaddress
+import socket
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+V4_BITS = 32
+V6_BITS = 128
+
+
+def _v4_int(address: str) -> int:
+    return int.from_bytes(socket.inet_aton(address), 'big')
+
+
+def _prefix_length(mask: str, bits: int) -> int:
+    """'24', '/24' or '255.255.255.0' -> 24"""
+    mask = mask.strip().lstrip('/')
+    if '.' in mask:
+        return bin(_v4_int(mask)).count('1')
+    return int(mask) if mask else bits
+
+
+def _mask(length: int, bits: int) -> int:
+    return ((1 << length) - 1) << (bits - length) if length else 0
+
+
+class RouteIndex:
+    """Maps prefixes to a payload (usually the route's row number) for LPM lookups."""
+
+    def __init__(self):
+        # family bits -> prefix length -> network int -> payload
+        self._tables: Dict[int, Dict[int, Dict[int, int]]] = {V4_BITS: {}, V6_BITS: {}}
+        self._lengths: Dict[int, List[int]] = {V4_BITS: [], V6_BITS: []}
+        self._v4_arrays: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def build(cls, routes: Iterable[Tuple[str, str]]) -> 'RouteIndex':
+        """
+        Index (network, mask) pairs; the payload of each prefix is its position
+        in routes. The first occurrence of a prefix wins (ECMP duplicates).
+        """
+        index = cls()
+        for row, (network, mask) in enumerate(routes):
+            index.add(network, mask, row)
+        index.finalize()
+        return index
+
+    @classmethod
+    def from_ipv4(cls, networks: np.ndarray, lengths: np.ndarray) -> 'RouteIndex':
+        """
+        Vectorized build from parallel arrays of IPv4 network integers and
+        prefix lengths; the payload of each prefix is its array position.
+        """
+        index = cls()
+        networks = np.asarray(networks, dtype=np.uint64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        for length in np.unique(lengths):
+            length = int(length)
+            if not 0 <= length <= V4_BITS:
+                continue
+            positions = np.flatnonzero(lengths == length)
+            keys = networks[positions] & np.uint64(_mask(length, V4_BITS))
+            # np.unique returns sorted keys and the first position of each (ECMP duplicates)
+            keys, first = np.unique(keys, return_index=True)
+            payloads = positions[first]
+            index._tables[V4_BITS][length] = dict(zip(keys.tolist(), payloads.tolist()))
+            index._size += len(keys)
+        index.finalize()
+        return index
+
+    def add(self, network: str, mask: str, payload: int) -> bool:
+        """Add one prefix; returns False for entries that are not valid prefixes"""
+        try:
+            if ':' in network:
+                bits = V6_BITS
+                if '/' in network:
+                    network, mask = network.split('/', 1)
+                value = int(ipaddress.IPv6Address(network))
+            else:
+                bits = V4_BITS
+                value = _v4_int(network)
+            length = _prefix_length(mask, bits)
+        except (OSError, ValueError):
+            return False
+        if not 0 <= length <= bits:
+            return False
+        table = self._tables[bits].setdefault(length, {})
+        key = value & _mask(length, bits)
+        if key not in table:
+            table[key] = payload
+            self._size += 1
+        return True
+
+    def finalize(self) -> None:
+        """Freeze lookup order and build the IPv4 batch arrays; call after the last add()"""
+        for bits, tables in self._tables.items():
+            self._lengths[bits] = sorted(tables, reverse=True)
+        self._v4_arrays = []
+        for length in self._lengths[V4_BITS]:
+            table = self._tables[V4_BITS][length]
+            networks = np.fromiter(table.keys(), dtype=np.uint64, count=len(table))
+            payloads = np.fromiter(table.values(), dtype=np.int64, count=len(table))
+            order = np.argsort(networks)
+            self._v4_arrays.append((length, networks[order], payloads[order]))
+
+    def lookup(self, address: str) -> Optional[Tuple[int, int]]:
+        """(payload, prefix length) of the longest matching prefix, or None"""
+        try:
+            if ':' in address:
+                bits, value = V6_BITS, int(ipaddress.IPv6Address(address))
+            else:
+                bits, value = V4_BITS, _v4_int(address)
+        except (OSError, ValueError):
+            return None
+        tables = self._tables[bits]
+        for length in self._lengths[bits]:
+            payload = tables[length].get(value & _mask(length, bits))
+            if payload is not None:
+                return payload, length
+        return None
+
+    def lookup_many(self, addresses: Sequence[str]) -> List[Optional[Tuple[int, int]]]:
+        """lookup() for many addresses; IPv4 addresses are resolved vectorized"""
+        results: List[Optional[Tuple[int, int]]] = [None] * len(addresses)
+        v4_positions, v4_values = [], []
+        for position, address in enumerate(addresses):
+            if ':' in address:
+                results[position] = self.lookup(address)
+                continue
+            try:
+                v4_values.append(_v4_int(address))
+                v4_positions.append(position)
+            except OSError:
+                pass
+        if not v4_values:
+            return results
+
+        values = np.array(v4_values, dtype=np.uint64)
+        found = np.full(len(values), -1, dtype=np.int64)
+        lengths = np.zeros(len(values), dtype=np.int64)
+        for length, networks, payloads in self._v4_arrays:
+            pending = found < 0
+            if not pending.any():
+                break
+            keys = values[pending] & np.uint64(_mask(length, V4_BITS))
+            slots = np.minimum(np.searchsorted(networks, keys), len(networks) - 1)
+            hit = networks[slots] == keys
+            targets = np.flatnonzero(pending)[hit]
+            found[targets] = payloads[slots[hit]]
+            lengths[targets] = length
+        for i, position in enumerate(v4_positions):
+            if found[i] >= 0:
+                results[position] = (int(found[i]), int(lengths[i]))
+        return results
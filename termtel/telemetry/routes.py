@@ -0,0 +1,346 @@
+# telemetry/routes.py
+"""
+Route table parsing and indexing, done in the polling worker.
+
+'show ip route' output from IOS/IOS-XE, EOS and NX-OS is parsed with
+precompiled line patterns into a RouteTable: a columnar table where prefixes
+are 32-bit integers and repeated strings (next hops, protocols, interfaces)
+are shared, so a full Internet table stays small. The dashboard shows it
+through a virtual model and answers lookups from a RouteIndex built here,
+off the UI thread. Consecutive tables are diffed into a RouteChurn so the
+view only touches rows that changed.
+"""
+import re
+import socket
+import time
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from termtel.telemetry.route_index import RouteIndex
+
+COLUMNS = ("Network", "Mask", "Next Hop", "Protocol", "Interface", "Metric")
+
+# network, mask, next hop, protocol, interface, metric
+RouteRow = Tuple[str, str, str, str, str, str]
+
+DIRECTLY_CONNECTED = 'directly connected'
+
+_IPV4 = r'\d{1,3}(?:\.\d{1,3}){3}'
+# Route age (00:01:00, 1w2d, 3d04h) sits between next hop and interface on IOS
+_AGE = r'(?:,\s*\d[\w:.]*)?'
+
+
+def _interface(group: str = 'intf') -> str:
+    return r'(?:,\s*(?P<' + group + r'>[A-Za-z][\w/.:-]*))?'
+
+
+# IOS / IOS-XE / EOS: "O E2     10.1.0.0/16 [110/20] via 10.0.0.2, 00:01:00, Gi0/1"
+IOS_ROUTE_RE = re.compile(
+    r'^\s*(?P<proto>[A-Za-z]{1,2}\*?(?:\s+(?:IA|E1|E2|N1|N2|EX|L1|L2|ia|su|E|I))?\*?)\s+'
+    r'(?P<network>' + _IPV4 + r')(?:/(?P<len>\d+))?'
+    r'(?:\s+\[(?P<metric>\d+/\d+)\])?'
+    r'(?:\s+via\s+(?P<nh>' + _IPV4 + r')' + _AGE + _interface() +
+    r'|\s+is directly connected' + _AGE + _interface('connected') + r')?\s*$'
+)
+# ECMP / wrapped continuation: "        [110/20] via 10.0.0.3, 00:01:00, Gi0/2"
+IOS_NEXT_HOP_RE = re.compile(
+    r'^\s+(?:\[(?P<metric>\d+/\d+)\]\s+)?via\s+(?P<nh>' + _IPV4 + r')' + _AGE + _interface() + r'\s*$'
+)
+# "      10.0.0.0/8 is variably subnetted, 5 subnets, 3 masks" / "172.16.0.0/24 is subnetted, 2 subnets"
+IOS_SUBNETTED_RE = re.compile(r'^\s*(?P<network>' + _IPV4 + r')/(?P<len>\d+) is (?P<variably>variably )?subnetted')
+
+# NX-OS: "10.1.0.0/16, ubest/mbest: 2/0" then "    *via 10.0.0.3, Eth1/2, [110/41], 1d02h, ospf-1, intra"
+NXOS_PREFIX_RE = re.compile(r'^(?P<network>' + _IPV4 + r')/(?P<len>\d+), ubest/mbest')
+NXOS_NEXT_HOP_RE = re.compile(
+    r'^\s+\*?via\s+(?P<nh>' + _IPV4 + r')(?:%\S+)?,'
+    r'(?:\s*(?P<intf>[A-Za-z][^,\[]*),)?'
+    r'\s*\[(?P<metric>\d+/\d+)\],\s*[^,]+,\s*(?P<proto>[\w-]+)'
+)
+NXOS_PROTOCOLS = {
+    'direct': 'C', 'local': 'L', 'static': 'S', 'ospf': 'O', 'bgp': 'B',
+    'eigrp': 'D', 'rip': 'R', 'isis': 'i', 'hsrp': 'H', 'am': 'A',
+}
+
+
+def _v4_int(address: str) -> int:
+    return int.from_bytes(socket.inet_aton(address), 'big')
+
+
+def _v4_str(value: int) -> str:
+    return socket.inet_ntoa(value.to_bytes(4, 'big'))
+
+
+class RouteTable:
+    """Columnar IPv4 route table: one entry per (prefix, next hop)."""
+
+    def __init__(self):
+        self.networks = array('I')
+        self.lengths = array('B')
+        self.next_hops: List[str] = []
+        self.protocols: List[str] = []
+        self.interfaces: List[str] = []
+        self.metrics: List[str] = []
+        self._strings: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.networks)
+
+    def _shared(self, value: Optional[str]) -> str:
+        value = value or ''
+        return self._strings.setdefault(value, value)
+
+    def append(self, network: str, length: int, next_hop: str, protocol: str, interface: str,
+               metric: str) -> None:
+        self.networks.append(_v4_int(network))
+        self.lengths.append(length)
+        self.next_hops.append(self._shared(next_hop))
+        self.protocols.append(self._shared(protocol))
+        self.interfaces.append(self._shared(interface))
+        self.metrics.append(self._shared(metric))
+
+    def cell(self, row: int, column: int) -> str:
+        if column == 0:
+            return _v4_str(self.networks[row])
+        if column == 1:
+            return str(self.lengths[row])
+        return (self.next_hops, self.protocols, self.interfaces, self.metrics)[column - 2][row]
+
+    def row(self, row: int) -> RouteRow:
+        return tuple(self.cell(row, column) for column in range(len(COLUMNS)))
+
+    def rows(self) -> Iterator[RouteRow]:
+        return (self.row(i) for i in range(len(self)))
+
+    def prefix(self, row: int) -> str:
+        return f"{_v4_str(self.networks[row])}/{self.lengths[row]}"
+
+    def sort_order(self, column: int, descending: bool = False) -> np.ndarray:
+        """Row order sorted on a column; prefixes sort numerically"""
+        if column == 0:
+            keys = np.frombuffer(self.networks, dtype=np.uint32).astype(np.uint64) << np.uint64(8)
+            keys |= np.frombuffer(self.lengths, dtype=np.uint8).astype(np.uint64)
+        elif column == 1:
+            keys = np.frombuffer(self.lengths, dtype=np.uint8)
+        else:
+            keys = np.array((self.next_hops, self.protocols, self.interfaces, self.metrics)[column - 2])
+        order = np.argsort(keys, kind='stable')
+        return order[::-1] if descending else order
+
+
+def parse_routes(route_info: dict) -> RouteTable:
+    """RouteTable from raw 'show ip route' output, falling back to get_route_to() data"""
+    raw_output = route_info.get("raw_output", "") or ""
+    if 'ubest/mbest' in raw_output:
+        table = _parse_nxos(raw_output)
+    else:
+        table = _parse_ios(raw_output)
+
+    if not len(table):
+        for prefix, routes in (route_info.get("structured_routes") or {}).items():
+            if '/' not in prefix or ':' in prefix:
+                continue
+            network, length = prefix.split('/')
+            for route in routes:
+                table.append(network, int(length), route.get('next_hop', ''), route.get('protocol', ''),
+                             route.get('outgoing_interface', ''), str(route.get('preference', '')))
+    return table
+
+
+def _parse_ios(raw_output: str) -> RouteTable:
+    table = RouteTable()
+    subnet_length = None  # mask from an "is subnetted" header, for classful child lines
+    current = None  # (network, length, protocol) awaiting or owning next hops
+    for line in raw_output.splitlines():
+        if 'subnetted' in line:
+            match = IOS_SUBNETTED_RE.match(line)
+            if match:
+                subnet_length = None if match.group('variably') else int(match.group('len'))
+                continue
+        match = IOS_ROUTE_RE.match(line)
+        if match is None:
+            match = IOS_NEXT_HOP_RE.match(line)
+            if match and current:
+                network, length, protocol, metric = current
+                next_hop, interface, next_metric = match.group('nh', 'intf', 'metric')
+                table.append(network, length, next_hop, protocol, interface, next_metric or metric)
+            continue
+        protocol, network, length, metric, next_hop, interface, connected = match.group(
+            'proto', 'network', 'len', 'metric', 'nh', 'intf', 'connected')
+        if length is None:
+            if subnet_length is None:
+                continue
+            length = subnet_length
+        length = int(length)
+        protocol = protocol.replace('*', '').strip()
+        metric = metric or ''
+        current = (network, length, protocol, metric)
+        if next_hop:
+            table.append(network, length, next_hop, protocol, interface, metric)
+        elif 'directly connected' in line:
+            table.append(network, length, DIRECTLY_CONNECTED, protocol, connected, metric)
+        # else: the next hop is on the following line(s)
+    return table
+
+
+def _parse_nxos(raw_output: str) -> RouteTable:
+    table = RouteTable()
+    current = None
+    for line in raw_output.splitlines():
+        match = NXOS_PREFIX_RE.match(line)
+        if match:
+            current = (match.group('network'), int(match.group('len')))
+            continue
+        if current is None:
+            continue
+        match = NXOS_NEXT_HOP_RE.match(line)
+        if match:
+            name = match.group('proto')
+            protocol = NXOS_PROTOCOLS.get(name.split('-')[0], name)
+            interface = (match.group('intf') or '').strip()
+            next_hop = DIRECTLY_CONNECTED if protocol in ('C', 'L') else match.group('nh')
+            table.append(current[0], current[1], next_hop, protocol, interface, match.group('metric'))
+    return table
+
+
+def build_route_index(table: RouteTable) -> RouteIndex:
+    """LPM index whose payload is the row number in table"""
+    return RouteIndex.from_ipv4(np.frombuffer(table.networks, dtype=np.uint32),
+                                np.frombuffer(table.lengths, dtype=np.uint8))
+
+
+@dataclass
+class ChurnEvent:
+    """One prefix whose set of next hops changed between two polls"""
+    timestamp: float
+    kind: str  # 'added', 'removed' or 'changed'
+    prefix: str
+    protocol: str
+    old_next_hops: Tuple[str, ...]
+    new_next_hops: Tuple[str, ...]
+
+
+@dataclass
+class RouteChurn:
+    """
+    Keyed diff of two RouteTables.
+
+    Entries are (prefix, next hop) pairs. removed_rows index old, added_rows
+    index new, and kept_old/kept_new are the aligned rows of entries present
+    in both, which is what a view needs to move from one table to the other
+    without a reset.
+    """
+    old: RouteTable
+    new: RouteTable
+    removed_rows: np.ndarray
+    added_rows: np.ndarray
+    kept_old: np.ndarray
+    kept_new: np.ndarray
+    events: List[ChurnEvent] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    @classmethod
+    def unchanged(cls, table: RouteTable) -> 'RouteChurn':
+        rows = np.arange(len(table))
+        return cls(table, table, np.arange(0), np.arange(0), rows, rows)
+
+    def changed_rows(self) -> np.ndarray:
+        """Rows of new for kept entries whose protocol, interface or metric differs from old"""
+        changed = np.zeros(len(self.kept_new), dtype=bool)
+        if self.old is self.new or not len(changed):
+            return self.kept_new[changed]
+        for old_column, new_column in ((self.old.protocols, self.new.protocols),
+                                       (self.old.interfaces, self.new.interfaces),
+                                       (self.old.metrics, self.new.metrics)):
+            changed |= (np.asarray(old_column, dtype=object)[self.kept_old]
+                        != np.asarray(new_column, dtype=object)[self.kept_new])
+        return self.kept_new[changed]
+
+    def protocol_counts(self) -> Dict[str, Counter]:
+        """protocol -> Counter of event kinds"""
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        for event in self.events:
+            counts[event.protocol][event.kind] += 1
+        return dict(counts)
+
+
+def _prefix_keys(table: RouteTable) -> np.ndarray:
+    keys = np.frombuffer(table.networks, dtype=np.uint32).astype(np.uint64) << np.uint64(8)
+    return keys | np.frombuffer(table.lengths, dtype=np.uint8).astype(np.uint64)
+
+
+def _occurrences(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(stable sort order, sorted keys, rank of each row among rows with the same key)"""
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    positions = np.arange(len(keys))
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    group_start = np.maximum.accumulate(np.where(starts, positions, 0)) if len(keys) else positions
+    rank = np.empty(len(keys), dtype=np.int64)
+    rank[order] = positions - group_start
+    return order, sorted_keys, rank
+
+
+def diff_routes(old: RouteTable, new: RouteTable, timestamp: Optional[float] = None) -> RouteChurn:
+    """Adds, removes and next-hop changes from old to new, vectorized over both tables"""
+    timestamp = time.time() if timestamp is None else timestamp
+    # Entry key: 40-bit prefix key and a 24-bit next hop id shared by both tables
+    next_hop_ids = {next_hop: i for i, next_hop in enumerate(set(old.next_hops) | set(new.next_hops))}
+    old_prefixes, new_prefixes = _prefix_keys(old), _prefix_keys(new)
+    old_keys = (old_prefixes << np.uint64(24)) | np.fromiter(
+        map(next_hop_ids.__getitem__, old.next_hops), dtype=np.uint64, count=len(old))
+    new_keys = (new_prefixes << np.uint64(24)) | np.fromiter(
+        map(next_hop_ids.__getitem__, new.next_hops), dtype=np.uint64, count=len(new))
+
+    # Duplicate entries (one next hop via two interfaces) are matched as a
+    # multiset: the k-th occurrence of a key in old pairs with the k-th in new
+    old_order, old_sorted, old_rank = _occurrences(old_keys)
+    new_order, new_sorted, new_rank = _occurrences(new_keys)
+    first_in_new = np.searchsorted(new_sorted, old_keys, side='left')
+    in_new = np.searchsorted(new_sorted, old_keys, side='right') - first_in_new > old_rank
+    in_old = np.searchsorted(old_sorted, new_keys, side='right') \
+        - np.searchsorted(old_sorted, new_keys, side='left') > new_rank
+    removed_rows = np.flatnonzero(~in_new)
+    added_rows = np.flatnonzero(~in_old)
+
+    # Align the entries present in both tables, one to one
+    kept_old = np.flatnonzero(in_new)
+    kept_new = new_order[first_in_new[kept_old] + old_rank[kept_old]]
+
+    churn = RouteChurn(old, new, removed_rows, added_rows, kept_old, kept_new)
+    touched = np.unique(np.concatenate((old_prefixes[removed_rows], new_prefixes[added_rows])))
+    if not len(touched):
+        return churn
+
+    # Next hop sets of every touched prefix, before and after
+    before: Dict[int, List[int]] = defaultdict(list)
+    after: Dict[int, List[int]] = defaultdict(list)
+    for row in np.flatnonzero(np.isin(old_prefixes, touched)).tolist():
+        before[int(old_prefixes[row])].append(row)
+    for row in np.flatnonzero(np.isin(new_prefixes, touched)).tolist():
+        after[int(new_prefixes[row])].append(row)
+
+    for key in touched.tolist():
+        old_rows, new_rows = before.get(key, []), after.get(key, [])
+        if not old_rows:
+            kind = 'added'
+        elif not new_rows:
+            kind = 'removed'
+        else:
+            kind = 'changed'
+        row, table = (new_rows[0], new) if new_rows else (old_rows[0], old)
+        churn.events.append(ChurnEvent(
+            timestamp=timestamp,
+            kind=kind,
+            prefix=table.prefix(row),
+            protocol=table.protocols[row],
+            old_next_hops=tuple(old.next_hops[r] for r in old_rows),
+            new_next_hops=tuple(new.next_hops[r] for r in new_rows),
+        ))
+    return churn
@@ -0,0 +1,166 @@
+# telemetry/schedule.py
+"""
+Per-getter polling tiers.
+
+Interface counters change every few seconds while facts and the routing
+table rarely do, so each getter is polled on its own interval instead of
+fetching everything on every refresh. AdaptivePacer decides when the next
+cycle of a device starts: after the previous one ends, backed off after
+failures, jittered, and optionally faster while utilization is moving.
+"""
+import random
+import time
+from typing import Dict, Iterable, List, Optional
+
+# Seconds between polls of each getter
+DEFAULT_INTERVALS = {
+    'facts': 300,
+    'interfaces': 10,
+    'neighbors': 60,
+    'routes': 300,
+}
+# Getters whose interval follows PollSchedule.scale
+SCALED_GETTERS = {'interfaces'}
+# Cap on the doubling exponent of a failing getter's retry interval
+MAX_BACKOFF_EXPONENT = 32
+
+
+class PollSchedule:
+    """
+    Tracks when each getter last ran and which ones are due.
+
+    A getter that fails on a healthy connection is retried on its own
+    backoff: its interval doubles with each consecutive failure, up to
+    backoff_max, while the other getters keep their tiers.
+    """
+
+    def __init__(self, intervals: Optional[Dict[str, float]] = None, backoff_max: float = 600.0):
+        self.intervals = dict(DEFAULT_INTERVALS)
+        if intervals:
+            self.intervals.update({name: float(value) for name, value in intervals.items() if value})
+        self.backoff_max = backoff_max
+        self.last_run: Dict[str, float] = {}  # last attempt, successful or not
+        self.failures: Dict[str, int] = {}  # consecutive failures per getter
+        self.forced = set()
+        self.scale = 1.0  # multiplier for SCALED_GETTERS, set by AdaptivePacer
+
+    def interval(self, name: str) -> float:
+        """Current interval of a getter, after adaptive scaling"""
+        interval = self.intervals[name]
+        return interval * self.scale if name in SCALED_GETTERS else interval
+
+    def retry_interval(self, name: str) -> float:
+        """Interval of a getter, doubled for each consecutive failure"""
+        interval = self.interval(name)
+        failures = self.failures.get(name, 0)
+        if not failures:
+            return interval
+        return min(max(interval, self.backoff_max), interval * 2.0 ** min(failures, MAX_BACKOFF_EXPONENT))
+
+    @property
+    def tick_interval(self) -> float:
+        """How often a driver should check for due getters"""
+        return min(self.interval(name) for name in self.intervals)
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Getters whose interval has elapsed (or that were forced), in definition order"""
+        now = time.monotonic() if now is None else now
+        due = []
+        for name in self.intervals:
+            last = self.last_run.get(name)
+            # Small slack so a getter is not pushed a whole tick late by timer jitter
+            if name in self.forced or last is None or now - last >= self.retry_interval(name) - 0.5:
+                due.append(name)
+        return due
+
+    def mark(self, names: Iterable[str], now: Optional[float] = None) -> None:
+        """Record that getters ran"""
+        now = time.monotonic() if now is None else now
+        for name in names:
+            self.last_run[name] = now
+            self.failures.pop(name, None)
+            self.forced.discard(name)
+
+    def fail(self, names: Iterable[str], now: Optional[float] = None) -> None:
+        """Record that getters failed, so they wait out their backoff instead of staying due"""
+        now = time.monotonic() if now is None else now
+        for name in names:
+            self.last_run[name] = now
+            self.failures[name] = self.failures.get(name, 0) + 1
+            self.forced.discard(name)
+
+    def stale(self, names: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """Getters among names whose last result is older than their interval (or that never ran)"""
+        now = time.monotonic() if now is None else now
+        return [
+            name for name in names
+            if name in self.intervals
+            and (self.last_run.get(name) is None or now - self.last_run[name] >= self.interval(name))
+        ]
+
+    def force(self, names: Iterable[str]) -> None:
+        """Make getters due on the next check, e.g. when their tab is opened"""
+        self.forced.update(name for name in names if name in self.intervals)
+
+    def reset(self) -> None:
+        """Forget all history so everything is due, e.g. after a reconnect"""
+        self.last_run.clear()
+        self.failures.clear()
+        self.forced.clear()
+
+
+class AdaptivePacer:
+    """
+    Delay before the next poll cycle of one device.
+
+    The delay is measured from the end of the previous cycle, so cycles of
+    the same device never overlap. Each consecutive failure doubles it, up to
+    backoff_max. With adaptive enabled, the interface interval is halved while
+    utilization swings by FAST_CHANGE points or more between polls and
+    stretched while it stays within IDLE_CHANGE, bounded by min_scale and
+    max_scale of the configured interval.
+    """
+    FAST_CHANGE = 5.0
+    IDLE_CHANGE = 0.5
+
+    def __init__(self, schedule: PollSchedule, jitter: float = 0.1, backoff_max: float = 600.0,
+                 adaptive: bool = False, min_scale: float = 0.25, max_scale: float = 4.0):
+        self.schedule = schedule
+        self.jitter = jitter
+        self.backoff_max = backoff_max
+        self.adaptive = adaptive
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.schedule.backoff_max = backoff_max
+        self.failures = 0
+        self._utilization: Dict[str, float] = {}
+
+    def record_success(self, utilization: Optional[Dict[str, float]] = None) -> None:
+        """A cycle finished; utilization is interface -> percent when interfaces were polled"""
+        self.failures = 0
+        if not self.adaptive or not utilization:
+            return
+        previous, self._utilization = self._utilization, dict(utilization)
+        changes = [abs(value - previous[name]) for name, value in utilization.items() if name in previous]
+        if not changes:
+            return
+        change = max(changes)
+        scale = self.schedule.scale
+        if change >= self.FAST_CHANGE:
+            scale /= 2
+        elif change <= self.IDLE_CHANGE:
+            scale *= 1.25
+        else:
+            scale = 1.0 + (scale - 1.0) / 2  # drift back to the configured interval
+        self.schedule.scale = min(self.max_scale, max(self.min_scale, scale))
+
+    def record_failure(self) -> None:
+        self.failures += 1
+
+    def next_delay(self) -> float:
+        """Seconds until the next cycle, with +/- jitter"""
+        delay = self.schedule.tick_interval
+        if self.failures:
+            # Exponent capped: 2.0 ** 1024 overflows after about a week of failures
+            delay = min(self.backoff_max, delay * 2.0 ** min(self.failures, 32))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
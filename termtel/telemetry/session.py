@@ -0,0 +1,269 @@
+# telemetry/session.py
+"""
+Long-lived NAPALM session for telemetry polling.
+
+The dashboard used to log in, detect the platform and log out again on every
+refresh. A DeviceSession keeps the NAPALM connection open between polls,
+remembers what it learned about the device (final driver, switch/router role)
+and only reconnects when a getter fails because the connection is gone.
+"""
+import logging
+import threading
+from typing import Callable, Optional, Tuple
+
+import paramiko
+from napalm import get_network_driver
+from napalm.base.exceptions import ConnectionClosedException, ConnectionException
+from netmiko.exceptions import NetmikoTimeoutException, ReadTimeout
+
+from termtel.custom_driver import CustomDriver
+from termtel.fingerprint_cache import fingerprint_cache
+from termtel.telemetry.classify import classify_device
+from termtel.telemetry.neighbors import NeighborTable
+from termtel.telemetry.rates import CounterRateTracker, utilization
+from termtel.telemetry.routes import RouteChurn, parse_routes, build_route_index, diff_routes
+from termtel.telemetry.spans import spans
+
+logger = logging.getLogger(__name__)
+
+# Failures that mean the connection itself is gone; anything else (an
+# unsupported getter, a parse or CLI error) leaves the session usable
+TRANSPORT_ERRORS = (
+    OSError,
+    EOFError,
+    paramiko.SSHException,
+    NetmikoTimeoutException,
+    ReadTimeout,
+    ConnectionException,
+    ConnectionClosedException,
+)
+
+
+def split_host_port(hostname: str) -> Tuple[str, Optional[int]]:
+    """'10.0.0.1:2222' -> ('10.0.0.1', 2222); plain hosts and IPv6 addresses keep port None"""
+    host, sep, port = hostname.rpartition(':')
+    if sep and port.isdigit() and ':' not in host:
+        return host, int(port)
+    return hostname, None
+
+
+class DeviceSession:
+    """One open NAPALM connection plus the per-device state worth keeping between polls."""
+
+    def __init__(self, driver: str, hostname: str, username: str, password: str):
+        self.driver_name = 'nxos_ssh' if driver == 'nxos' else driver
+        self.hostname = hostname  # may be host:port, e.g. a local simulator
+        self.host, self.port = split_host_port(hostname)
+        self.username = username
+        self.password = password
+
+        self.device = None
+        self.custom = None
+        self.is_switch: Optional[bool] = None
+        self.rate_tracker = CounterRateTracker()
+        self.previous_routes: Optional[dict] = None  # last parsed route poll, for churn
+        self.connects = 0
+        self._lock = threading.RLock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.device is not None
+
+    def _optional_args(self, driver_name: str) -> dict:
+        if driver_name == 'nxos_ssh':
+            return {'transport': 'ssh', 'port': self.port or 22}
+        if driver_name == 'eos':
+            # Force SSH instead of eAPI
+            args = {'transport': 'ssh', 'use_eapi': False}
+        else:
+            args = {}
+        if self.port:
+            args['port'] = self.port
+        return args
+
+    def _connect(self, driver_name: str):
+        driver = get_network_driver(driver_name)
+        device = driver(
+            hostname=self.host,
+            username=self.username,
+            password=self.password,
+            optional_args=self._optional_args(driver_name)
+        )
+        device.open()
+        return device
+
+    def open(self) -> None:
+        """Log in, correcting the driver once if an ios login lands on a Nexus."""
+        with self._lock, spans.span(self.hostname, 'connect'):
+            self.close()
+            device = self._connect(self.driver_name)
+
+            if self.connects == 0 and self.driver_name != 'nxos_ssh':
+                # If "Kernel" in hostname, it's possibly a Nexus device using ios driver
+                facts = device.get_facts()
+                if "Kernel" in facts.get('hostname', ''):
+                    logger.info(f"{self.hostname} looks like NX-OS, switching to nxos_ssh")
+                    device.close()
+                    self.driver_name = 'nxos_ssh'
+                    device = self._connect(self.driver_name)
+
+            self.device = device
+            self.custom = CustomDriver(device)
+            self.connects += 1
+            logger.info(f"Opened {self.driver_name} session to {self.hostname} (connect #{self.connects})")
+
+    def close(self) -> None:
+        with self._lock:
+            if self.device is not None:
+                try:
+                    self.device.close()
+                except Exception as e:
+                    logger.debug(f"Error closing session to {self.hostname}: {e}")
+            self.device = None
+            self.custom = None
+
+    def is_alive(self) -> bool:
+        """Whether the open connection still answers; False if there is none"""
+        with self._lock:
+            if self.device is None:
+                return False
+            try:
+                return bool(self.device.is_alive().get('is_alive'))
+            except Exception:
+                return False
+
+    def connection_lost(self, error: Exception) -> bool:
+        """Whether error came from a dead connection rather than the getter itself"""
+        return isinstance(error, TRANSPORT_ERRORS) or not self.is_alive()
+
+    def call(self, func: Callable):
+        """
+        Run func(device) on the open session.
+
+        If the connection turns out to be dead, reconnect once and retry.
+        Other errors propagate with the session left open.
+        """
+        with self._lock:
+            if not self.is_open:
+                self.open()
+            try:
+                return func(self.device)
+            except Exception as e:
+                if not self.connection_lost(e):
+                    raise
+                logger.warning(f"Connection to {self.hostname} lost ({e}), reconnecting")
+                self.open()
+                return func(self.device)
+
+    def get_facts(self) -> dict:
+        facts = self.call(lambda device: device.get_facts())
+        if self.is_switch is None:
+            self.is_switch = self.classify(facts)
+        facts['is_switch'] = self.is_switch
+        return facts
+
+    def classify(self, facts: dict) -> bool:
+        """Switch/router role, remembered in the fingerprint cache across sessions"""
+        # A replaced device drops its cache entry, and with it the cached role
+        fingerprint_cache.check_serial(self.hostname, facts.get('serial_number'))
+        cached = fingerprint_cache.get(self.hostname)
+
+        def run_command(command):
+            return str(self.call(lambda device: device.cli([command])).get(command, ''))
+
+        is_switch = classify_device(facts, run_command, cached)
+        if not cached or cached.get('is_switch') != is_switch:
+            # Hosts reached without a fingerprint get an entry too, so the role sticks
+            fields = {'is_switch': is_switch}
+            if facts.get('serial_number') and not (cached or {}).get('serial'):
+                fields['serial'] = str(facts['serial_number']).strip()
+            fingerprint_cache.update(self.hostname, create=True, **fields)
+        logger.info(f"{self.hostname} classified as {'switch' if is_switch else 'router'}")
+        return is_switch
+
+    def get_interfaces(self) -> dict:
+        interfaces, counters = self.call(lambda device: self.custom.get_interfaces_custom())
+        self.apply_counter_rates(interfaces, counters)
+        return {"interfaces": interfaces, "counters": counters}
+
+    def apply_counter_rates(self, interfaces: dict, counters: dict) -> None:
+        """
+        Replace device-reported rates with counter-delta rates and add utilization.
+
+        Interfaces without byte counters, or on their first sample after a
+        (re)start or reset, keep the device's own rate (rate_source 'device').
+        """
+        samples = {
+            name: (c['rx_octets'], c['tx_octets'], c.get('rx_unicast_packets', 0), c.get('tx_unicast_packets', 0))
+            for name, c in counters.items() if 'rx_octets' in c and 'tx_octets' in c
+        }
+        speeds_bps = {name: float(details.get('speed') or 0) * 1_000_000 for name, details in interfaces.items()}
+        rates = self.rate_tracker.update(samples, speeds_bps)
+
+        names = list(interfaces)
+        for name in names:
+            details = interfaces[name]
+            if name in rates:
+                rx_bps, tx_bps, rx_pps, tx_pps = rates[name]
+                details['input_rate'], details['output_rate'] = rx_bps, tx_bps
+                details['input_pps'], details['output_pps'] = rx_pps, tx_pps
+                details['rate_source'] = 'counters'
+            else:
+                details['rate_source'] = 'device'
+
+        percent = utilization(
+            [interfaces[name].get('input_rate', 0.0) for name in names],
+            [interfaces[name].get('output_rate', 0.0) for name in names],
+            [speeds_bps[name] for name in names],
+        )
+        for name, value in zip(names, percent):
+            interfaces[name]['utilization'] = float(value)
+
+    def get_neighbors(self) -> dict:
+        lldp = self.call(lambda device: device.get_lldp_neighbors())
+        try:
+            arp = self.call(lambda device: device.get_arp_table())
+        except Exception as e:
+            print(f"Error retrieving arp: {e}")
+            arp = {}
+        # Index here, on the polling thread, so searches in the UI are lookups
+        with spans.span(self.hostname, 'parse.neighbors'):
+            table = NeighborTable(arp, lldp)
+        return {"lldp": lldp, "arp": arp, "table": table}
+
+    def get_routes(self) -> dict:
+        try:
+            # Get raw CLI output for complete routing table
+            all_routes_output = self.call(lambda device: device.cli(["show ip route"]))
+            # Try to get structured route data for default route
+            default_route = {}
+            try:
+                default_route = self.device.get_route_to("0.0.0.0/0")
+            except Exception:
+                pass  # Some platforms might not support this
+
+            route_info = {
+                "structured_routes": default_route,
+                "raw_output": all_routes_output.get("show ip route", "")
+            }
+            # Parse, index and diff here, on the polling thread, not in the UI
+            try:
+                previous = self.previous_routes
+                if previous and previous["raw_output"] == route_info["raw_output"]:
+                    # Unchanged output: same table object, nothing to parse or diff
+                    table, index = previous["table"], previous["index"]
+                    churn = RouteChurn.unchanged(table)
+                else:
+                    with spans.span(self.hostname, 'parse.routes'):
+                        table = parse_routes(route_info)
+                        index = build_route_index(table)
+                    with spans.span(self.hostname, 'diff.routes'):
+                        churn = diff_routes(previous["table"], table) if previous else None
+                route_info.update(table=table, index=index, churn=churn)
+                self.previous_routes = route_info
+            except Exception as e:
+                logger.warning(f"Could not parse routes from {self.hostname}: {e}")
+            return route_info
+        except Exception as e:
+            print("Error getting routes:", str(e))
+            return {}
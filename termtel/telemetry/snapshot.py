@@ -0,0 +1,148 @@
+# telemetry/snapshot.py
+"""
+Latest polled values, rendered as OpenMetrics text.
+
+The poller writes into a MetricsSnapshot after every getter; the /metrics
+endpoint only renders what is already in memory, so a scrape never talks to
+a device or waits for a poll. Each update replaces a device's entry with a
+new dict under a short lock, and rendering works on a copy of those
+references, so writers and scrapes never hold the lock for long.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from termtel.telemetry.spans import spans, PERCENTILES
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# name, type, help, interface details key
+INTERFACE_GAUGES = [
+    ('termtel_interface_up', 'gauge', 'Interface line protocol is up', 'is_up'),
+    ('termtel_interface_speed_bits_per_second', 'gauge', 'Interface speed', 'speed'),
+    ('termtel_interface_receive_bits_per_second', 'gauge', 'Receive rate', 'input_rate'),
+    ('termtel_interface_transmit_bits_per_second', 'gauge', 'Transmit rate', 'output_rate'),
+    ('termtel_interface_utilization_percent', 'gauge', 'Busier direction as a percentage of speed', 'utilization'),
+]
+# name, help, counters key
+INTERFACE_COUNTERS = [
+    ('termtel_interface_receive_bytes', 'Octets received', 'rx_octets'),
+    ('termtel_interface_transmit_bytes', 'Octets transmitted', 'tx_octets'),
+    ('termtel_interface_receive_packets', 'Packets received', 'rx_unicast_packets'),
+    ('termtel_interface_transmit_packets', 'Packets transmitted', 'tx_unicast_packets'),
+    ('termtel_interface_receive_errors', 'Receive errors', 'rx_errors'),
+    ('termtel_interface_transmit_errors', 'Transmit errors', 'tx_errors'),
+]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value) -> str:
+    return repr(float(value))
+
+
+class MetricsSnapshot:
+    """In-memory latest interface values and poll results per device."""
+
+    def __init__(self):
+        self._interfaces: Dict[str, Tuple[float, dict, dict]] = {}  # device -> (ts, interfaces, counters)
+        self._polls: Dict[Tuple[str, str], dict] = {}  # (device, getter) -> poll state
+        self._lock = threading.Lock()
+
+    def update_interfaces(self, device: str, interfaces: dict, counters: Optional[dict] = None,
+                          timestamp: Optional[float] = None) -> None:
+        entry = (time.time() if timestamp is None else timestamp, dict(interfaces), dict(counters or {}))
+        with self._lock:
+            self._interfaces[device] = entry
+
+    def record_poll(self, device: str, getter: str, duration: float, ok: bool = True,
+                    timestamp: Optional[float] = None) -> None:
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            previous = self._polls.get((device, getter), {'polls': 0, 'errors': 0, 'last_success': None})
+            self._polls[(device, getter)] = {
+                'polls': previous['polls'] + 1,
+                'errors': previous['errors'] + (not ok),
+                'duration': duration,
+                'last_success': timestamp if ok else previous['last_success'],
+            }
+
+    def on_poll_event(self, event) -> None:
+        """PollingEngine subscriber"""
+        if event.ok and event.getter == 'interfaces':
+            self.update_interfaces(event.device_id, event.result.get('interfaces', {}),
+                                   event.result.get('counters', {}), event.timestamp)
+        self.record_poll(event.device_id, event.getter, event.duration, event.ok, event.timestamp)
+
+    def remove_device(self, device: str) -> None:
+        with self._lock:
+            self._interfaces.pop(device, None)
+            for key in [key for key in self._polls if key[0] == device]:
+                del self._polls[key]
+
+    def render(self) -> str:
+        """The whole snapshot in OpenMetrics text exposition format"""
+        with self._lock:
+            interfaces = sorted(self._interfaces.items())
+            polls = sorted(self._polls.items())
+
+        lines: List[str] = []
+
+        for name, metric_type, help_text, key in INTERFACE_GAUGES:
+            lines += [f'# TYPE {name} {metric_type}', f'# HELP {name} {help_text}']
+            for device, (_, details_by_name, _) in interfaces:
+                for interface, details in sorted(details_by_name.items()):
+                    value = details.get(key)
+                    if value is None:
+                        continue
+                    if key == 'speed':
+                        value = float(value) * 1_000_000  # dashboard speeds are Mbps
+                    lines.append(f'{name}{_labels(device=device, interface=interface)} {_number(value)}')
+
+        for name, help_text, key in INTERFACE_COUNTERS:
+            lines += [f'# TYPE {name} counter', f'# HELP {name} {help_text}']
+            for device, (_, _, counters) in interfaces:
+                for interface, values in sorted(counters.items()):
+                    if key in values:
+                        lines.append(f'{name}_total{_labels(device=device, interface=interface)} '
+                                     f'{_number(values[key])}')
+
+        name = 'termtel_interfaces_timestamp_seconds'
+        lines += [f'# TYPE {name} gauge', f'# HELP {name} Time of the last interface poll']
+        for device, (timestamp, _, _) in interfaces:
+            lines.append(f'{name}{_labels(device=device)} {_number(timestamp)}')
+
+        poll_metrics = [
+            ('termtel_poll_duration_seconds', 'gauge', 'Duration of the last poll of a getter', 'duration', ''),
+            ('termtel_polls', 'counter', 'Getter polls', 'polls', '_total'),
+            ('termtel_poll_errors', 'counter', 'Failed getter polls', 'errors', '_total'),
+            ('termtel_poll_last_success_timestamp_seconds', 'gauge', 'Time of the last successful poll',
+             'last_success', ''),
+        ]
+        for name, metric_type, help_text, key, suffix in poll_metrics:
+            lines += [f'# TYPE {name} {metric_type}', f'# HELP {name} {help_text}']
+            for (device, getter), state in polls:
+                if state[key] is not None:
+                    lines.append(f'{name}{suffix}{_labels(device=device, getter=getter)} {_number(state[key])}')
+
+        name = 'termtel_stage_duration_seconds'
+        lines += [f'# TYPE {name} summary', f'# HELP {name} Polling stage durations over recent spans']
+        for row in spans.stats():
+            labels = {'device': row['device'], 'stage': row['stage']}
+            for percentile in PERCENTILES:
+                value = row[f'p{percentile}_ms'] / 1000.0
+                lines.append(f'{name}{_labels(**labels, quantile=percentile / 100)} {_number(value)}')
+            lines.append(f'{name}_count{_labels(**labels)} {row["count"]}')
+
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+# Written by the polling workers and the engine, read by the /metrics endpoint
+metrics_snapshot = MetricsSnapshot()
@@ -0,0 +1,133 @@
+# telemetry/spans.py
+"""
+Stage timings for the polling pipeline.
+
+Code wraps each stage (SSH connect, NAPALM getter, TextFSM template
+selection, parsing, applying a result to the UI) in a span:
+
+    with spans.span(hostname, 'getter.interfaces'):
+        result = session.get_interfaces()
+
+Durations are kept per device and stage in a fixed-size ring buffer, so
+percentiles describe the recent window rather than the whole run and memory
+stays flat. Recording is thread-safe; workers and the UI thread share the
+module-level `spans` recorder.
+"""
+import csv
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from termtel.telemetry.ringbuffer import RingBuffer
+
+PERCENTILES = (50, 90, 99)
+STAT_FIELDS = ['device', 'stage', 'count', 'errors', 'last_ms', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms']
+
+
+def _stat_row(device: str, stage: str, values: np.ndarray, last: float, count: int, errors: int) -> dict:
+    values = values * 1000.0
+    p50, p90, p99 = np.percentile(values, PERCENTILES)
+    return {
+        'device': device,
+        'stage': stage,
+        'count': count,
+        'errors': errors,
+        'last_ms': last * 1000.0,
+        'p50_ms': float(p50),
+        'p90_ms': float(p90),
+        'p99_ms': float(p99),
+        'max_ms': float(values.max()),
+    }
+
+
+class SpanRecorder:
+    """Rolling duration percentiles per (device, stage)."""
+
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._buffers: Dict[Tuple[str, str], RingBuffer] = {}
+        self._counts: Dict[Tuple[str, str], List[int]] = {}  # key -> [spans, errors]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, device: str, stage: str):
+        """Time the enclosed block; failed blocks are recorded and counted as errors"""
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(device, stage, time.perf_counter() - started, failed)
+
+    def record(self, device: str, stage: str, seconds: float, failed: bool = False) -> None:
+        key = (device or '', stage)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = RingBuffer(self.window)
+                self._counts[key] = [0, 0]
+            buffer.append(seconds)
+            counts = self._counts[key]
+            counts[0] += 1
+            counts[1] += failed
+
+    def devices(self) -> List[str]:
+        with self._lock:
+            return sorted({device for device, _ in self._buffers})
+
+    def stats(self, device: Optional[str] = None) -> List[dict]:
+        """One row per (device, stage) with the STAT_FIELDS, times in milliseconds"""
+        with self._lock:
+            snapshot = [
+                (key, buffer.values(), buffer.last(), list(self._counts[key]))
+                for key, buffer in sorted(self._buffers.items())
+                if device is None or key[0] == device
+            ]
+        return [_stat_row(name, stage, values, last, count, errors)
+                for (name, stage), values, last, (count, errors) in snapshot]
+
+    def summary(self) -> List[dict]:
+        """One row per stage across all devices (device '*'), e.g. for a benchmark run"""
+        stages: Dict[str, list] = {}
+        with self._lock:
+            for key, buffer in sorted(self._buffers.items()):
+                stage = key[1]
+                count, errors = self._counts[key]
+                row = stages.setdefault(stage, [[], 0.0, 0, 0])
+                row[0].append(buffer.values())
+                row[1] = buffer.last()
+                row[2] += count
+                row[3] += errors
+        return [_stat_row('*', stage, np.concatenate(values), last, count, errors)
+                for stage, (values, last, count, errors) in sorted(stages.items())]
+
+    def clear(self, device: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [key for key in self._buffers if device is None or key[0] == device]:
+                del self._buffers[key]
+                del self._counts[key]
+
+    def export(self, path) -> int:
+        """Write stats() to a .json or .csv file (by suffix); returns the number of rows"""
+        path = Path(path)
+        rows = self.stats()
+        if path.suffix.lower() == '.json':
+            path.write_text(json.dumps({'timestamp': time.time(), 'spans': rows}, indent=2))
+        else:
+            with path.open('w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=STAT_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+        return len(rows)
+
+
+# Shared by the polling workers, the engine and the dashboard
+spans = SpanRecorder()
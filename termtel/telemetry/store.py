@@ -0,0 +1,250 @@
+# telemetry/store.py
+"""
+On-disk telemetry history.
+
+An SQLite database in WAL mode, so the polling worker can write while the UI
+reads. Samples are buffered and written in batches (one transaction per
+flush) by the thread that adds them; reads use their own connection and merge
+in the buffered samples, so a chart never writes or compacts on the UI
+thread. Raw samples are kept for `raw_retention` seconds and then folded into
+min/max/avg rollups of `rollup_interval` seconds, which are kept for
+`rollup_retention` seconds. Range queries return raw samples where they still
+exist and rollup averages for anything older, so a chart can show the last
+24 h of an interface after the app has been restarted.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from termtel.helpers.settings import get_config_dir
+
+logger = logging.getLogger(__name__)
+
+# Interface metrics recorded from a get_interfaces result
+INTERFACE_METRICS = {
+    'rx_bps': 'input_rate',
+    'tx_bps': 'output_rate',
+    'utilization': 'utilization',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    device TEXT NOT NULL,
+    series TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    ts REAL NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_lookup ON samples (device, series, metric, ts);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    device TEXT NOT NULL,
+    series TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    ts REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    avg REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (device, series, metric, ts)
+);
+CREATE INDEX IF NOT EXISTS rollups_ts ON rollups (ts);
+"""
+
+Sample = Tuple[str, str, str, float, float]  # device, series, metric, ts, value
+
+
+class MetricsStore:
+    """Batched, downsampled time-series store for interface and device metrics."""
+
+    def __init__(self, path: Optional[Path] = None, raw_retention: float = 86400,
+                 rollup_interval: float = 300, rollup_retention: float = 30 * 86400,
+                 batch_size: int = 500, flush_interval: float = 30.0):
+        self.path = Path(path) if path else get_config_dir() / "telemetry.db"
+        self.raw_retention = raw_retention
+        self.rollup_interval = rollup_interval
+        self.rollup_retention = rollup_retention
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending: List[Sample] = []
+        self._last_flush = time.monotonic()
+        self._last_compact = 0.0
+        self._lock = threading.RLock()
+
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        # Separate connection for reads: WAL readers do not wait on the writer
+        self._reader = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._read_lock = threading.Lock()
+
+    # Writes
+
+    def add(self, device: str, series: str, metric: str, value: float, timestamp: Optional[float] = None) -> None:
+        self.add_many([(device, series, metric, time.time() if timestamp is None else timestamp, value)])
+
+    def add_many(self, samples: Iterable[Sample]) -> None:
+        """Buffer samples; they are written once the batch is full or flush_interval has passed"""
+        with self._lock:
+            self._pending.extend(samples)
+            if (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+
+    def record_interfaces(self, device: str, interfaces: Dict[str, dict], timestamp: Optional[float] = None) -> None:
+        """Buffer rx/tx rate and utilization of every interface in a get_interfaces result"""
+        timestamp = time.time() if timestamp is None else timestamp
+        samples = []
+        for name, details in interfaces.items():
+            for metric, key in INTERFACE_METRICS.items():
+                value = details.get(key)
+                if value is None:
+                    continue
+                try:
+                    samples.append((device, name, metric, timestamp, float(value)))
+                except (TypeError, ValueError):
+                    continue
+        self.add_many(samples)
+
+    def on_poll_event(self, event) -> None:
+        """PollingEngine subscriber: persist interface results and getter latency"""
+        if not event.ok:
+            return
+        if event.getter == 'interfaces':
+            self.record_interfaces(event.device_id, event.result.get('interfaces', {}), event.timestamp)
+        self.add(event.device_id, '', f'{event.getter}_seconds', event.duration, event.timestamp)
+
+    def flush(self) -> None:
+        """Write buffered samples in one transaction and apply retention when due"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if pending:
+                try:
+                    with self._db:
+                        self._db.executemany(
+                            "INSERT INTO samples (device, series, metric, ts, value) VALUES (?, ?, ?, ?, ?)",
+                            pending
+                        )
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to write {len(pending)} telemetry samples: {e}")
+            if time.time() - self._last_compact >= self.rollup_interval:
+                self.compact()
+
+    def compact(self, now: Optional[float] = None) -> None:
+        """Roll raw samples past raw_retention into rollups and drop expired rollups"""
+        now = time.time() if now is None else now
+        # Only whole buckets are rolled up, so a bucket is never split between runs
+        cutoff = (now - self.raw_retention) // self.rollup_interval * self.rollup_interval
+        with self._lock:
+            try:
+                with self._db:
+                    self._db.execute(
+                        """
+                        INSERT INTO rollups (device, series, metric, ts, min, max, avg, count)
+                        SELECT device, series, metric, CAST(ts / :step AS INTEGER) * :step AS bucket,
+                               MIN(value), MAX(value), AVG(value), COUNT(*)
+                        FROM samples WHERE ts < :cutoff
+                        GROUP BY device, series, metric, bucket
+                        ON CONFLICT (device, series, metric, ts) DO UPDATE SET
+                            min = MIN(rollups.min, excluded.min),
+                            max = MAX(rollups.max, excluded.max),
+                            avg = (rollups.avg * rollups.count + excluded.avg * excluded.count)
+                                  / (rollups.count + excluded.count),
+                            count = rollups.count + excluded.count
+                        """,
+                        {'step': self.rollup_interval, 'cutoff': cutoff}
+                    )
+                    self._db.execute("DELETE FROM samples WHERE ts < ?", (cutoff,))
+                    self._db.execute("DELETE FROM rollups WHERE ts < ?", (now - self.rollup_retention,))
+            except sqlite3.Error as e:
+                logger.error(f"Telemetry store compaction failed: {e}")
+            self._last_compact = now
+
+    # Reads
+
+    def query(self, device: str, series: str, metric: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (timestamps, values) between start and end, oldest first.
+
+        Raw samples are returned where they exist; older parts of the range
+        come from rollup averages.
+        """
+        end = time.time() if end is None else end
+        start = end - self.raw_retention if start is None else start
+        with self._lock:
+            pending = [
+                (ts, value) for d, s, m, ts, value in self._pending
+                if d == device and s == series and m == metric and start <= ts <= end
+            ]
+        with self._read_lock:
+            raw = self._reader.execute(
+                "SELECT ts, value FROM samples WHERE device = ? AND series = ? AND metric = ? "
+                "AND ts >= ? AND ts <= ? ORDER BY ts",
+                (device, series, metric, start, end)
+            ).fetchall()
+            if pending:
+                raw = sorted(raw + pending)
+            rollup_end = raw[0][0] if raw else end
+            rolled = self._reader.execute(
+                "SELECT ts, avg FROM rollups WHERE device = ? AND series = ? AND metric = ? "
+                "AND ts >= ? AND ts < ? ORDER BY ts",
+                (device, series, metric, start, rollup_end)
+            ).fetchall()
+        rows = rolled + raw
+        if not rows:
+            return np.empty(0), np.empty(0)
+        data = np.array(rows, dtype=np.float64)
+        return data[:, 0], data[:, 1]
+
+    def series_names(self, device: str, metric: Optional[str] = None) -> List[str]:
+        with self._lock:
+            names = {s for d, s, m, _, _ in self._pending if d == device and (not metric or m == metric)}
+        sql = "SELECT DISTINCT series FROM samples WHERE device = ?"
+        params = [device]
+        if metric:
+            sql += " AND metric = ?"
+            params.append(metric)
+        with self._read_lock:
+            names.update(row[0] for row in self._reader.execute(sql, params))
+        return sorted(names)
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._db.close()
+        with self._read_lock:
+            self._reader.close()
+
+
+_metrics_store: Optional[MetricsStore] = None
+
+
+def metrics_store(settings_manager=None) -> Optional[MetricsStore]:
+    """Application-wide store, or None when disabled in settings"""
+    global _metrics_store
+    if _metrics_store is None:
+        options = {}
+        if settings_manager is not None:
+            if not settings_manager.get_telemetry_setting('store_enabled', True):
+                return None
+            options = {
+                'raw_retention': settings_manager.get_telemetry_setting('store_raw_retention', 86400),
+                'rollup_interval': settings_manager.get_telemetry_setting('store_rollup_interval', 300),
+                'rollup_retention': settings_manager.get_telemetry_setting('store_rollup_retention', 30 * 86400),
+            }
+        try:
+            _metrics_store = MetricsStore(**options)
+        except sqlite3.Error as e:
+            logger.error(f"Telemetry store unavailable: {e}")
+            return None
+    return _metrics_store
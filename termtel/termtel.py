@@ -470,6 +470,9 @@ class TermtelWindow(QMainWindow):
         if hasattr(self, 'terminal_tabs'):
             self.terminal_tabs.cleanup_all()
 
+        if hasattr(self, 'session_navigator'):
+            self.session_navigator.stop_reachability()
+
         # Shut down server
         if self.server_thread and self.server_thread.isRunning():
             logger.info("Shutting down server...")
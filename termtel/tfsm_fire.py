@@ -1,5 +1,6 @@
 import sqlite3
 import textfsm
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import io
 import time
@@ -23,7 +24,11 @@ class ThreadSafeConnection:
     def get_connection(self):
         """Get a thread-local connection"""
         if not hasattr(self._local, 'connection'):
-            self._local.connection = sqlite3.connect(self.db_path)
+            # Read-only: a missing database must not be created empty next to the package
+            path = Path(self.db_path)
+            if not path.is_file():
+                raise FileNotFoundError(f"TextFSM template database not found: {path}")
+            self._local.connection = sqlite3.connect(f"{path.absolute().as_uri()}?mode=ro", uri=True)
             self._local.connection.row_factory = sqlite3.Row
             if self.verbose:
                 click.echo(f"Created new connection in thread {threading.get_ident()}")
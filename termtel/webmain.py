@@ -12,6 +12,7 @@ from termtel.routers import workspace, search
 from termtel.routers.search import load_sessions_for_user
 from termtel.routers.workspace import create_workspace_for_user
 from termtel.ssh.ssh_manager import SSHClientManager
+from termtel.telemetry.snapshot import metrics_snapshot, CONTENT_TYPE as OPENMETRICS_CONTENT_TYPE
 
 # Create FastAPI app
 app = FastAPI()
@@ -78,6 +79,12 @@ async def main_page(request: Request, theme: str = "default"):
     })
 
 
+@app.get("/metrics")
+async def metrics():
+    """Current telemetry in OpenMetrics text format, rendered from the poller's in-memory snapshot"""
+    return Response(content=metrics_snapshot.render(), media_type=OPENMETRICS_CONTENT_TYPE)
+
+
 # SSHClientManager and WebSocket connections
 ssh_manager = SSHClientManager()
 
@@ -10,11 +10,13 @@ from PyQt6.QtWidgets import (
     QPushButton, QLineEdit, QLabel, QCheckBox, QGroupBox, QMenu,
     QMessageBox, QFormLayout
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from PyQt6.QtGui import QColor, QIcon, QPainter, QPixmap
 import logging
 from typing import Optional
 
 from termtel.themes2 import LayeredHUDFrame
+from termtel.ssh.reachability import reachability, ReachabilityScanThread
 from termtel.widgets.new_session_dialog import NewSessionDialog
 from termtel.helpers.credslib import SecureCredentials
 
@@ -131,10 +133,14 @@ class SessionNavigator(QWidget):
         self.cred_manager = cred_manager
         self.sessions_file = Path('sessions/sessions.yaml')
         self.parent = parent
+        self.session_items = {}  # (host, port) -> [QTreeWidgetItem]
+        self.scan_thread = None
+        self._status_icons = {}
         self.setup_ui()
         self.current_theme = parent.theme
         if hasattr(parent, 'theme_manager'):
             self.update_theme(self.current_theme)
+        self.setup_reachability()
         self.load_sessions()
 
     def setup_ui(self):
@@ -255,6 +261,7 @@ class SessionNavigator(QWidget):
                 sessions_data = file_content_to_load
 
             self.session_tree.clear()
+            self.session_items = {}
 
             for folder in sessions_data:
                 folder_item = QTreeWidgetItem(self.session_tree)
@@ -268,15 +275,90 @@ class SessionNavigator(QWidget):
                         'type': 'session',
                         'data': session
                     })
+                    self.register_session_item(session_item, session)
 
             # self.session_tree.expandAll()
 
             logger.info("Sessions loaded successfully")
+            self.scan_reachability()
 
         except Exception as e:
             logger.error(f"Error loading sessions: {str(e)}")
             QMessageBox.warning(self, "Error", f"Failed to load sessions: {str(e)}")
 
+    def setup_reachability(self):
+        """Configure the shared reachability scanner and the periodic rescan timer."""
+        settings = getattr(self.parent, 'settings_manager', None)
+        get = (lambda key: settings.get('reachability', key)) if settings else (lambda key: None)
+
+        self.reachability_enabled = get('enabled') is not False
+        reachability.concurrency = get('concurrency') or reachability.concurrency
+        reachability.timeout = get('timeout') or reachability.timeout
+        reachability.ttl = get('ttl') or reachability.ttl
+
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setInterval(int((get('interval') or 120) * 1000))
+        self.rescan_timer.timeout.connect(self.scan_reachability)
+        if self.reachability_enabled:
+            self.rescan_timer.start()
+
+    def register_session_item(self, item, session):
+        """Remember which tree items belong to a host:port and show any cached state."""
+        try:
+            key = reachability.make_key(session['host'], session.get('port') or 22)
+        except (KeyError, ValueError):
+            return
+        self.session_items.setdefault(key, []).append(item)
+        cached = reachability.get_cached(*key)
+        if cached:
+            self.apply_reachability(cached)
+
+    def scan_reachability(self):
+        """Probe every loaded session in the background; results arrive via apply_reachability."""
+        if not self.reachability_enabled or not self.session_items:
+            return
+        if self.scan_thread and self.scan_thread.isRunning():
+            return
+        self.scan_thread = ReachabilityScanThread(list(self.session_items.keys()), parent=self)
+        self.scan_thread.status_changed.connect(self.apply_reachability)
+        self.scan_thread.scan_finished.connect(
+            lambda up, total: logger.info(f"Reachability: {up}/{total} sessions reachable")
+        )
+        self.scan_thread.start()
+
+    def apply_reachability(self, result):
+        """Update the up/down marker of every tree item for result's host:port."""
+        icon = self.status_icon('#00c853' if result.reachable else '#d50000')
+        if result.reachable:
+            tooltip = f"{result.host}:{result.port} reachable ({result.latency * 1000:.0f} ms)"
+        else:
+            tooltip = f"{result.host}:{result.port} unreachable: {result.error}"
+        for item in self.session_items.get((result.host, result.port), []):
+            item.setIcon(0, icon)
+            item.setToolTip(0, tooltip)
+
+    def stop_reachability(self):
+        """Stop rescans and cancel a running scan, waiting at most a couple of seconds for it."""
+        self.rescan_timer.stop()
+        if self.scan_thread and self.scan_thread.isRunning():
+            self.scan_thread.stop()
+            if not self.scan_thread.wait(2000):
+                logger.warning("Reachability scan did not stop within 2 seconds")
+
+    def status_icon(self, color: str) -> QIcon:
+        """Small filled circle used as the reachability marker."""
+        if color not in self._status_icons:
+            pixmap = QPixmap(10, 10)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setBrush(QColor(color))
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.drawEllipse(1, 1, 8, 8)
+            painter.end()
+            self._status_icons[color] = QIcon(pixmap)
+        return self._status_icons[color]
+
     def handle_search(self, text):
         """Filter the session tree based on search text."""
         def match_item(item, text):
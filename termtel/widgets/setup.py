@@ -5,15 +5,17 @@ Handles menu system and dialog setup
 import yaml
 from PyQt6.QtGui import QActionGroup, QAction
 from PyQt6.QtWidgets import (
-    QMenuBar, QMenu, QFileDialog, QDialog,
-    QVBoxLayout, QLabel, QWidget, QGroupBox, QPushButton
+    QMenuBar, QMenu, QFileDialog, QDialog, QMessageBox,
+    QVBoxLayout, QHBoxLayout, QLabel, QWidget, QGroupBox, QPushButton, QComboBox
 )
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtCore import QUrl, Qt
+from PyQt6.QtCore import QUrl, Qt, QTimer
 import logging
 import os
 
 from termtel.napalm_dashboard import DeviceDashboardWidget
+from termtel.telemetry.spans import spans, STAT_FIELDS
+from termtel.widgets.telemetry_models import KeyedTableModel, create_table_view
 from .credential_manager import CredentialManagerDialog
 from .nbtosession import App as NetboxExporter
 
@@ -139,17 +141,38 @@ class AboutDialog(QDialog):
         self.setLayout(layout)
 
 class TelemetryDialog(QDialog):
+    """Rolling per-device timings of each polling stage, with export"""
+
+    ALL_DEVICES = "All devices"
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("Telemetry Settings")
-        self.setMinimumSize(500, 400)
+        self.setWindowTitle("Telemetry Timings")
+        self.setMinimumSize(800, 400)
 
         layout = QVBoxLayout()
 
-        # Data Collection Group
-        collection_group = QGroupBox("Data Collection")
+        # Stage timings: connect, getter.*, template.*, parse.*, ui.*
+        collection_group = QGroupBox("Polling Stages (ms, last 256 spans)")
         collection_layout = QVBoxLayout()
-        # TODO: Add data collection settings
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Device:"))
+        self.device_combo = QComboBox()
+        self.device_combo.addItem(self.ALL_DEVICES)
+        self.device_combo.currentTextChanged.connect(self.refresh)
+        filter_layout.addWidget(self.device_combo, 1)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear_spans)
+        filter_layout.addWidget(clear_btn)
+        collection_layout.addLayout(filter_layout)
+
+        headers = [field.replace('_ms', '').replace('_', ' ').title() for field in STAT_FIELDS]
+        milliseconds = lambda value: f"{value:.1f}"
+        self.model = KeyedTableModel(headers, formatters={
+            column: milliseconds for column, field in enumerate(STAT_FIELDS) if field.endswith('_ms')
+        })
+        self.view = create_table_view(self.model)
+        collection_layout.addWidget(self.view)
         collection_group.setLayout(collection_layout)
 
         # Export Group
@@ -164,10 +187,49 @@ class TelemetryDialog(QDialog):
         layout.addWidget(export_group)
         self.setLayout(layout)
 
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(1000)
+        self.refresh()
+
+    def refresh(self):
+        devices = spans.devices()
+        known = {self.device_combo.itemText(i) for i in range(self.device_combo.count())}
+        for device in devices:
+            if device not in known:
+                self.device_combo.addItem(device)
+
+        selected = self.device_combo.currentText()
+        device = None if selected == self.ALL_DEVICES else selected
+        self.model.set_rows(
+            ((row['device'], row['stage']), tuple(row[field] for field in STAT_FIELDS))
+            for row in spans.stats(device)
+        )
+
+    def clear_spans(self):
+        selected = self.device_combo.currentText()
+        spans.clear(None if selected == self.ALL_DEVICES else selected)
+        self.refresh()
+
     def export_telemetry(self):
-        # TODO: Implement telemetry export
-        logger.info("Telemetry export requested")
-        pass
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Telemetry Timings",
+            "telemetry_timings.csv",
+            "CSV Files (*.csv);;JSON Files (*.json)"
+        )
+        if not file_name:
+            return
+        try:
+            count = spans.export(file_name)
+            logger.info(f"Exported {count} telemetry timing rows to {file_name}")
+        except OSError as e:
+            logger.error(f"Telemetry export failed: {e}")
+            QMessageBox.warning(self, "Export Failed", str(e))
+
+    def done(self, result):
+        self.refresh_timer.stop()
+        super().done(result)
 
 
 def setup_menus(window):
@@ -228,6 +290,8 @@ def setup_menus(window):
     netbox_action.triggered.connect(lambda: show_netbox_importer(window))
     manage_sessions_action = tools_menu.addAction('Manage Sessions')
     manage_sessions_action.triggered.connect(lambda: show_session_manager(window))
+    timings_action = tools_menu.addAction("Telemetry &Timings")
+    timings_action.triggered.connect(lambda: show_telemetry_dialog(window))
 
     # Help Menu
     help_menu = menubar.addMenu("&Help")
@@ -235,7 +299,6 @@ def setup_menus(window):
     about_action = help_menu.addAction("&About")
     about_action.triggered.connect(lambda: show_about_dialog(window))
 
-# Remove TelemetryDialog and show_telemetry_dialog since they're not needed anymore
 def toggle_telemetry(window, telemetry_action):
     """Toggle telemetry frame visibility and save state"""
     is_visible = telemetry_action.isChecked()
@@ -297,9 +360,10 @@ def show_credentials_dialog(window):
 
 
 def show_telemetry_dialog(window):
-    """Show the telemetry settings dialog"""
+    """Show the polling stage timings dialog"""
     try:
-        window.launch_telemetry()
+        dialog = TelemetryDialog(window)
+        dialog.exec()
     except Exception as e:
         logger.error(f"Error showing telemetry dialog: {e}")
 
@@ -0,0 +1,524 @@
+# widgets/telemetry_models.py
+"""
+Keyed table models for the telemetry dashboard.
+
+Each refresh hands the model the complete new row set; the model diffs it
+against what it already holds and only emits dataChanged for cells that
+changed, plus row inserts/removes where rows appeared or went away. Views
+keep their selection, scroll position and sort order across refreshes.
+
+Route tables are too large for per-row diffing and go through
+RouteTableModel, a virtual model over the columnar RouteTable. ARP and LLDP
+tables use ColumnTableModel, a virtual model over plain column lists that
+can be filtered to a set of rows (search results).
+"""
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QTreeView, QTableView, QHeaderView, QAbstractItemView
+
+from termtel.telemetry.routes import RouteChurn, RouteTable, COLUMNS as ROUTE_COLUMNS
+
+# Raw (unformatted) cell value, used for sorting
+SORT_ROLE = Qt.ItemDataRole.UserRole
+# Row key of the cell
+KEY_ROLE = Qt.ItemDataRole.UserRole + 1
+# Order-array elements apply_churn may move (blocks x rows) before a reset is cheaper
+CHURN_WORK_LIMIT = 50_000_000
+
+Row = Tuple[Hashable, Sequence[Any]]  # (key, column values)
+
+
+class KeyedTableModel(QAbstractTableModel):
+    """Table model whose rows are identified by a key and updated by diffing."""
+
+    def __init__(self, headers: Sequence[str], formatters: Optional[Dict[int, Callable[[Any], str]]] = None,
+                 parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.formatters = formatters or {}
+        # foreground(values, column) -> QColor or None
+        self.foreground: Optional[Callable[[Sequence[Any], int], Optional[QColor]]] = None
+        self.highlight_color = QColor("#22D3EE")
+        self.highlight_color.setAlpha(40)
+        self._keys: List[Hashable] = []
+        self._rows: Dict[Hashable, Tuple[Any, ...]] = {}
+        self._highlighted: Optional[Hashable] = None
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        key = self._keys[index.row()]
+        values = self._rows[key]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = values[column]
+            formatter = self.formatters.get(column)
+            return formatter(value) if formatter else ('' if value is None else str(value))
+        if role == SORT_ROLE:
+            return values[column]
+        if role == KEY_ROLE:
+            return key
+        if role == Qt.ItemDataRole.ForegroundRole and self.foreground:
+            return self.foreground(values, column)
+        if role == Qt.ItemDataRole.BackgroundRole and key == self._highlighted:
+            return self.highlight_color
+        return None
+
+    # Updates
+
+    def set_rows(self, rows: Iterable[Row]) -> None:
+        """Replace the contents with rows, emitting only the changes"""
+        new_rows: Dict[Hashable, Tuple[Any, ...]] = {}
+        for key, values in rows:
+            new_rows[key] = tuple(values)
+
+        # Removals, bottom-up in contiguous blocks so row numbers stay valid
+        removed = [row for row, key in enumerate(self._keys) if key not in new_rows]
+        for first, last in reversed(list(_blocks(removed))):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._keys[first:last + 1]
+            self.endRemoveRows()
+        for key in set(self._rows) - set(new_rows):
+            del self._rows[key]
+
+        # Changed cells, one dataChanged per row spanning the changed columns
+        for row, key in enumerate(self._keys):
+            old, new = self._rows[key], new_rows[key]
+            if old == new:
+                continue
+            self._rows[key] = new
+            changed = [column for column in range(len(new)) if column >= len(old) or old[column] != new[column]]
+            self.dataChanged.emit(self.index(row, changed[0]), self.index(row, changed[-1]))
+
+        # Inserts, appended as one block (the sort proxy places them)
+        added = [key for key in new_rows if key not in self._rows]
+        if added:
+            first = len(self._keys)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            self._keys.extend(added)
+            for key in added:
+                self._rows[key] = new_rows[key]
+            self.endInsertRows()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._keys.clear()
+        self._rows.clear()
+        self._highlighted = None
+        self.endResetModel()
+
+    def refresh_roles(self) -> None:
+        """Repaint every cell, e.g. after the foreground colors changed with the theme"""
+        if self._keys:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._keys) - 1, len(self.headers) - 1))
+
+    # Lookups
+
+    def keys(self) -> List[Hashable]:
+        return list(self._keys)
+
+    def values(self, key: Hashable) -> Optional[Tuple[Any, ...]]:
+        return self._rows.get(key)
+
+    def rows(self) -> Iterable[Tuple[Hashable, Tuple[Any, ...]]]:
+        return ((key, self._rows[key]) for key in self._keys)
+
+    def row_of(self, key: Hashable) -> int:
+        try:
+            return self._keys.index(key)
+        except ValueError:
+            return -1
+
+    def highlight(self, key: Optional[Hashable]) -> None:
+        """Give one row a background highlight (None clears it)"""
+        previous, self._highlighted = self._highlighted, key
+        for changed in (previous, key):
+            row = self.row_of(changed) if changed is not None else -1
+            if row >= 0:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1),
+                                      [Qt.ItemDataRole.BackgroundRole])
+
+
+def _blocks(rows: List[int]):
+    """Contiguous (first, last) runs of sorted row numbers"""
+    start = previous = None
+    for row in rows:
+        if start is None:
+            start = previous = row
+        elif row == previous + 1:
+            previous = row
+        else:
+            yield start, previous
+            start = previous = row
+    if start is not None:
+        yield start, previous
+
+
+class TableSortProxy(QSortFilterProxyModel):
+    """Sorts on raw values (SORT_ROLE) so numbers and percentages sort numerically."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+        self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+    def lessThan(self, left, right):
+        a = left.data(SORT_ROLE)
+        b = right.data(SORT_ROLE)
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            return a < b
+        return str(a if a is not None else '') < str(b if b is not None else '')
+
+
+def create_table_view(model: KeyedTableModel, sort_column: int = 0) -> QTreeView:
+    """Flat, sortable QTreeView over model through a TableSortProxy"""
+    proxy = TableSortProxy()
+    proxy.setSourceModel(model)
+    view = QTreeView()
+    view.setModel(proxy)
+    view.setRootIsDecorated(False)
+    view.setUniformRowHeights(True)
+    view.setItemsExpandable(False)
+    view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    view.setSortingEnabled(True)
+    view.sortByColumn(sort_column, Qt.SortOrder.AscendingOrder)
+    return view
+
+
+def create_virtual_table_view(model: QAbstractTableModel, sort_column: int = 0) -> QTableView:
+    """
+    QTableView for models with very many rows (sorted by the model itself).
+
+    Unlike QTreeView, QTableView with fixed row heights never lays out rows
+    outside the viewport, so scrolling to a row of a 900k row table is instant.
+    """
+    view = QTableView()
+    view.setModel(model)
+    view.setShowGrid(False)
+    view.setWordWrap(False)
+    view.verticalHeader().setVisible(False)
+    view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+    view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 8)
+    view.horizontalHeader().setStretchLastSection(True)
+    view.horizontalHeader().setHighlightSections(False)
+    view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    view.setSortingEnabled(True)
+    view.sortByColumn(sort_column, Qt.SortOrder.AscendingOrder)
+    return view
+
+
+def selected_key(view: QTreeView) -> Optional[Hashable]:
+    """Row key of the current selection in a view built by create_table_view"""
+    selection = view.selectionModel()
+    if selection is None:
+        return None
+    rows = selection.selectedRows()
+    return rows[0].data(KEY_ROLE) if rows else None
+
+
+class ColumnTableModel(QAbstractTableModel):
+    """
+    Virtual model over parallel column sequences.
+
+    Shows all rows, or only the rows passed to set_filter(), in the order of
+    the sorted column. sort_keys maps a column to a function returning NumPy
+    sort keys for its values (e.g. numeric IP order); other columns sort as
+    strings. key_columns identify a row across set_columns() calls, so the
+    view's selection and current row follow it from poll to poll.
+    """
+
+    def __init__(self, headers: Sequence[str],
+                 sort_keys: Optional[Dict[int, Callable[[Sequence[Any]], np.ndarray]]] = None,
+                 key_columns: Sequence[int] = (), parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.sort_keys = sort_keys or {}
+        self.key_columns = tuple(key_columns)
+        self.columns: List[Sequence[Any]] = [[] for _ in self.headers]
+        self.filter: Optional[np.ndarray] = None
+        self.order = np.arange(0)
+        self.sort_column = 0
+        self.sort_descending = False
+        self._sort_cache: Dict[int, np.ndarray] = {}  # column -> sort keys of all rows
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = int(self.order[index.row()])
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = self.columns[index.column()][row]
+            return '' if value is None else str(value)
+        if role == KEY_ROLE:
+            return row
+        return None
+
+    def set_columns(self, columns: Sequence[Sequence[Any]], filter_rows: Optional[Iterable[int]] = None) -> None:
+        """
+        Replace the data (and filter).
+
+        Without key_columns, or with nothing selected, this is one reset.
+        Otherwise it is a layout change that moves selected and current
+        rows to where their keys now are, dropping rows that went away.
+        """
+        if not self.key_columns or not self.persistentIndexList():
+            self.beginResetModel()
+            self._replace(columns, filter_rows)
+            self.endResetModel()
+            return
+        self.layoutAboutToBeChanged.emit()
+        # Fetched after the signal: the selection model saves its rows on it
+        persistent = self.persistentIndexList()
+        keys = [self.row_key(int(self.order[index.row()])) for index in persistent]
+        self._replace(columns, filter_rows)
+        rows = self._view_rows(set(keys))
+        self.changePersistentIndexList(persistent, [
+            self.index(rows[key], index.column()) if key in rows else QModelIndex()
+            for key, index in zip(keys, persistent)
+        ])
+        self.layoutChanged.emit()
+
+    def _replace(self, columns: Sequence[Sequence[Any]], filter_rows: Optional[Iterable[int]]) -> None:
+        if len(columns) != len(self.columns) or any(new is not old for new, old in zip(columns, self.columns)):
+            self._sort_cache = {}
+        self.columns = list(columns)
+        self.filter = None if filter_rows is None else np.asarray(list(filter_rows), dtype=np.int64)
+        self._apply_order()
+
+    def row_key(self, row: int) -> Tuple[Any, ...]:
+        """Key of a data row, from its key_columns"""
+        return tuple(self.columns[column][row] for column in self.key_columns)
+
+    def _view_rows(self, keys: set) -> Dict[Tuple[Any, ...], int]:
+        """key -> view row for the keys that are still shown"""
+        position = np.full(len(self.columns[0]) if self.columns else 0, -1, dtype=np.int64)
+        position[self.order] = np.arange(len(self.order))
+        wanted = {key[0] for key in keys}
+        rows = {}
+        for row, value in enumerate(self.columns[self.key_columns[0]]):
+            if value in wanted and position[row] >= 0:
+                key = self.row_key(row)
+                if key in keys and key not in rows:
+                    rows[key] = int(position[row])
+        return rows
+
+    def set_filter(self, rows: Optional[Iterable[int]]) -> None:
+        """Show only these rows; None shows every row"""
+        self.set_columns(self.columns, rows)
+
+    def clear(self) -> None:
+        self.set_columns([[] for _ in self.headers])
+
+    def column_changed(self, column: int) -> None:
+        """Values of one column were replaced in place"""
+        self._sort_cache.pop(column, None)
+        if column == self.sort_column:
+            self.sort(self.sort_column, Qt.SortOrder.DescendingOrder if self.sort_descending
+                      else Qt.SortOrder.AscendingOrder)
+        if len(self.order):
+            self.dataChanged.emit(self.index(0, column), self.index(len(self.order) - 1, column),
+                                  [Qt.ItemDataRole.DisplayRole])
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        rows = [int(self.order[index.row()]) for index in persistent]
+        self.sort_column = column
+        self.sort_descending = order == Qt.SortOrder.DescendingOrder
+        self._apply_order()
+        if persistent:
+            # Same data rows, new view positions: the selection follows the sort
+            position = np.empty(max(len(self.columns[0]), 1), dtype=np.int64)
+            position[self.order] = np.arange(len(self.order))
+            self.changePersistentIndexList(persistent, [
+                self.index(int(position[row]), index.column()) for row, index in zip(rows, persistent)
+            ])
+        self.layoutChanged.emit()
+
+    def _apply_order(self) -> None:
+        values = self.columns[self.sort_column] if self.columns else []
+        rows = np.arange(len(values)) if self.filter is None else self.filter
+        if not len(rows):
+            self.order = np.arange(0)
+            return
+        keys = self._sort_cache.get(self.sort_column)
+        if keys is None:
+            key_function = self.sort_keys.get(self.sort_column)
+            keys = key_function(values) if key_function else np.array([str(value) for value in values])
+            self._sort_cache[self.sort_column] = keys
+        order = rows[np.argsort(keys[rows], kind='stable')]
+        self.order = order[::-1] if self.sort_descending else order
+
+
+class RouteTableModel(QAbstractTableModel):
+    """
+    Virtual model over a columnar RouteTable.
+
+    Cells are rendered only when a view asks for them, and sorting is a NumPy
+    argsort of one column, so full Internet tables load without building a
+    Python object per route.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.table = RouteTable()
+        self.order = np.arange(0)
+        self.position = np.arange(0)  # table row -> view row
+        self.sort_column = 0
+        self.sort_descending = False
+        # foreground(row values, column) -> QColor or None
+        self.foreground: Optional[Callable[[Sequence[Any], int], Optional[QColor]]] = None
+        self.highlight_color = QColor("#22D3EE")
+        self.highlight_color.setAlpha(40)
+        self._highlighted: Optional[int] = None
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(ROUTE_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return ROUTE_COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = int(self.order[index.row()])
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.table.cell(row, index.column())
+        if role == KEY_ROLE:
+            return row
+        if role == Qt.ItemDataRole.ForegroundRole and self.foreground and index.column() == 0:
+            return self.foreground(self.table.row(row), 0)
+        if role == Qt.ItemDataRole.BackgroundRole and row == self._highlighted:
+            return self.highlight_color
+        return None
+
+    def set_table(self, table: RouteTable) -> None:
+        self.beginResetModel()
+        self.table = table
+        self._highlighted = None
+        self._apply_order()
+        self.endResetModel()
+
+    def clear(self) -> None:
+        self.set_table(RouteTable())
+
+    def apply_churn(self, churn: RouteChurn, max_changes: int = 2000, max_work: int = CHURN_WORK_LIMIT) -> None:
+        """
+        Move to churn.new by removing and inserting only the changed rows.
+
+        The final order is computed once; removes and inserts are then
+        signalled per contiguous block of view rows, and kept rows whose
+        protocol, interface or metric changed get one dataChanged span. Every block moves the
+        order array once, so when blocks x rows exceeds max_work (or the diff
+        was not taken against the table currently shown) a reset is cheaper.
+        """
+        if churn.old is not self.table or len(churn.removed_rows) + len(churn.added_rows) > max_changes:
+            self.set_table(churn.new)
+            return
+        final_order = churn.new.sort_order(self.sort_column, self.sort_descending)
+        final_position = np.empty(len(final_order), dtype=np.int64)
+        final_position[final_order] = np.arange(len(final_order))
+        removed_blocks = list(_blocks(np.sort(self.position[churn.removed_rows]).tolist()))
+        added_blocks = list(_blocks(np.sort(final_position[churn.added_rows]).tolist()))
+        if (len(removed_blocks) + len(added_blocks)) * max(len(self.order), len(final_order)) > max_work:
+            self.set_table(churn.new)
+            return
+        parent = QModelIndex()
+
+        # Removals, bottom-up (order still indexes the old table)
+        for first, last in reversed(removed_blocks):
+            self.beginRemoveRows(parent, first, last)
+            self.order = np.delete(self.order, np.s_[first:last + 1])
+            self.endRemoveRows()
+
+        # Same visible rows, now expressed as rows of the new table
+        old_to_new = np.full(len(churn.old), -1, dtype=np.int64)
+        old_to_new[churn.kept_old] = churn.kept_new
+        self.order = old_to_new[self.order]
+        if self._highlighted is not None:
+            self._highlighted = int(old_to_new[self._highlighted]) if self._highlighted < len(old_to_new) else None
+            if self._highlighted is not None and self._highlighted < 0:
+                self._highlighted = None
+        self.table = churn.new
+
+        # Inserts at their final positions, ascending so earlier positions stay valid
+        for first, last in added_blocks:
+            self.beginInsertRows(parent, first, last)
+            self.order = np.insert(self.order, first, final_order[first:last + 1])
+            self.endInsertRows()
+
+        # Rows with equal sort keys can swap places between tables
+        if not np.array_equal(self.order, final_order):
+            self.layoutAboutToBeChanged.emit()
+            self.order = final_order
+            self.layoutChanged.emit()
+        self.position = final_position
+
+        changed = final_position[churn.changed_rows()]
+        if len(changed):
+            self.dataChanged.emit(self.index(int(changed.min()), 0),
+                                  self.index(int(changed.max()), len(ROUTE_COLUMNS) - 1))
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.sort_column = column
+        self.sort_descending = order == Qt.SortOrder.DescendingOrder
+        self._apply_order()
+        self.layoutChanged.emit()
+
+    def _apply_order(self) -> None:
+        if len(self.table):
+            self.order = self.table.sort_order(self.sort_column, self.sort_descending)
+        else:
+            self.order = np.arange(0)
+        self.position = np.empty(len(self.order), dtype=np.int64)
+        self.position[self.order] = np.arange(len(self.order))
+
+    def view_row(self, table_row: int) -> int:
+        return int(self.position[table_row]) if 0 <= table_row < len(self.position) else -1
+
+    def highlight(self, table_row: Optional[int]) -> None:
+        """Give one route a background highlight (None clears it)"""
+        previous, self._highlighted = self._highlighted, table_row
+        for changed in (previous, table_row):
+            row = self.view_row(changed) if changed is not None else -1
+            if row >= 0:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(ROUTE_COLUMNS) - 1),
+                                      [Qt.ItemDataRole.BackgroundRole])
+
+    def scroll_to(self, view: QTableView, table_row: int) -> None:
+        row = self.view_row(table_row)
+        if row >= 0:
+            view.scrollTo(self.index(row, 0))
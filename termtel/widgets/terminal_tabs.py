@@ -10,6 +10,7 @@ import logging
 from typing import Dict, Optional, Tuple
 
 from termtel.themes2 import terminal_themes
+from termtel.ssh.reachability import reachability
 from termtel.widgets.qtssh_widget import Ui_Terminal
 
 logger = logging.getLogger(__name__)
@@ -106,14 +107,19 @@ class TerminalTabWidget(QTabWidget):
             host = connection_data['host']
             port = connection_data.get('port', '22')
 
-            success, error_message = self.test_socket_connection(host, port)
-            if not success:
-                QMessageBox.critical(
+            # Use the last background probe instead of blocking the UI on a
+            # fresh connect; unknown hosts are left to the terminal to report.
+            status = reachability.get_cached(host, port)
+            if status is not None and not status.reachable:
+                answer = QMessageBox.question(
                     self,
-                    "Connection Failed",
-                    f"Failed to connect to {host}:{port}\nError: {error_message}"
+                    "Host Unreachable",
+                    f"{host}:{port} was unreachable {status.age:.0f}s ago\n"
+                    f"Error: {status.error}\n\nConnect anyway?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
                 )
-                return None
+                if answer != QMessageBox.StandardButton.Yes:
+                    return None
 
             # Create tab container
             tab_container = QWidget()